@@ -0,0 +1,172 @@
+"""
+Measure fulfill_random_words gas and recommend callback_gas_limit.
+
+For every distinct prize tier list in script/raffles.toml, rounds of
+increasing size, up to the 100k-entry rounds script/load_test.py targets,
+are each drawn as the first round of a fresh raffle on a fresh local EVM,
+with every storage slot cold. Each round is drawn once with the winning
+tickets spread across it (the first, the last and evenly in between), so
+each tier's ticket search reads its own cold ledger slots instead of the
+previous tier's path, and CALIBRATE_DRAWS more times with seeded-random
+words; the worst draw counts. Every ticket is held by a fresh address
+(the costliest winnings writes), and the spread winners are either EOAs or
+contracts with a storage-writing receive hook; prizes are only credited
+in the callback, so both should cost the same. The recommended limit is
+the worst measured gas plus CALIBRATE_MARGIN, rounded up to 1000, and is
+written back to raffles.toml: into [defaults] for the default tiers and
+onto each [[raffles]] entry whose tiers need a different limit. The full
+sweep enters about 450k tickets and takes about ten minutes.
+
+Configured through environment variables (defaults in brackets):
+CALIBRATE_PLAYERS [1,10,100,1000,10000,100000] round sizes,
+CALIBRATE_DRAWS [8] seeded-random draws per round, CALIBRATE_MARGIN [0.25],
+RAFFLE_CONFIG [script/raffles.toml], CALIBRATE_DRY_RUN [0] to only print.
+"""
+import math
+import os
+import random
+from pathlib import Path
+import boa
+import tomlkit
+from script.deploy_factory import CONFIG_PATH, load_raffle_configs
+from src.mocks import mock_vrf_coordinator
+from src import raffle
+
+ENTRANCE_FEE = 10**16
+INTERVAL = 60
+MAX_CALLBACK_GAS = 2_500_000  # Chainlink VRF v2.5 coordinator limit
+PLAYER_COUNTS = [1, 10, 100, 1_000, 10_000, 100_000]
+RANDOM_DRAWS = 8  # Seeded-random draws of each round, besides the spread one
+WINNER_TYPES = ["eoa", "contract"]
+HOOKED_PLAYER = """
+# pragma version 0.4.0
+received: public(uint256)
+
+@external
+@payable
+def enter(raffle: address):
+    raw_call(raffle, method_id("enter_raffle()"), value=msg.value)
+
+@external
+@payable
+def __default__():
+    self.received += msg.value
+"""
+
+
+def _enter(raffle_contract, winner_type: str, player_deployer):
+    if winner_type == "contract":
+        player = player_deployer.deploy()
+        boa.env.set_balance(player.address, ENTRANCE_FEE)
+        player.enter(raffle_contract.address, value=ENTRANCE_FEE, sender=player.address)
+        return
+    player = boa.env.generate_address()
+    boa.env.set_balance(player, ENTRANCE_FEE)
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle(value=ENTRANCE_FEE)
+
+
+def spread_tickets(count: int, winners: int) -> list[int]:
+    """Winning tickets from the first to the last, evenly spaced, so no two share a search path."""
+    if winners == 1:
+        return [count - 1]
+    return [i * (count - 1) // (winners - 1) for i in range(winners)]
+
+
+def _callback_gas(raffle_contract, mock, words: list[int]) -> int:
+    """Gas of one draw from cold storage, reverted afterwards so the round can be drawn again."""
+    # Reset before anchoring: resetting drops the access journal that holds the anchor's checkpoint
+    boa.env.reset_gas_used()
+    with boa.env.anchor():
+        with boa.env.prank(mock.address):
+            raffle_contract.fulfill_random_words(mock.last_request_id(), words)
+        return raffle_contract._computation.get_gas_used()
+
+
+def measure_callback_gas(
+    prize_tiers: list[int], player_counts: list[int], winner_type: str, draws: int = RANDOM_DRAWS
+) -> dict[int, int]:
+    """Worst gas used by fulfill_random_words at each round size, for one tier list and winner type."""
+    player_deployer = boa.loads_partial(HOOKED_PLAYER) if winner_type == "contract" else None
+    results = {}
+    for count in player_counts:
+        # Each round size is the first draw of a fresh raffle, whose prize
+        # bookkeeping slots are still zero and so cost the most to write. A
+        # separate env has no open snapshots, so every slot starts cold.
+        with boa.swap_env(boa.Env()):
+            mock = mock_vrf_coordinator.deploy()
+            raffle_contract = raffle.deploy(
+                ENTRANCE_FEE, INTERVAL, mock.address, b"\x00" * 32, 1234, MAX_CALLBACK_GAS, prize_tiers
+            )
+            tickets = spread_tickets(count, min(len(prize_tiers), count))
+            for i in range(count):
+                _enter(raffle_contract, winner_type if i in tickets else "eoa", player_deployer)
+            boa.env.time_travel(seconds=INTERVAL + 1)
+            raffle_contract.request_winner()
+            # Word i ranks ticket i among those not drawn yet; the earlier, lower picks are skipped
+            spread = [ticket - i for i, ticket in enumerate(tickets)]
+            spread += [0] * (len(prize_tiers) - len(spread))
+            rng = random.Random(count)
+            word_lists = [spread] + [[rng.getrandbits(256) for _ in prize_tiers] for _ in range(draws)]
+            results[count] = max(_callback_gas(raffle_contract, mock, words) for words in word_lists)
+    return results
+
+
+def recommend_limit(gas_used: int, margin: float) -> int:
+    limit = math.ceil(gas_used * (1 + margin) / 1000) * 1000
+    if limit > MAX_CALLBACK_GAS:
+        raise ValueError(f"{limit} gas is above the coordinator's {MAX_CALLBACK_GAS} callback limit")
+    return limit
+
+
+def calibrate(
+    tier_lists: list[list[int]], player_counts: list[int], margin: float, draws: int = RANDOM_DRAWS
+) -> tuple[list[dict], dict]:
+    """Measurement rows, and the recommended limit per tier list."""
+    rows = []
+    limits = {}
+    for prize_tiers in tier_lists:
+        worst = 0
+        for winner_type in WINNER_TYPES:
+            for count, gas in measure_callback_gas(prize_tiers, player_counts, winner_type, draws).items():
+                rows.append({"prize_tiers": prize_tiers, "winner_type": winner_type, "players": count, "gas": gas})
+                worst = max(worst, gas)
+        limits[tuple(prize_tiers)] = recommend_limit(worst, margin)
+    return rows, limits
+
+
+def update_config(path: Path, limits: dict):
+    """Write the limits into the raffle config, keeping its comments and layout."""
+    config = tomlkit.parse(path.read_text())
+    defaults = config["defaults"]
+    default_limit = limits[tuple(defaults["prize_tiers"])]
+    defaults["callback_gas_limit"] = default_limit
+    for entry in config["raffles"]:
+        limit = limits[tuple(entry.get("prize_tiers", defaults["prize_tiers"]))]
+        if limit != default_limit:
+            entry["callback_gas_limit"] = limit
+        elif "callback_gas_limit" in entry:
+            del entry["callback_gas_limit"]
+    path.write_text(tomlkit.dumps(config))
+
+
+def moccasin_main() -> dict:
+    path = Path(os.environ.get("RAFFLE_CONFIG", CONFIG_PATH))
+    players = os.environ.get("CALIBRATE_PLAYERS")
+    player_counts = [int(n) for n in players.split(",")] if players else PLAYER_COUNTS
+    margin = float(os.environ.get("CALIBRATE_MARGIN", "0.25"))
+    draws = int(os.environ.get("CALIBRATE_DRAWS", RANDOM_DRAWS))
+    tier_lists = []
+    for c in load_raffle_configs(path):
+        if c["prize_tiers"] not in tier_lists:
+            tier_lists.append(c["prize_tiers"])
+
+    rows, limits = calibrate(tier_lists, player_counts, margin, draws)
+    for row in rows:
+        print(f"prize_tiers={row['prize_tiers']} winner={row['winner_type']} players={row['players']}: {row['gas']} gas")
+    for prize_tiers, limit in limits.items():
+        print(f"prize_tiers={list(prize_tiers)}: callback_gas_limit {limit} ({margin:.0%} margin)")
+    if os.environ.get("CALIBRATE_DRY_RUN") != "1":
+        update_config(path, limits)
+        print(f"Updated {path}")
+    return limits
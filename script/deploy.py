@@ -2,6 +2,7 @@ from moccasin.boa_tools import VyperContract
 from eth_account import Account
 from src.mocks import mock_vrf_coordinator
 from src import raffle
+from script.deploy_factory import load_raffle_defaults
 import os
 
 def deploy() -> VyperContract:
@@ -16,12 +17,14 @@ def deploy() -> VyperContract:
     interval = 3600  # 1 hour in seconds
     gas_lane = b"\x00" * 32 # Replace with actual key hash (32 bytes)
     subscription_id = 1234  # Replace with your Chainlink subscription ID
-    callback_gas_limit = 100000  # Gas limit for VRF callback
+    callback_gas_limit = load_raffle_defaults()["callback_gas_limit"]  # Calibrated gas limit for VRF callback
+    prize_tiers = [10000]  # Pot share per winner in basis points
     
     print(f"entrance_fee: {entrance_fee}, type: {type(entrance_fee)}")
     print(f"interval: {interval}, type: {type(interval)}")
     print(f"subscription_id: {subscription_id}, type: {type(subscription_id)}")
     print(f"callback_gas_limit: {callback_gas_limit}, type: {type(callback_gas_limit)}")
+    print(f"prize_tiers: {prize_tiers}, type: {type(prize_tiers)}")
 
     # Deploy the contract
     raffle_contract = raffle.deploy(
@@ -32,6 +35,7 @@ def deploy() -> VyperContract:
         gas_lane,
         subscription_id,
         callback_gas_limit,
+        prize_tiers,
     )
 
     print(f"Raffle deployed at: {raffle_contract.address}")
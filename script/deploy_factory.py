@@ -0,0 +1,78 @@
+"""
+Deploy the raffle blueprint and factory, then roll out the raffles in raffles.toml.
+
+Raffles are created in batches of up to MAX_BATCH_SIZE per transaction.
+This does not reduce the gas of each raffle, which costs about the same as
+a direct raffle.deploy(); it reduces the number of transactions a rollout
+sends and keeps the instances in the factory's on-chain registry.
+
+Configured through environment variables (defaults in brackets):
+RAFFLE_CONFIG [script/raffles.toml].
+"""
+import os
+import tomllib
+from pathlib import Path
+from moccasin.boa_tools import VyperContract
+from src.mocks import mock_vrf_coordinator
+from src import raffle, raffle_factory
+
+CONFIG_PATH = Path(__file__).parent / "raffles.toml"
+MAX_BATCH_SIZE = 50  # Matches MAX_BATCH_SIZE in raffle_factory.vy
+
+
+def load_raffle_configs(path: Path = CONFIG_PATH) -> list[dict]:
+    """Read raffle variants from a TOML file, applying [defaults] to each entry."""
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    defaults = config.get("defaults", {})
+    return [{**defaults, **entry} for entry in config["raffles"]]
+
+
+def load_raffle_defaults(path: Path = CONFIG_PATH) -> dict:
+    """The [defaults] table, e.g. the calibrated callback_gas_limit for single-winner raffles."""
+    with open(path, "rb") as f:
+        return tomllib.load(f).get("defaults", {})
+
+
+def deploy_factory() -> VyperContract:
+    blueprint = raffle.deploy_as_blueprint()
+    print(f"Raffle blueprint at: {blueprint.address}")
+    factory = raffle_factory.deploy(blueprint.address)
+    print(f"Raffle factory at: {factory.address}")
+    return factory
+
+
+def deploy_raffles(factory: VyperContract, configs: list[dict], vrf_coordinator: str) -> list[VyperContract]:
+    """Create one raffle per config through the factory, batching the transactions."""
+    args = [
+        (
+            c["entrance_fee"],
+            c["interval"],
+            c.get("vrf_coordinator", vrf_coordinator),
+            bytes.fromhex(c["gas_lane"].removeprefix("0x")),
+            c["subscription_id"],
+            c["callback_gas_limit"],
+            c["prize_tiers"],
+        )
+        for c in configs
+    ]
+    raffles = []
+    for start in range(0, len(args), MAX_BATCH_SIZE):
+        for address in factory.create_raffles(args[start:start + MAX_BATCH_SIZE]):
+            raffles.append(raffle.at(address))
+    for raffle_contract, c in zip(raffles, configs):
+        print(
+            f"Raffle at {raffle_contract.address}: entrance_fee={c['entrance_fee']}, "
+            f"interval={c['interval']}, prize_tiers={c['prize_tiers']}"
+        )
+    return raffles
+
+
+def moccasin_main() -> list[VyperContract]:
+    configs = load_raffle_configs(Path(os.environ.get("RAFFLE_CONFIG", CONFIG_PATH)))
+    vrf_coordinator = None
+    if any("vrf_coordinator" not in c for c in configs):
+        vrf_coordinator = mock_vrf_coordinator.deploy().address
+        print(f"Mock VRF Coordinator at: {vrf_coordinator}")
+    factory = deploy_factory()
+    return deploy_raffles(factory, configs, vrf_coordinator)
@@ -0,0 +1,332 @@
+"""
+Idempotent rollout of the raffle variants in script/raffles.toml.
+
+Every deployment is identified by its init code (bytecode plus encoded
+constructor args). A local JSON manifest records, per chain id, the address
+each one was deployed at; a deployment whose init code is already in the
+manifest, and whose address still has code, is skipped, so re-runs are
+no-ops. Everything left is signed up front with consecutive nonces from the
+account's pending nonce and sent in JSON-RPC batches, then confirmed in
+batched receipt polls. Raffles without a vrf_coordinator share one mock
+coordinator, which is part of the same batch.
+
+Signed transactions are written to the manifest as pending before they are
+sent. A run interrupted after sending settles them on the next run from
+their receipts: mined ones are recorded, ones still unmined are sent again
+as the same signed transaction, and only ones that reverted or whose nonce
+went to another transaction are deployed afresh.
+
+Configured through environment variables (defaults in brackets):
+DEPLOY_NETWORKS [the active network] comma-separated networks from
+moccasin.toml, RAFFLE_CONFIG [script/raffles.toml],
+DEPLOY_MANIFEST [deployments.json].
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+import rlp
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+from boa.rpc import EthereumRPC, RPC, RPCError, to_hex, to_int
+from vyper.compiler.output import build_abi_output
+from script.deploy_factory import CONFIG_PATH, load_raffle_configs
+from script.rpc_client import RPC_BATCH_SIZE, fetch_each
+from src.mocks import mock_vrf_coordinator
+from src import raffle
+
+MANIFEST_PATH = "deployments.json"
+RECEIPT_TIMEOUT = 120
+POLL_INTERVAL = 0.5
+
+
+def init_code(deployer, args: tuple) -> bytes:
+    """Deployment bytecode with ABI-encoded constructor args, for VVM or in-process builds."""
+    if hasattr(deployer, "compiler_data"):
+        abi, bytecode = build_abi_output(deployer.compiler_data), deployer.compiler_data.bytecode
+    else:
+        abi, bytecode = deployer.abi, deployer.bytecode
+    constructor = next((item for item in abi if item["type"] == "constructor"), None)
+    types = [i["type"] for i in constructor["inputs"]] if constructor else []
+    return bytecode + encode(types, list(args))
+
+
+def create_address(sender: str, nonce: int) -> str:
+    return to_checksum_address(keccak(rlp.encode([bytes.fromhex(sender[2:]), nonce]))[12:])
+
+
+def tx_hash(raw_tx: str) -> str:
+    return "0x" + keccak(bytes.fromhex(raw_tx[2:])).hex()
+
+
+@dataclass
+class Deployment:
+    name: str
+    deployer: object
+    args: tuple
+
+    @cached_property
+    def init_code(self) -> bytes:
+        return init_code(self.deployer, self.args)
+
+    @cached_property
+    def key(self) -> str:
+        return hashlib.sha256(self.init_code).hexdigest()
+
+    def record(self, network: str, address: str, tx_hash: str) -> dict:
+        return {
+            "name": self.name,
+            "network": network,
+            "address": address,
+            "tx_hash": tx_hash,
+            "args": [a.hex() if isinstance(a, bytes) else a for a in self.args],
+        }
+
+
+def load_manifest(path: str) -> dict:
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: str):
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    tmp.replace(path)
+
+
+class DeployPipeline:
+    """
+    Deploys a set of contracts on one chain, skipping what the manifest has.
+
+    `account` signs locally (an eth_account LocalAccount or MoccasinAccount);
+    nonces are assigned here rather than by the node, so every transaction
+    can be sent before any of them is mined. Pending manifest entries carry
+    their nonce and signed transaction until their receipt is seen.
+    """
+
+    def __init__(self, rpc: RPC, account, network: str, manifest_path: str = MANIFEST_PATH):
+        self.rpc = rpc
+        self.account = account
+        self.network = network
+        self.manifest_path = manifest_path
+        self.manifest = load_manifest(manifest_path)
+        self.chain_id = to_int(rpc.fetch("eth_chainId", []))
+        self.deployed = self.manifest.setdefault(str(self.chain_id), {})
+        self.next_nonce = to_int(rpc.fetch("eth_getTransactionCount", [account.address, "pending"]))
+        # (manifest key, deployment, nonce, address); the deployment is None
+        # for a pending transaction from an earlier run, which is already signed
+        self.queued: list[tuple[str, Deployment | None, int, str]] = []
+        self.skipped = 0
+        self._reconcile()
+
+    def _reconcile(self):
+        """Settle the transactions an earlier run sent but did not see mined."""
+        pending = {key: entry for key, entry in self.deployed.items() if entry.get("status") == "pending"}
+        if not pending:
+            return
+        mined_nonce = to_int(self.rpc.fetch("eth_getTransactionCount", [self.account.address, "latest"]))
+        receipts = fetch_each(self.rpc, [("eth_getTransactionReceipt", [e["tx_hash"]]) for e in pending.values()])
+        for (key, entry), receipt in zip(pending.items(), receipts):
+            if isinstance(receipt, Exception):
+                raise receipt
+            if receipt is not None and to_int(receipt["status"]) == 1:
+                self._confirm(key, receipt)
+            elif receipt is not None or entry["nonce"] < mined_nonce:
+                # Reverted, or its nonce went to another transaction: plan it afresh
+                del self.deployed[key]
+            else:
+                self.queued.append((key, None, entry["nonce"], entry["address"]))
+        save_manifest(self.manifest, self.manifest_path)
+
+    def _confirm(self, key: str, receipt: dict) -> dict:
+        entry = self.deployed[key]
+        assert to_checksum_address(receipt["contractAddress"]) == entry["address"], "Nonce out of sequence"
+        for field in ("status", "nonce", "raw_tx"):
+            entry.pop(field)
+        return entry
+
+    def _allocate_nonce(self) -> int:
+        # Pending transactions from an earlier run keep their nonces
+        reserved = {nonce for _, _, nonce, _ in self.queued}
+        while self.next_nonce in reserved:
+            self.next_nonce += 1
+        self.next_nonce += 1
+        return self.next_nonce - 1
+
+    def _is_live(self, address: str) -> bool:
+        return self.rpc.fetch("eth_getCode", [address, "latest"]) not in ("0x", "0x0")
+
+    def plan(self, deployment: Deployment) -> str:
+        """Address the deployment has or will have. Queues it unless already deployed."""
+        entry = self.deployed.get(deployment.key)
+        if entry is not None and entry.get("status") == "pending":
+            return entry["address"]  # Queued to be sent again by _reconcile
+        if entry is not None and self._is_live(entry["address"]):
+            self.skipped += 1
+            return entry["address"]
+        for key, _, _, address in self.queued:
+            if key == deployment.key:
+                return address
+        nonce = self._allocate_nonce()
+        address = create_address(self.account.address, nonce)
+        self.queued.append((deployment.key, deployment, nonce, address))
+        return address
+
+    def _fees(self) -> dict:
+        block, tip = self.rpc.fetch_multi([
+            ("eth_getBlockByNumber", ["latest", False]),
+            ("eth_maxPriorityFeePerGas", []),
+        ])
+        tip = to_int(tip)
+        return {"maxPriorityFeePerGas": tip, "maxFeePerGas": 2 * to_int(block["baseFeePerGas"]) + tip}
+
+    def _sign(self, batch: list[tuple[str, Deployment, int, str]]) -> list[str]:
+        if not batch:
+            return []
+        # Estimates run against the current state, so a contract whose
+        # constructor calls another contract in the same batch is not supported
+        estimates = self.rpc.fetch_multi([
+            ("eth_estimateGas", [{"from": self.account.address, "data": to_hex(d.init_code)}])
+            for _, d, _, _ in batch
+        ])
+        fees = self._fees()
+        signed = []
+        for (_, deployment, nonce, _), gas in zip(batch, estimates):
+            tx = {
+                "type": 2,
+                "chainId": self.chain_id,
+                "nonce": nonce,
+                "gas": to_int(gas),
+                "value": 0,
+                "data": to_hex(deployment.init_code),
+                **fees,
+            }
+            signed.append(to_hex(self.account.sign_transaction(tx).raw_transaction))
+        return signed
+
+    def _wait(self, tx_hashes: list[str]) -> list[dict]:
+        receipts = dict.fromkeys(tx_hashes)
+        deadline = time.time() + RECEIPT_TIMEOUT
+        while True:
+            pending = [h for h, r in receipts.items() if r is None]
+            if not pending:
+                return [receipts[h] for h in tx_hashes]
+            if time.time() > deadline:
+                raise TimeoutError(f"{len(pending)} deployments not mined after {RECEIPT_TIMEOUT}s")
+            for h, r in zip(pending, self.rpc.fetch_multi([("eth_getTransactionReceipt", [h]) for h in pending])):
+                receipts[h] = r
+            if any(r is None for r in receipts.values()):
+                time.sleep(POLL_INTERVAL)
+
+    def _send(self, entries: list[dict]) -> dict[int, RPCError]:
+        """Send signed transactions in one batch. Returns the ones the node refused, by position."""
+        results = fetch_each(self.rpc, [("eth_sendRawTransaction", [e["raw_tx"]]) for e in entries])
+        errors = {
+            i: r for i, r in enumerate(results)
+            if isinstance(r, RPCError) and "already known" not in str(r).lower()
+        }
+        if not errors:
+            return {}
+        # fetch_each resends a failed batch call by call, so a transaction the
+        # node took the first time can be refused as a duplicate; its receipt tells
+        receipts = fetch_each(self.rpc, [("eth_getTransactionReceipt", [entries[i]["tx_hash"]]) for i in errors])
+        return {i: e for (i, e), receipt in zip(errors.items(), receipts) if not isinstance(receipt, dict)}
+
+    def submit(self) -> list[dict]:
+        """Send every queued deployment and record the confirmed ones. Returns their records."""
+        records, failed = [], []
+        # Re-sent transactions and new ones filling the nonces between them go out in nonce order
+        self.queued.sort(key=lambda item: item[2])
+        for start in range(0, len(self.queued), RPC_BATCH_SIZE):
+            batch = self.queued[start:start + RPC_BATCH_SIZE]
+            unsigned = [item for item in batch if item[1] is not None]
+            for (key, deployment, nonce, address), raw_tx in zip(unsigned, self._sign(unsigned)):
+                record = deployment.record(self.network, address, tx_hash(raw_tx))
+                self.deployed[key] = {**record, "status": "pending", "nonce": nonce, "raw_tx": raw_tx}
+            # Recorded before sending, so a run stopped from here on is reconciled rather than sent again
+            save_manifest(self.manifest, self.manifest_path)
+
+            entries = [self.deployed[key] for key, *_ in batch]
+            refused = self._send(entries)
+            for i, error in refused.items():
+                failed.append(f"{entries[i]['name']} refused: {error}")
+                del self.deployed[batch[i][0]]
+            # Nothing after a refused nonce can be mined until a re-run fills it
+            first_refused = min((batch[i][2] for i in refused), default=None)
+            waiting = [
+                (key, entry) for (key, _, nonce, _), entry in zip(batch, entries)
+                if key in self.deployed and (first_refused is None or nonce < first_refused)
+            ]
+            receipts = self._wait([entry["tx_hash"] for _, entry in waiting])
+            for (key, entry), receipt in zip(waiting, receipts):
+                if to_int(receipt["status"]) != 1:
+                    failed.append(f"{entry['name']} reverted in {entry['tx_hash']}")
+                    del self.deployed[key]
+                    continue
+                records.append(self._confirm(key, receipt))
+            # Saved per batch, so an interrupted rollout resumes where it stopped
+            save_manifest(self.manifest, self.manifest_path)
+            if refused:
+                break
+        self.queued = []
+        if failed:
+            raise RuntimeError(f"Deployments failed: {', '.join(failed)}")
+        return records
+
+
+def raffle_deployments(configs: list[dict], pipeline: DeployPipeline) -> list[str]:
+    """Plan every raffle in configs, plus the mock coordinator if one needs it."""
+    mock_address = None
+    if any("vrf_coordinator" not in c for c in configs):
+        mock_address = pipeline.plan(Deployment("mock_vrf_coordinator", mock_vrf_coordinator, ()))
+    return [
+        pipeline.plan(Deployment("raffle", raffle, (
+            c["entrance_fee"],
+            c["interval"],
+            to_checksum_address(c.get("vrf_coordinator", mock_address)),
+            bytes.fromhex(c["gas_lane"].removeprefix("0x")),
+            c["subscription_id"],
+            c["callback_gas_limit"],
+            c["prize_tiers"],
+        )))
+        for c in configs
+    ]
+
+
+def deploy_network(rpc: RPC, account, network: str, configs: list[dict], manifest_path: str) -> list[str]:
+    pipeline = DeployPipeline(rpc, account, network, manifest_path)
+    addresses = raffle_deployments(configs, pipeline)
+    queued = len(pipeline.queued)
+    started = time.perf_counter()
+    pipeline.submit()
+    print(
+        f"{network} (chain {pipeline.chain_id}): {queued} deployed in "
+        f"{time.perf_counter() - started:.1f}s, {pipeline.skipped} already in the manifest"
+    )
+    return addresses
+
+
+def moccasin_main() -> dict[str, list[str]]:
+    from moccasin.config import get_config
+
+    config = get_config()
+    configs = load_raffle_configs(Path(os.environ.get("RAFFLE_CONFIG", CONFIG_PATH)))
+    manifest_path = os.environ.get("DEPLOY_MANIFEST", MANIFEST_PATH)
+    active = config.get_active_network()
+    networks = [n.strip() for n in os.environ.get("DEPLOY_NETWORKS", active.name).split(",") if n.strip()]
+
+    results = {}
+    for name in networks:
+        network = active if name == active.name else config.set_active_network(name)
+        if network.url is None or network.is_fork:
+            raise RuntimeError(f"{name} has no RPC; the manifest only makes sense on a persistent chain")
+        account = network.get_default_account()
+        if account is None:
+            raise RuntimeError(f"No account configured for {name}")
+        results[name] = deploy_network(EthereumRPC(network.url), account, name, configs, manifest_path)
+    return results
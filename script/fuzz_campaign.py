@@ -0,0 +1,134 @@
+"""
+Long-running fuzz campaign over the stateful machines in tests/fuzz.
+
+Each machine is split into shards that run in separate processes, each
+with its own boa env and a seed derived from FUZZ_SEED, the machine and
+the shard index, so a campaign is reproducible. All shards share one
+Hypothesis example database on disk, so failures found by one run are
+replayed first by the next. Traces are only printed for failing shards.
+
+Configured through environment variables (defaults in brackets):
+FUZZ_EXAMPLES [10000] per machine, FUZZ_WORKERS [CPU count] processes,
+FUZZ_SHARDS [FUZZ_WORKERS] shards per machine, FUZZ_SEED [0],
+FUZZ_MACHINES [all] comma-separated class names,
+FUZZ_DATABASE [.hypothesis/campaign], FUZZ_DIFF_RATE [0.1] share of
+DifferentialRaffleMachine examples replayed on the contract.
+"""
+import importlib
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import zlib
+from pathlib import Path
+
+FUZZ_MODULE = Path(__file__).parent.parent / "tests" / "fuzz" / "test_raffle_stateful.py"
+MACHINES = [
+    "RaffleStateMachine",
+    "MultiPlayerRaffleMachine",
+    "TimeStateMachine",
+    "VRFStressMachine",
+    "DifferentialRaffleMachine",
+]
+
+
+def shard_seed(base_seed: int, machine: str, shard: int) -> int:
+    return zlib.crc32(f"{base_seed}:{machine}:{shard}".encode())
+
+
+def _load_fuzz_module():
+    # The machines import their reference model from the same directory
+    if str(FUZZ_MODULE.parent) not in sys.path:
+        sys.path.insert(0, str(FUZZ_MODULE.parent))
+    spec = importlib.util.spec_from_file_location("raffle_fuzz", FUZZ_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_shard(job: tuple) -> dict:
+    """Run one shard in a fresh process; the module import deploys into its own env."""
+    machine_name, shard, examples, seed, database_path = job
+    from hypothesis import seed as use_seed, settings
+    from hypothesis.database import DirectoryBasedExampleDatabase
+
+    fuzz = _load_fuzz_module()
+    machine_cls = use_seed(seed)(getattr(fuzz, machine_name))
+    shard_settings = settings(
+        fuzz.FUZZ_SETTINGS,
+        max_examples=examples,
+        database=DirectoryBasedExampleDatabase(database_path),
+    )
+    started = time.perf_counter()
+    failure = None
+    try:
+        fuzz.run_traced(machine_cls, shard_settings)
+    except Exception:
+        failure = traceback.format_exc()
+    return {
+        "machine": machine_name,
+        "shard": shard,
+        "seed": seed,
+        "examples": examples,
+        "seconds": round(time.perf_counter() - started, 1),
+        "failure": failure,
+    }
+
+
+def plan_jobs(machines: list[str], examples: int, shards: int, base_seed: int, database_path: str) -> list[tuple]:
+    """Split each machine's examples evenly over its shards."""
+    jobs = []
+    for machine in machines:
+        for shard in range(shards):
+            count = examples // shards + (1 if shard < examples % shards else 0)
+            if count:
+                jobs.append((machine, shard, count, shard_seed(base_seed, machine, shard), database_path))
+    return jobs
+
+
+def run_campaign(
+    machines: list[str] = MACHINES,
+    examples: int = 10_000,
+    workers: int | None = None,
+    shards: int | None = None,
+    base_seed: int = 0,
+    database_path: str = ".hypothesis/campaign",
+) -> list[dict]:
+    workers = workers or os.cpu_count()
+    jobs = plan_jobs(machines, examples, shards or workers, base_seed, database_path)
+    # `mox run` loads this file under a private module name that workers
+    # cannot import, so hand them the worker by its package path
+    worker = importlib.import_module("script.fuzz_campaign").run_shard
+    results = []
+    # Spawned workers start without the parent's boa env or open snapshots
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for result in pool.imap_unordered(worker, jobs):
+            status = "FAILED" if result["failure"] else "ok"
+            print(
+                f"{result['machine']} shard {result['shard']} (seed {result['seed']}): "
+                f"{result['examples']} examples in {result['seconds']}s {status}"
+            )
+            if result["failure"]:
+                print(result["failure"])
+            results.append(result)
+    return results
+
+
+def moccasin_main() -> list[dict]:
+    machines = os.environ.get("FUZZ_MACHINES")
+    workers = int(os.environ.get("FUZZ_WORKERS", os.cpu_count()))
+    results = run_campaign(
+        machines=machines.split(",") if machines else MACHINES,
+        examples=int(os.environ.get("FUZZ_EXAMPLES", "10000")),
+        workers=workers,
+        shards=int(os.environ.get("FUZZ_SHARDS", workers)),
+        base_seed=int(os.environ.get("FUZZ_SEED", "0")),
+        database_path=os.environ.get("FUZZ_DATABASE", ".hypothesis/campaign"),
+    )
+    failed = [r for r in results if r["failure"]]
+    print(f"{len(results) - len(failed)}/{len(results)} shards passed")
+    if failed:
+        raise SystemExit(1)
+    return results
@@ -0,0 +1,361 @@
+import os
+import sqlite3
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+from boa.rpc import EthereumRPC, RPC, to_hex, to_int
+from src import raffle
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    ticket_index INTEGER NOT NULL,
+    ticket_count INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS draws (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    request_id TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS winners (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    winner TEXT NOT NULL,
+    request_id TEXT NOT NULL,
+    prize TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS prizes (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    tier INTEGER NOT NULL,
+    winner TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS entries_round ON entries (round_id);
+CREATE INDEX IF NOT EXISTS entries_player ON entries (player);
+"""
+
+EVENT_TABLES = ("entries", "draws", "winners", "prizes")
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def event_topics(abi: list[dict]) -> dict[str, dict]:
+    """Map each event's topic0 to its ABI entry."""
+    topics = {}
+    for item in abi:
+        if item["type"] != "event":
+            continue
+        signature = f"{item['name']}({','.join(i['type'] for i in item['inputs'])})"
+        topics["0x" + keccak(text=signature).hex()] = item
+    return topics
+
+
+def decode_event(event_abi: dict, log: dict) -> dict:
+    """Decode the indexed and data fields of a raw JSON-RPC log."""
+    indexed = [i for i in event_abi["inputs"] if i["indexed"]]
+    not_indexed = [i for i in event_abi["inputs"] if not i["indexed"]]
+    args = {}
+    for item, topic in zip(indexed, log["topics"][1:]):
+        args[item["name"]] = decode([item["type"]], bytes.fromhex(topic[2:]))[0]
+    data = decode([i["type"] for i in not_indexed], bytes.fromhex(log["data"][2:]))
+    for item, value in zip(not_indexed, data):
+        args[item["name"]] = value
+    return args
+
+
+class RaffleLogState:
+    """
+    Raffle state rebuilt from its events in one pass, without reading storage.
+
+    Feed every decoded event in log order to `apply`. Round timestamps are
+    not in the events, so they come from the block each PickedWinner was
+    mined in; `last_timestamp` is unknown until the first draw settles.
+    """
+
+    def __init__(self):
+        self.round_id = 0
+        self.calculating = False
+        self.recent_winner = ZERO_ADDRESS
+        self.last_timestamp = None
+        self.balance = 0
+        self.entries: dict[int, list[tuple[str, int, int]]] = {}  # round -> (player, first ticket, count)
+        self.winnings: dict[str, int] = {}
+        self.deposits: dict[str, int] = {}
+        self.nonces: dict[str, int] = {}  # Next signed-entry nonce of each player who has used one
+        self.rounds: list[dict] = []  # Settled rounds, oldest first
+
+    def apply(self, name: str, args: dict, timestamp: int | None = None):
+        if name == "EnteredRaffle":
+            self.entries.setdefault(args["round_id"], []).append(
+                (to_checksum_address(args["player"]), args["ticket_index"], args["ticket_count"])
+            )
+            self.balance += args["amount"]
+        elif name == "RequestedWinner":
+            self.calculating = True
+        elif name == "PaidPrize":
+            winner = to_checksum_address(args["winner"])
+            self.winnings[winner] = self.winnings.get(winner, 0) + args["amount"]
+        elif name == "PickedWinner":
+            self.entries.pop(args["round_id"], None)
+            self.recent_winner = to_checksum_address(args["winner"])
+            self.last_timestamp = timestamp
+            self.rounds.append({
+                "round_id": args["round_id"],
+                "winner": self.recent_winner,
+                "prize": args["prize"],
+                "player_count": args["player_count"],
+                "request_id": args["request_id"],
+                "timestamp": timestamp,
+            })
+            self.round_id = args["round_id"] + 1
+            self.calculating = False
+        elif name == "Withdrew":
+            player = to_checksum_address(args["player"])
+            self.winnings[player] -= args["amount"]
+            self.balance -= args["amount"]
+        elif name == "Deposited":
+            player = to_checksum_address(args["player"])
+            self.deposits[player] = self.deposits.get(player, 0) + args["amount"]
+            self.balance += args["amount"]
+        elif name in ("WithdrewDeposit", "RelayedEntry"):
+            # A relayed entry's EnteredRaffle adds the amount back to the balance
+            player = to_checksum_address(args["player"])
+            self.deposits[player] -= args["amount"]
+            self.balance -= args["amount"]
+            if name == "RelayedEntry":
+                self.nonces[player] = args["nonce"] + 1
+
+    def tickets(self, round_id: int) -> list[str]:
+        """Owner of every ticket in the round, in ticket order."""
+        owners = []
+        for player, _, count in self.entries.get(round_id, []):
+            owners.extend([player] * count)
+        return owners
+
+    @property
+    def player_count(self) -> int:
+        return sum(count for _, _, count in self.entries.get(self.round_id, []))
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.entries.get(self.round_id, []))
+
+    @property
+    def pending_player_count(self) -> int:
+        if not self.calculating:
+            return 0
+        return sum(count for _, _, count in self.entries.get(self.round_id + 1, []))
+
+
+class RaffleIndexer:
+    """
+    Incrementally copies raffle events into SQLite.
+
+    Logs are pulled with eth_getLogs in block batches and the last processed
+    block is checkpointed, so a restarted indexer resumes where it stopped.
+    Hashes of the newest `reorg_depth` blocks are kept; if the chain no longer
+    agrees with them, rows past the fork point are dropped and re-indexed.
+    """
+
+    def __init__(
+        self,
+        rpc: RPC,
+        raffle_address: str,
+        db_path: str = ":memory:",
+        start_block: int = 0,
+        batch_size: int = 2000,
+        reorg_depth: int = 64,
+        abi: list[dict] | None = None,
+    ):
+        self.rpc = rpc
+        self.raffle_address = to_checksum_address(raffle_address)
+        self.start_block = start_block
+        self.batch_size = batch_size
+        self.reorg_depth = reorg_depth
+        self.events = event_topics(abi if abi is not None else raffle.abi)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def checkpoint(self) -> int:
+        row = self.db.execute("SELECT block_number FROM checkpoint").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self, to_block: int | None = None) -> int:
+        """Index every block up to `to_block` (default: chain head). Returns the new checkpoint."""
+        head = to_int(self.rpc.fetch("eth_blockNumber", []))
+        to_block = head if to_block is None else min(to_block, head)
+        self._rewind_reorged_blocks(head)
+
+        start = self.checkpoint + 1
+        while start <= to_block:
+            end = min(start + self.batch_size - 1, to_block)
+            logs = self.rpc.fetch(
+                "eth_getLogs",
+                [{
+                    "address": self.raffle_address,
+                    "fromBlock": to_hex(start),
+                    "toBlock": to_hex(end),
+                    "topics": [list(self.events)],
+                }],
+            )
+            # Only blocks that can still be reorged need their hash remembered
+            tracked = range(max(start, head - self.reorg_depth + 1), end + 1)
+            hashes = self._block_hashes(tracked)
+            with self.db:
+                self._store_logs(logs)
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO blocks VALUES (?, ?)", zip(tracked, hashes)
+                )
+                self.db.execute(
+                    "DELETE FROM blocks WHERE block_number <= ?", (end - self.reorg_depth,)
+                )
+                self.db.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (end,))
+            start = end + 1
+        return self.checkpoint
+
+    def _block_hashes(self, block_numbers: range) -> list[str]:
+        if len(block_numbers) == 0:
+            return []
+        blocks = self.rpc.fetch_multi(
+            [("eth_getBlockByNumber", [to_hex(n), False]) for n in block_numbers]
+        )
+        # Nodes return null for blocks past their head
+        return [block["hash"] if block else None for block in blocks]
+
+    def _rewind_reorged_blocks(self, head: int):
+        stored = self.db.execute(
+            "SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC"
+        ).fetchall()
+        if not stored:
+            return
+        # Cheap path: the newest block still matches, so nothing was reorged
+        newest_number, newest_hash = stored[0]
+        if newest_number <= head and self._block_hashes(range(newest_number, newest_number + 1)) == [newest_hash]:
+            return
+        # The reorg may have left the chain shorter than what was indexed
+        tracked = range(stored[-1][0], min(newest_number, head) + 1)
+        current = dict(zip(tracked, self._block_hashes(tracked)))
+        for block_number, block_hash in stored:
+            if current.get(block_number) == block_hash:
+                fork_point = block_number
+                break
+        else:
+            raise RuntimeError(f"Reorg deeper than the {self.reorg_depth} tracked blocks")
+        with self.db:
+            for table in EVENT_TABLES + ("blocks",):
+                self.db.execute(f"DELETE FROM {table} WHERE block_number > ?", (fork_point,))
+            self.db.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (fork_point,))
+
+    def _store_logs(self, logs: list[dict]):
+        # PaidPrize has no round_id; it comes from the PickedWinner logged after it in the same
+        # transaction, which is in the same batch since batches cover whole blocks
+        paid_prizes: dict[str, list[tuple[tuple, tuple]]] = {}  # tx hash -> (position, prize)
+        for log in logs:
+            event_abi = self.events.get(log["topics"][0])
+            if event_abi is None:
+                continue
+            args = decode_event(event_abi, log)
+            position = (to_int(log["blockNumber"]), to_int(log["logIndex"]), log["transactionHash"])
+            if event_abi["name"] == "EnteredRaffle":
+                self.db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *position,
+                        args["round_id"],
+                        to_checksum_address(args["player"]),
+                        args["ticket_index"],
+                        args["ticket_count"],
+                        str(args["amount"]),
+                    ),
+                )
+            elif event_abi["name"] == "RequestedWinner":
+                self.db.execute(
+                    "INSERT OR REPLACE INTO draws VALUES (?, ?, ?, ?, ?)",
+                    (*position, args["round_id"], str(args["request_id"])),
+                )
+            elif event_abi["name"] == "PaidPrize":
+                paid_prizes.setdefault(log["transactionHash"], []).append(
+                    (position, (args["tier"], to_checksum_address(args["winner"]), str(args["amount"])))
+                )
+            elif event_abi["name"] == "PickedWinner":
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO prizes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (*prize_position, args["round_id"], *prize)
+                        for prize_position, prize in paid_prizes.pop(log["transactionHash"], [])
+                    ],
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO winners VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *position,
+                        args["round_id"],
+                        to_checksum_address(args["winner"]),
+                        str(args["request_id"]),
+                        str(args["prize"]),
+                        args["player_count"],
+                    ),
+                )
+
+    # Queries
+    def entries_per_round(self) -> dict[int, int]:
+        rows = self.db.execute(
+            "SELECT round_id, COUNT(*) FROM entries GROUP BY round_id ORDER BY round_id"
+        )
+        return dict(rows.fetchall())
+
+    def player_history(self, player: str) -> list[tuple[int, int]]:
+        """(round_id, block_number) of every entry made by `player`."""
+        rows = self.db.execute(
+            "SELECT round_id, block_number FROM entries WHERE player = ? "
+            "ORDER BY block_number, log_index",
+            (to_checksum_address(player),),
+        )
+        return rows.fetchall()
+
+    def winner_history(self) -> list[tuple[int, str]]:
+        rows = self.db.execute("SELECT round_id, winner FROM winners ORDER BY round_id")
+        return rows.fetchall()
+
+    def prize_history(self) -> list[tuple[int, int, str, int]]:
+        """(round_id, tier, winner, amount) of every prize paid, by round and tier."""
+        rows = self.db.execute("SELECT round_id, tier, winner, amount FROM prizes ORDER BY round_id, tier")
+        return [(round_id, tier, winner, int(amount)) for round_id, tier, winner, amount in rows]
+
+
+def moccasin_main() -> RaffleIndexer:
+    from moccasin.config import get_active_network
+
+    indexer = RaffleIndexer(
+        EthereumRPC(get_active_network().url),
+        os.environ["RAFFLE_ADDRESS"],
+        db_path=os.environ.get("RAFFLE_INDEX_DB", "raffle_index.db"),
+        start_block=int(os.environ.get("RAFFLE_START_BLOCK", "0")),
+    )
+    checkpoint = indexer.sync()
+    print(f"Indexed raffle {indexer.raffle_address} up to block {checkpoint}")
+    return indexer
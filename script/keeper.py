@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+from boa.rpc import EthereumRPC, RPC, to_int
+from script.rpc_client import RPC_BATCH_SIZE, ThreadLocalRPC, fetch_each
+from src import raffle
+
+CHECK_UPKEEP_SELECTOR = "0x" + keccak(text="check_upkeep()")[:4].hex()
+TIME_BLOCKER = "Time interval not passed"
+MIN_RECHECK_DELAY = 1.0  # The deadline block may not be mined yet when the local clock reaches it
+
+
+@dataclass
+class UpkeepStatus:
+    upkeep_needed: bool
+    blocked_by: str
+    callable_at: int
+
+
+class RaffleKeeper:
+    """
+    Calls request_winner on many raffles as soon as each one allows it.
+
+    Every raffle has a wake-up time. On wake, all due raffles are checked
+    with check_upkeep() in one batched eth_call over the shared RPC. A raffle
+    that is only waiting on its interval sleeps until callable_at; one that
+    is blocked for another reason (draw in progress, no players) is checked
+    again after `idle_delay`. Failed submissions are retried with jittered
+    exponential backoff, re-checking upkeep first so a raffle someone else
+    already triggered is left alone. A raffle whose check fails (a reverting
+    call, an address that is not a raffle, an RPC outage) is rescheduled
+    with the same backoff, capped at `idle_delay`, and never dropped.
+    Checks are fetched from worker threads, so `rpc` must not share a
+    connection between threads (see ThreadLocalRPC).
+    """
+
+    def __init__(
+        self,
+        rpc: RPC,
+        raffle_addresses: list[str],
+        submit: Callable[[str], object],
+        idle_delay: float = 30.0,
+        retry_delay: float = 2.0,
+        max_retries: int = 5,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.rpc = rpc
+        self.submit = submit
+        self.idle_delay = idle_delay
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.clock = clock
+        now = clock()
+        self.schedule = [(now, to_checksum_address(a)) for a in raffle_addresses]
+        heapq.heapify(self.schedule)
+        self.triggers: set[asyncio.Task] = set()
+        self.check_failures: dict[str, int] = {}  # Consecutive failed checks per raffle
+
+    async def check_upkeep(self, addresses: list[str]) -> tuple[int, dict[str, UpkeepStatus | Exception]]:
+        """
+        Chain time and the upkeep status of each raffle, in batched calls.
+
+        A raffle whose call failed or returned something that is not an
+        UpkeepStatus maps to the exception; failing to read the chain time
+        raises.
+        """
+        statuses = {}
+        chain_time = None
+        calls_per_batch = RPC_BATCH_SIZE - 1  # Each batch also reads the block
+        for start in range(0, len(addresses), calls_per_batch):
+            batch = addresses[start:start + calls_per_batch]
+            payloads = [("eth_getBlockByNumber", ["latest", False])] + [
+                ("eth_call", [{"to": address, "data": CHECK_UPKEEP_SELECTOR}, "latest"])
+                for address in batch
+            ]
+            block, *results = await asyncio.to_thread(fetch_each, self.rpc, payloads)
+            if isinstance(block, Exception):
+                raise block
+            chain_time = to_int(block["timestamp"])
+            for address, result in zip(batch, results):
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    (status,) = decode(["(bool,string,uint256)"], bytes.fromhex(result[2:]))
+                    statuses[address] = UpkeepStatus(*status)
+                except Exception as e:
+                    statuses[address] = e
+        return chain_time, statuses
+
+    def _backoff(self, address: str) -> float:
+        """Delay before re-checking a raffle whose check failed, growing with each failure."""
+        failures = self.check_failures.get(address, 0)
+        self.check_failures[address] = failures + 1
+        return min(self.retry_delay * 2**failures, self.idle_delay) * random.uniform(0.5, 1.5)
+
+    async def step(self) -> float:
+        """Handle every raffle that is due. Returns seconds until the next wake-up."""
+        now = self.clock()
+        due = []
+        while self.schedule and self.schedule[0][0] <= now:
+            due.append(heapq.heappop(self.schedule)[1])
+        if due:
+            try:
+                chain_time, statuses = await self.check_upkeep(due)
+            except Exception as e:
+                print(f"check_upkeep on {len(due)} raffles failed: {e}")
+                chain_time, statuses = None, dict.fromkeys(due, e)
+            for address in due:
+                status = statuses[address]
+                if isinstance(status, Exception):
+                    print(f"check_upkeep on {address} failed: {status}")
+                    heapq.heappush(self.schedule, (now + self._backoff(address), address))
+                    continue
+                self.check_failures.pop(address, None)
+                if status.upkeep_needed:
+                    task = asyncio.create_task(self._trigger(address))
+                    self.triggers.add(task)
+                    task.add_done_callback(self.triggers.discard)
+                    wake = now + self.idle_delay
+                elif status.blocked_by == TIME_BLOCKER:
+                    # Deadlines are in chain time; the local clock may be skewed
+                    wake = now + max(status.callable_at - chain_time, MIN_RECHECK_DELAY)
+                else:
+                    wake = now + self.idle_delay
+                heapq.heappush(self.schedule, (wake, address))
+        if not self.schedule:
+            return self.idle_delay
+        return max(self.schedule[0][0] - self.clock(), 0.0)
+
+    async def _trigger(self, address: str):
+        for attempt in range(self.max_retries):
+            try:
+                await asyncio.to_thread(self.submit, address)
+                return
+            except Exception as e:
+                print(f"request_winner on {address} failed (attempt {attempt + 1}): {e}")
+            await asyncio.sleep(self.retry_delay * 2**attempt * random.uniform(0.5, 1.5))
+            try:
+                _, statuses = await self.check_upkeep([address])
+            except Exception as e:
+                # The raffle is still scheduled, so its next check decides whether to trigger
+                print(f"check_upkeep on {address} failed: {e}")
+                return
+            status = statuses[address]
+            if isinstance(status, Exception) or not status.upkeep_needed:
+                return
+
+    async def run(self):
+        while True:
+            try:
+                delay = await self.step()
+            except Exception as e:
+                print(f"Keeper step failed: {e}")
+                delay = self.retry_delay
+            await asyncio.sleep(delay)
+
+
+def moccasin_main():
+    from moccasin.config import get_active_network
+
+    addresses = [a.strip() for a in os.environ["RAFFLE_ADDRESSES"].split(",") if a.strip()]
+    # One account sends every transaction, so submissions go out one at a
+    # time to keep its nonces in order
+    submit_lock = threading.Lock()
+
+    def submit(address: str):
+        with submit_lock:
+            raffle.at(address).request_winner()
+        print(f"Requested winner on {address}")
+
+    url = get_active_network().url
+    # Checks run in worker threads, several at once when triggers overlap
+    keeper = RaffleKeeper(ThreadLocalRPC(lambda: EthereumRPC(url)), addresses, submit)
+    print(f"Keeping {len(addresses)} raffles")
+    asyncio.run(keeper.run())
@@ -0,0 +1,138 @@
+"""
+Load generator for the raffle on boa's local pyevm.
+
+Drives enter_raffle from a pool of generated players across many raffles
+and rounds, settling every round through request_winner and the mock
+coordinator's fulfill_pending. One CSV row is written per round with entry
+throughput, gas per entry, p50/p99 wall time per enter_raffle call, the
+ledger slots the round occupies and the process RSS.
+
+Configured through environment variables (defaults in brackets):
+LOAD_RAFFLES [1], LOAD_ROUNDS [5], LOAD_ENTRIES [1000] per raffle and round,
+LOAD_PLAYERS [5000] distinct addresses, LOAD_TICKETS [1] tickets per entry,
+LOAD_SEED [0] for the mock's PRNG, LOAD_CSV [load_test.csv].
+"""
+import csv
+import os
+import resource
+import statistics
+import time
+import boa
+from src import raffle
+from src.mocks import mock_vrf_coordinator
+
+ENTRANCE_FEE = 10**16
+INTERVAL = 60
+CALLBACK_GAS_LIMIT = 500000
+CSV_FIELDS = [
+    "round",
+    "raffles",
+    "entries",
+    "tx_per_s",
+    "gas_per_entry",
+    "p50_ms",
+    "p99_ms",
+    "request_gas",
+    "fulfill_gas",
+    "ledger_slots",
+    "rss_mb",
+]
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_load(
+    raffle_count: int = 1,
+    rounds: int = 5,
+    entries_per_round: int = 1000,
+    player_count: int = 5000,
+    tickets_per_entry: int = 1,
+    seed: int = 0,
+) -> list[dict]:
+    """Run the load and return one result row per round."""
+    mock = mock_vrf_coordinator.deploy()
+    mock.set_seed(seed)
+    raffles = [
+        raffle.deploy(ENTRANCE_FEE, INTERVAL, mock.address, b"\x00" * 32, 1234, CALLBACK_GAS_LIMIT, [10000])
+        for _ in range(raffle_count)
+    ]
+    players = [boa.env.generate_address() for _ in range(player_count)]
+    for player in players:
+        boa.env.set_balance(player, 10**30)
+
+    rows = []
+    cursor = 0
+    value = ENTRANCE_FEE * tickets_per_entry
+    for round_number in range(rounds):
+        timings = []
+        gas_used = 0
+        started = time.perf_counter()
+        for raffle_contract in raffles:
+            for _ in range(entries_per_round):
+                with boa.env.prank(players[cursor % player_count]):
+                    call_start = time.perf_counter()
+                    raffle_contract.enter_raffle_many(tickets_per_entry, value=value)
+                    timings.append(time.perf_counter() - call_start)
+                gas_used += raffle_contract._computation.get_gas_used()
+                cursor += 1
+        elapsed = time.perf_counter() - started
+        ledger_slots = sum(r.get_entry_count() for r in raffles)
+
+        boa.env.time_travel(seconds=INTERVAL + 1)
+        request_gas = 0
+        for raffle_contract in raffles:
+            raffle_contract.request_winner()
+            request_gas += raffle_contract._computation.get_gas_used()
+        fulfill_gas = 0
+        while mock.pending_count() > 0:
+            mock.fulfill_pending(len(raffles))
+            fulfill_gas += mock._computation.get_gas_used()
+        assert all(r.get_raffle_state() == 0 for r in raffles), "A round failed to settle"
+
+        entries = len(timings)
+        rows.append({
+            "round": round_number,
+            "raffles": raffle_count,
+            "entries": entries,
+            "tx_per_s": round(entries / elapsed, 1),
+            "gas_per_entry": gas_used // entries,
+            "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+            "p99_ms": round(_percentile(timings, 99) * 1000, 3),
+            "request_gas": request_gas // raffle_count,
+            "fulfill_gas": fulfill_gas // raffle_count,
+            "ledger_slots": ledger_slots,
+            "rss_mb": round(_rss_mb(), 1),
+        })
+        print(", ".join(f"{k}={v}" for k, v in rows[-1].items()))
+    return rows
+
+
+def write_csv(rows: list[dict], path: str):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def moccasin_main() -> list[dict]:
+    rows = run_load(
+        raffle_count=int(os.environ.get("LOAD_RAFFLES", "1")),
+        rounds=int(os.environ.get("LOAD_ROUNDS", "5")),
+        entries_per_round=int(os.environ.get("LOAD_ENTRIES", "1000")),
+        player_count=int(os.environ.get("LOAD_PLAYERS", "5000")),
+        tickets_per_entry=int(os.environ.get("LOAD_TICKETS", "1")),
+        seed=int(os.environ.get("LOAD_SEED", "0")),
+    )
+    path = os.environ.get("LOAD_CSV", "load_test.csv")
+    write_csv(rows, path)
+    print(f"Wrote {len(rows)} rounds to {path}")
+    return rows
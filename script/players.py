@@ -0,0 +1,29 @@
+import os
+from typing import Iterator
+from moccasin.boa_tools import VyperContract
+from src import raffle
+
+PAGE_SIZE = 1000  # Matches MAX_PAGE_SIZE in raffle.vy
+
+
+def stream_players(raffle_contract: VyperContract, page_size: int = PAGE_SIZE) -> Iterator[str]:
+    """
+    Yield the owner of every ticket in the live round, one page per call.
+
+    The round is read from get_raffle_summary() up front; if a draw settles
+    while paging, the pages would mix two rounds, so that raises instead.
+    """
+    summary = raffle_contract.get_raffle_summary()
+    for start in range(0, summary.player_count, page_size):
+        yield from raffle_contract.get_players(start, page_size)
+    if raffle_contract.get_round_id() != summary.round_id:
+        raise RuntimeError(f"Round {summary.round_id} settled while reading its players")
+
+
+def moccasin_main() -> list[str]:
+    raffle_contract = raffle.at(os.environ["RAFFLE_ADDRESS"])
+    summary = raffle_contract.get_raffle_summary()
+    print(f"Round {summary.round_id}: {summary.player_count} tickets, state {summary.raffle_state}")
+    players = list(stream_players(raffle_contract))
+    print(f"Read {len(players)} tickets from {len(set(players))} players")
+    return players
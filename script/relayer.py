@@ -0,0 +1,239 @@
+"""
+Relay EIP-712 signed raffle entries in batches.
+
+Players deposit() ETH once, then sign an Entry(player, ticket_count, nonce,
+deadline) per purchase instead of sending a transaction. The relayer
+queues signed entries and sends them to enter_raffle_relayed in one
+transaction when `max_batch` are queued or the oldest has waited
+`max_wait` seconds, so the 21000 gas base cost is paid once per batch
+rather than once per entry.
+
+Configured through environment variables (defaults in brackets):
+RAFFLE_ADDRESS, RELAY_ENTRIES [-] JSON lines of signed entries, or - for
+stdin, RELAY_BATCH_SIZE [100], RELAY_MAX_WAIT [2.0] seconds.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import astuple, dataclass
+from typing import Callable
+from eth_abi import encode
+from eth_account import Account
+from eth_account.messages import SignableMessage
+from eth_utils import keccak, to_checksum_address
+from src import raffle
+
+RELAY_BATCH_SIZE = 100  # Matches MAX_RELAYED_ENTRIES in raffle.vy
+DOMAIN_TYPEHASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+ENTRY_TYPEHASH = keccak(text="Entry(address player,uint256 ticket_count,uint256 nonce,uint256 deadline)")
+DOMAIN_NAME = "Raffle"
+DOMAIN_VERSION = "1"
+
+
+@dataclass
+class SignedEntry:
+    player: str
+    ticket_count: int
+    nonce: int
+    deadline: int
+    v: int
+    r: bytes
+    s: bytes
+
+
+def domain_separator(raffle_address: str, chain_id: int) -> bytes:
+    """The raffle's EIP-712 domain separator, as its domain_separator() returns it."""
+    return keccak(encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [DOMAIN_TYPEHASH, keccak(text=DOMAIN_NAME), keccak(text=DOMAIN_VERSION), chain_id, raffle_address],
+    ))
+
+
+def entry_message(domain: bytes, player: str, ticket_count: int, nonce: int, deadline: int) -> SignableMessage:
+    """The EIP-712 message for an entry; wallets build the same one from the typed data."""
+    struct_hash = keccak(encode(
+        ["bytes32", "address", "uint256", "uint256", "uint256"],
+        [ENTRY_TYPEHASH, player, ticket_count, nonce, deadline],
+    ))
+    return SignableMessage(b"\x01", domain, struct_hash)
+
+
+def sign_entry(private_key, domain: bytes, ticket_count: int, nonce: int, deadline: int) -> SignedEntry:
+    """Authorize a relayer to buy `ticket_count` tickets from the signer's deposit."""
+    player = Account.from_key(private_key).address
+    signed = Account.sign_message(entry_message(domain, player, ticket_count, nonce, deadline), private_key)
+    return SignedEntry(
+        player, ticket_count, nonce, deadline, signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big")
+    )
+
+
+def recover_signer(entry: SignedEntry, domain: bytes) -> str:
+    message = entry_message(domain, entry.player, entry.ticket_count, entry.nonce, entry.deadline)
+    return Account.recover_message(message, vrs=(entry.v, entry.r, entry.s))
+
+
+class EntryRelayer:
+    """
+    Batches signed entries for one raffle into enter_raffle_relayed calls.
+
+    `domain` is the raffle's domain_separator(). Entries whose signature
+    does not recover to their player under it are refused on arrival, so
+    they never take up room in a batch. `submit` sends one batch and
+    returns the number of entries the raffle recorded; entries the raffle
+    skipped (spent nonce, passed deadline, short deposit) are dropped, not
+    retried. Entries stay queued until `submit` returns, so a batch whose
+    submission raises is sent again after `retry_delay`, doubling with each
+    consecutive failure. Resending a batch that did land is harmless: its
+    spent nonces are skipped.
+    """
+
+    def __init__(
+        self,
+        domain: bytes,
+        submit: Callable[[list[SignedEntry]], int],
+        max_batch: int = RELAY_BATCH_SIZE,
+        max_wait: float = 2.0,
+        retry_delay: float = 2.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.domain = domain
+        self.submit = submit
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.queued: list[tuple[float, SignedEntry]] = []  # (arrival time, entry), oldest first
+        self.recorded = 0
+        self.skipped = 0
+        self.failures = 0  # Consecutive failed submissions
+        self.retry_at = 0.0  # No batch is sent before this time after a failure
+
+    def add(self, entry: SignedEntry) -> bool:
+        """Queue an entry. Returns False if its signature is not its player's."""
+        try:
+            signer = recover_signer(entry, self.domain)
+        except Exception:
+            return False
+        if signer != to_checksum_address(entry.player):
+            return False
+        self.queued.append((self.clock(), entry))
+        return True
+
+    def due(self) -> bool:
+        if not self.queued or self.clock() < self.retry_at:
+            return False
+        return len(self.queued) >= self.max_batch or self.clock() - self.queued[0][0] >= self.max_wait
+
+    async def flush(self) -> int:
+        """
+        Send the oldest batch. Returns the number of entries the raffle recorded.
+
+        If `submit` raises, the batch stays queued and the error is raised.
+        """
+        batch = [entry for _, entry in self.queued[:self.max_batch]]
+        if not batch:
+            return 0
+        # The raffle only accepts each player's entries in nonce order
+        recorded = await asyncio.to_thread(self.submit, sorted(batch, key=lambda entry: entry.nonce))
+        # Entries added while submitting were appended, so the batch is still at the front
+        del self.queued[:len(batch)]
+        self.recorded += recorded
+        self.skipped += len(batch) - recorded
+        return recorded
+
+    async def _flush_or_back_off(self) -> bool:
+        """Flush one batch; on failure log it and hold off further batches. Returns whether it was sent."""
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Relaying {min(len(self.queued), self.max_batch)} entries failed: {e}")
+            self.retry_at = self.clock() + self.retry_delay * 2**self.failures
+            self.failures += 1
+            return False
+        self.failures = 0
+        return True
+
+    async def step(self) -> float:
+        """Flush every due batch. Returns seconds until the next batch could be due."""
+        while self.due():
+            if not await self._flush_or_back_off():
+                break
+        if not self.queued:
+            return self.max_wait
+        return max(self.queued[0][0] + self.max_wait - self.clock(), self.retry_at - self.clock(), 0.0)
+
+    async def drain(self, max_failures: int = 5) -> int:
+        """Flush everything queued, retrying failed batches. Returns the number of entries left unsent."""
+        self.failures = 0
+        while self.queued and self.failures < max_failures:
+            if not await self._flush_or_back_off():
+                await asyncio.sleep(max(self.retry_at - self.clock(), 0.0))
+        return len(self.queued)
+
+    async def run(self, entries: asyncio.Queue) -> int:
+        """
+        Relay entries from `entries` until a None is received, then drain the queue.
+
+        Returns the number of entries that could not be sent.
+        """
+        while True:
+            try:
+                delay = await self.step()
+            except Exception as e:
+                print(f"Relayer step failed: {e}")
+                delay = self.retry_delay
+            try:
+                entry = await asyncio.wait_for(entries.get(), timeout=delay)
+            except asyncio.TimeoutError:
+                continue
+            if entry is None:
+                break
+            self.add(entry)
+        return await self.drain()
+
+
+def entry_from_json(line: str) -> SignedEntry:
+    fields = json.loads(line)
+    return SignedEntry(
+        fields["player"],
+        int(fields["ticket_count"]),
+        int(fields["nonce"]),
+        int(fields["deadline"]),
+        int(fields["v"]),
+        bytes.fromhex(fields["r"].removeprefix("0x")),
+        bytes.fromhex(fields["s"].removeprefix("0x")),
+    )
+
+
+def moccasin_main() -> EntryRelayer:
+    raffle_contract = raffle.at(os.environ["RAFFLE_ADDRESS"])
+    path = os.environ.get("RELAY_ENTRIES", "-")
+
+    def submit(batch: list[SignedEntry]) -> int:
+        recorded = raffle_contract.enter_raffle_relayed([astuple(entry) for entry in batch])
+        print(f"Relayed {recorded} of {len(batch)} entries")
+        return recorded
+
+    relayer = EntryRelayer(
+        raffle_contract.domain_separator(),
+        submit,
+        max_batch=int(os.environ.get("RELAY_BATCH_SIZE", RELAY_BATCH_SIZE)),
+        max_wait=float(os.environ.get("RELAY_MAX_WAIT", "2.0")),
+    )
+
+    async def relay():
+        entries: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(relayer.run(entries))
+        source = sys.stdin if path == "-" else open(path)
+        with source:
+            while line := await asyncio.to_thread(source.readline):
+                if line.strip():
+                    await entries.put(entry_from_json(line))
+        await entries.put(None)
+        return await task
+
+    unsent = asyncio.run(relay())
+    print(f"Recorded {relayer.recorded} entries, skipped {relayer.skipped}, could not send {unsent}")
+    return relayer
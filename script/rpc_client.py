@@ -0,0 +1,230 @@
+"""
+Async reads of many raffles over one JSON-RPC endpoint.
+
+Getter calls made concurrently (e.g. under asyncio.gather) are queued and
+sent together: each flush resolves the block number once, then sends every
+queued eth_call pinned to that block in JSON-RPC batches of up to
+`batch_size`, in parallel from worker threads. Each thread gets its own
+EthereumRPC through ThreadLocalRPC, so each keeps its own keep-alive
+connection. Results are cached per block, so repeated reads within a block
+never leave the process.
+"""
+import asyncio
+import os
+import threading
+from collections import namedtuple
+from typing import Callable
+from eth_abi import decode, encode
+from eth_utils import keccak, to_checksum_address
+from boa.rpc import EthereumRPC, RPC, RPCError, to_hex, to_int
+from src import raffle
+
+RPC_BATCH_SIZE = 100  # Requests per JSON-RPC batch, below common provider limits
+CACHED_BLOCKS = 4  # Blocks whose results are kept
+
+
+def abi_type(item: dict) -> str:
+    if not item["type"].startswith("tuple"):
+        return item["type"]
+    return f"({','.join(abi_type(c) for c in item['components'])}){item['type'][len('tuple'):]}"
+
+
+def _struct(item: dict, value):
+    # Struct results come back with their field names, like boa's ABIContract
+    if item["type"] != "tuple":
+        return value
+    fields = namedtuple("Struct", [c["name"] for c in item["components"]])
+    return fields(*(_struct(c, v) for c, v in zip(item["components"], value)))
+
+
+def fetch_each(rpc: RPC, payloads: list[tuple[str, list]]) -> list:
+    """
+    Results of a JSON-RPC batch, with an RPCError in place of each call that failed.
+
+    RPC.fetch_multi raises on the first failed item, so a failed batch is
+    sent again one call at a time to tell which calls failed. Errors of the
+    request itself, such as a dropped connection, are raised.
+    """
+    try:
+        return rpc.fetch_multi(payloads)
+    except RPCError:
+        results = []
+        for method, params in payloads:
+            try:
+                results.append(rpc.fetch(method, params))
+            except RPCError as e:
+                results.append(e)
+        return results
+
+
+class ThreadLocalRPC(RPC):
+    """
+    An RPC that gives each calling thread its own instance from `make_rpc`.
+
+    EthereumRPC posts through one requests.Session, which is not safe to
+    share between threads, so code that fetches from worker threads wraps
+    it, e.g. ThreadLocalRPC(lambda: EthereumRPC(url)).
+    """
+
+    def __init__(self, make_rpc: Callable[[], RPC]):
+        self.make_rpc = make_rpc
+        self.local = threading.local()
+
+    @property
+    def rpc(self) -> RPC:
+        if not hasattr(self.local, "rpc"):
+            self.local.rpc = self.make_rpc()
+        return self.local.rpc
+
+    @property
+    def identifier(self) -> str:
+        return self.rpc.identifier
+
+    @property
+    def name(self) -> str:
+        return self.rpc.name
+
+    def fetch(self, method, params):
+        return self.rpc.fetch(method, params)
+
+    def fetch_multi(self, payloads):
+        return self.rpc.fetch_multi(payloads)
+
+
+def _resolve(future: asyncio.Future, result):
+    # A caller cancelled while its call was queued has already given up on it
+    if future.done():
+        return
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+class ViewFunction:
+    def __init__(self, client: "AsyncRaffleClient", address: str, abi: dict):
+        self.client = client
+        self.address = address
+        self.abi = abi
+        self.input_types = [abi_type(i) for i in abi["inputs"]]
+        self.output_types = [abi_type(o) for o in abi["outputs"]]
+        signature = f"{abi['name']}({','.join(self.input_types)})"
+        self.selector = keccak(text=signature)[:4]
+
+    async def __call__(self, *args, block: int | None = None):
+        data = to_hex(self.selector + encode(self.input_types, list(args)))
+        result = await self.client.call(self.address, data, block)
+        values = decode(self.output_types, bytes.fromhex(result[2:]))
+        values = [_struct(o, v) for o, v in zip(self.abi["outputs"], values)]
+        return values[0] if len(values) == 1 else tuple(values)
+
+
+class ContractReader:
+    """The view functions of one deployed contract, as coroutines."""
+
+    def __init__(self, client: "AsyncRaffleClient", address: str, abi: list[dict]):
+        self.address = to_checksum_address(address)
+        for item in abi:
+            if item["type"] == "function" and item["stateMutability"] in ("view", "pure"):
+                setattr(self, item["name"], ViewFunction(client, self.address, item))
+
+
+class AsyncRaffleClient:
+    """
+    Coalesces concurrent eth_calls into block-pinned JSON-RPC batches.
+
+    Batches are fetched from several worker threads at once, so `rpc` must
+    not share a connection between threads: wrap EthereumRPC in a
+    ThreadLocalRPC.
+    """
+
+    def __init__(self, rpc: RPC, abi: list[dict] | None = None, batch_size: int = RPC_BATCH_SIZE):
+        self.rpc = rpc
+        self.abi = abi if abi is not None else raffle.abi
+        self.batch_size = batch_size
+        self.cache: dict[int, dict[tuple[str, str], str]] = {}
+        self.queued: list[tuple[str, str, int | None, asyncio.Future]] = []
+        self.flush_task: asyncio.Task | None = None
+        self.readers: dict[str, ContractReader] = {}
+
+    def at(self, address: str) -> ContractReader:
+        address = to_checksum_address(address)
+        if address not in self.readers:
+            self.readers[address] = ContractReader(self, address, self.abi)
+        return self.readers[address]
+
+    async def call(self, address: str, data: str, block: int | None = None) -> str:
+        """Raw eth_call result, batched with every other call made before the next flush."""
+        future = asyncio.get_running_loop().create_future()
+        self.queued.append((address, data, block, future))
+        if self.flush_task is None:
+            # Runs once the callers that are ready now have all queued their calls
+            self.flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        await asyncio.sleep(0)
+        queued, self.queued, self.flush_task = self.queued, [], None
+        try:
+            await self._answer(queued)
+        except Exception as e:
+            for *_, future in queued:
+                _resolve(future, e)
+        finally:
+            # A short reply or a bug above must not leave any caller waiting forever
+            for *_, future in queued:
+                _resolve(future, RuntimeError("eth_call was not answered"))
+
+    async def _answer(self, queued: list[tuple[str, str, int | None, asyncio.Future]]):
+        latest = None
+        if any(block is None for _, _, block, _ in queued):
+            latest = to_int(await asyncio.to_thread(self.rpc.fetch, "eth_blockNumber", []))
+
+        # Serve what is cached and send each distinct call once
+        missing: dict[tuple[int, str, str], list[asyncio.Future]] = {}
+        for address, data, block, future in queued:
+            block = latest if block is None else block
+            cached = self.cache.get(block, {}).get((address, data))
+            if cached is not None:
+                _resolve(future, cached)
+            else:
+                missing.setdefault((block, address, data), []).append(future)
+        calls = list(missing)
+        batches = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._fetch_batch, b) for b in batches), return_exceptions=True
+        )
+
+        for batch, batch_results in zip(batches, results):
+            if isinstance(batch_results, Exception):
+                # The request itself failed, so every call in it did
+                batch_results = [batch_results] * len(batch)
+            for (block, address, data), result in zip(batch, batch_results):
+                for future in missing[(block, address, data)]:
+                    _resolve(future, result)
+                if not isinstance(result, Exception):
+                    self.cache.setdefault(block, {})[(address, data)] = result
+        for block in sorted(self.cache)[:-CACHED_BLOCKS]:
+            del self.cache[block]
+
+    def _fetch_batch(self, batch: list[tuple[int, str, str]]) -> list:
+        return fetch_each(
+            self.rpc, [("eth_call", [{"to": address, "data": data}, to_hex(block)]) for block, address, data in batch]
+        )
+
+
+async def read_summaries(client: AsyncRaffleClient, addresses: list[str]) -> list:
+    return await asyncio.gather(*(client.at(a).get_raffle_summary() for a in addresses))
+
+
+def moccasin_main():
+    from moccasin.config import get_active_network
+
+    addresses = [a.strip() for a in os.environ["RAFFLE_ADDRESSES"].split(",") if a.strip()]
+    url = get_active_network().url
+    client = AsyncRaffleClient(ThreadLocalRPC(lambda: EthereumRPC(url)))
+    for address, summary in zip(addresses, asyncio.run(read_summaries(client, addresses))):
+        print(
+            f"{address}: round {summary.round_id}, state {summary.raffle_state}, "
+            f"{summary.player_count} tickets, balance {summary.balance}"
+        )
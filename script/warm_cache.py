@@ -0,0 +1,51 @@
+"""
+Compile every contract under src/ into boa's artifact cache.
+
+`from src import raffle` and friends go through boa.load_partial, which
+keeps compiled artifacts (ABI, bytecode, layout) in a content-addressed
+cache under ~/.cache/titanoboa, keyed by the source and compiler version.
+Once warm, imports in tests and scripts load from it instead of compiling.
+Run this once in CI before the tests and persist that directory between
+runs; a source or compiler change simply misses and recompiles.
+"""
+import hashlib
+import time
+from pathlib import Path
+import boa
+from boa import interpret
+
+CONTRACTS_DIR = Path(__file__).parent.parent / "src"
+
+
+def _cached_artifacts() -> int:
+    cache = interpret._disk_cache
+    if cache is None or not cache.cache_dir.exists():
+        return 0
+    return sum(1 for _ in cache.cache_dir.rglob("*.pickle"))
+
+
+def warm_cache(contracts_dir: Path = CONTRACTS_DIR) -> list[dict]:
+    """Load every .vy file under contracts_dir; returns what was compiled and what was already cached."""
+    results = []
+    for path in sorted(contracts_dir.rglob("*.vy")):
+        before = _cached_artifacts()
+        started = time.perf_counter()
+        boa.load_partial(str(path))
+        results.append({
+            "contract": str(path.relative_to(contracts_dir)),
+            "source_hash": hashlib.sha256(path.read_bytes()).hexdigest()[:16],
+            "compiled": _cached_artifacts() > before,
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+    return results
+
+
+def moccasin_main() -> list[dict]:
+    if interpret._disk_cache is None:
+        raise RuntimeError("boa's artifact cache is disabled")
+    results = warm_cache()
+    for r in results:
+        status = "compiled" if r["compiled"] else "cached"
+        print(f"{r['contract']} ({r['source_hash']}): {status} in {r['seconds']}s")
+    print(f"Artifact cache: {interpret._disk_cache.cache_dir}")
+    return results
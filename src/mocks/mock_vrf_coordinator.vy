@@ -1,15 +1,42 @@
 # @version ^0.4.0
 
+MAX_WORDS: constant(uint256) = 5
+MAX_FULFILL_BATCH: constant(uint256) = 256  # Requests answered by one fulfill_pending call
+
 interface VRFConsumer:
-    def fulfill_random_words(requestId: uint256, randomWords: DynArray[uint256, 1]): nonpayable
+    def fulfill_random_words(requestId: uint256, randomWords: DynArray[uint256, MAX_WORDS]): nonpayable
+
+struct Request:
+    consumer: address
+    num_words: uint32
+    callback_gas_limit: uint32
+    ready_block: uint256  # First block fulfill_pending may answer it in
+    fulfilled: bool
+
+# Requests are queued in id order; ids start at 1
+requests: public(HashMap[uint256, Request])
+request_count: public(uint256)
+fulfilled_count: public(uint256)
+next_pending: public(uint256)  # Oldest request fulfill_pending has not passed yet
+fulfill_delay: public(uint256)  # Blocks between a request and its earliest fulfillment
+seed: public(uint256)  # PRNG seed for fulfill_pending
 
-# Store last request
-last_request_id: public(uint256)
-consumer_address: public(address)
+event RandomWordsFulfilled:
+    request_id: indexed(uint256)
+    consumer: indexed(address)
+    success: bool
 
 @deploy
 def __init__():
-    pass
+    self.next_pending = 1
+
+@external
+def set_seed(seed: uint256):
+    self.seed = seed
+
+@external
+def set_fulfill_delay(blocks: uint256):
+    self.fulfill_delay = blocks
 
 @external
 def requestRandomWords(
@@ -19,13 +46,89 @@ def requestRandomWords(
     callbackGasLimit: uint32,
     numWords: uint32
 ) -> uint256:
-    # Store request info instead of immediately calling back
-    self.last_request_id = block.timestamp
-    self.consumer_address = msg.sender
-    return self.last_request_id
+    # Queue the request instead of immediately calling back
+    request_id: uint256 = self.request_count + 1
+    self.request_count = request_id
+    self.requests[request_id].consumer = msg.sender
+    self.requests[request_id].num_words = numWords
+    self.requests[request_id].callback_gas_limit = callbackGasLimit
+    self.requests[request_id].ready_block = block.number + self.fulfill_delay
+    return request_id
+
+# Most recent request, for single-raffle tests
+@external
+@view
+def last_request_id() -> uint256:
+    return self.request_count
+
+@external
+@view
+def consumer_address() -> address:
+    return self.requests[self.request_count].consumer
+
+@external
+@view
+def last_num_words() -> uint32:
+    return self.requests[self.request_count].num_words
+
+@external
+@view
+def pending_count() -> uint256:
+    return self.request_count - self.fulfilled_count
+
+@external
+def fulfill_pending(max_count: uint256) -> uint256:
+    """
+    @notice Answer up to max_count queued requests, oldest first
+    @dev Words come from the seed and the request id, so a run is
+         reproducible whatever order requests are answered in. Each
+         callback gets the gas limit its consumer asked for, and a
+         reverting consumer is logged rather than blocking the queue.
+    @return Number of requests answered
+    """
+    answered: uint256 = 0
+    request_id: uint256 = self.next_pending
+    for i: uint256 in range(MAX_FULFILL_BATCH):
+        if answered >= max_count or request_id > self.request_count:
+            break
+        request: Request = self.requests[request_id]
+        if not request.fulfilled:
+            if block.number < request.ready_block:
+                break
+            words: DynArray[uint256, MAX_WORDS] = self._random_words(self.seed, request_id, request.num_words)
+            self.requests[request_id].fulfilled = True
+            self.fulfilled_count += 1
+            success: bool = raw_call(
+                request.consumer,
+                abi_encode(request_id, words, method_id=method_id("fulfill_random_words(uint256,uint256[])")),
+                gas=convert(request.callback_gas_limit, uint256),
+                revert_on_failure=False
+            )
+            log RandomWordsFulfilled(request_id, request.consumer, success)
+            answered += 1
+        request_id += 1
+    self.next_pending = request_id
+    return answered
 
 # Add manual callback method for testing
 @external
 def callBackWithRandomness(random_value: uint256):
-    random_words: DynArray[uint256, 1] = [random_value]
-    extcall VRFConsumer(self.consumer_address).fulfill_random_words(self.last_request_id, random_words)
\ No newline at end of file
+    # Answers the most recent request; the first word is random_value itself
+    request_id: uint256 = self.request_count
+    request: Request = self.requests[request_id]
+    if not request.fulfilled:
+        self.requests[request_id].fulfilled = True
+        self.fulfilled_count += 1
+    random_words: DynArray[uint256, MAX_WORDS] = self._random_words(random_value, request_id, request.num_words)
+    random_words[0] = random_value
+    extcall VRFConsumer(request.consumer).fulfill_random_words(request_id, random_words)
+
+@internal
+@pure
+def _random_words(seed: uint256, request_id: uint256, num_words: uint32) -> DynArray[uint256, MAX_WORDS]:
+    words: DynArray[uint256, MAX_WORDS] = []
+    for i: uint256 in range(MAX_WORDS):
+        if i >= convert(num_words, uint256):
+            break
+        words.append(convert(keccak256(abi_encode(seed, request_id, i)), uint256))
+    return words
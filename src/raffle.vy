@@ -17,9 +17,70 @@ interface VRFCoordinatorV2_5:
 
 # Constants
 REQUEST_CONFIRMATIONS: constant(uint16) = 3
-NUM_WORDS: constant(uint32) = 1
+MAX_PRIZE_TIERS: constant(uint256) = 5  # One VRF word and one winner per tier
+BPS: constant(uint256) = 10000  # Prize tiers are shares of the pot in basis points
 RAFFLE_STATE_OPEN: constant(uint256) = 0
 RAFFLE_STATE_CALCULATING: constant(uint256) = 1
+ENTRY_END_SHIFT: constant(uint256) = 160  # Packed entry: player in the low 160 bits, range end above
+MAX_SEARCH_STEPS: constant(uint256) = 96  # Ticket totals fit in 96 bits, so the search ends sooner
+ROUND_BUFFERS: constant(uint256) = 2  # Live round plus the round filling while a draw is pending
+MAX_PAGE_SIZE: constant(uint256) = 1000  # Upper bound on players returned by one get_players call
+ROUND_HISTORY_SIZE: constant(uint256) = 32  # Settled rounds kept on-chain
+ROUND_HISTORY_SLOTS: constant(uint256) = ROUND_HISTORY_SIZE + 1  # One extra for the round being drawn
+SETTLED_AT_SHIFT: constant(uint256) = 160  # Round settlement: winner in the low 160 bits, settlement time above
+HALF_SHIFT: constant(uint256) = 128
+# Round state slot: recent winner in the low 160 bits, then these fields
+TIMESTAMP_SHIFT: constant(uint256) = 160  # 40-bit last reset time
+STATE_SHIFT: constant(uint256) = 200  # 8-bit raffle state
+ROUND_ID_SHIFT: constant(uint256) = 208  # 48-bit round id
+TIMESTAMP_MASK: constant(uint256) = (1 << 40) - 1
+STATE_MASK: constant(uint256) = (1 << 8) - 1
+HALF_MASK: constant(uint256) = (1 << HALF_SHIFT) - 1
+MAX_RELAYED_ENTRIES: constant(uint256) = 100  # Signed entries per enter_raffle_relayed call
+# EIP-712 signed entries
+DOMAIN_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+DOMAIN_NAME_HASH: constant(bytes32) = keccak256("Raffle")
+DOMAIN_VERSION_HASH: constant(bytes32) = keccak256("1")
+ENTRY_TYPEHASH: constant(bytes32) = keccak256("Entry(address player,uint256 ticket_count,uint256 nonce,uint256 deadline)")
+
+struct RaffleSummary:
+    raffle_state: uint256
+    round_id: uint256
+    player_count: uint256
+    entry_count: uint256
+    pending_player_count: uint256
+    last_timestamp: uint256
+    recent_winner: address
+    entrance_fee: uint256
+    interval: uint256
+    balance: uint256
+
+struct UpkeepStatus:
+    upkeep_needed: bool  # Whether request_winner would succeed now
+    blocked_by: String[32]  # Revert reason request_winner would give, empty when ready
+    callable_at: uint256  # Earliest timestamp the interval allows a draw
+
+struct RoundRecord:
+    request_id: uint256
+    draw: uint256  # Packed (prize, player count), written by request_winner
+    settlement: uint256  # Packed (winner, timestamp), the only write in fulfill_random_words
+
+struct SignedEntry:
+    player: address
+    ticket_count: uint256
+    nonce: uint256  # Must equal the player's next nonce
+    deadline: uint256  # Last timestamp the entry may be recorded at
+    v: uint8
+    r: bytes32
+    s: bytes32
+
+struct RoundResult:
+    round_id: uint256
+    winner: address
+    prize: uint256
+    player_count: uint256
+    request_id: uint256
+    timestamp: uint256
 
 # Immutable config (set at deployment)
 entrance_fee: immutable(uint256)
@@ -28,13 +89,25 @@ vrf_coordinator: immutable(VRFCoordinatorV2_5)
 gas_lane: immutable(bytes32)  # Key hash for VRF
 subscription_id: immutable(uint64)  # Chainlink subscription ID
 callback_gas_limit: immutable(uint32)
+prize_tiers: immutable(DynArray[uint256, MAX_PRIZE_TIERS])  # Pot share per winner, in basis points
 
 # State variables
-players: public(HashMap[uint256, address])  # Player index -> address
-player_count: public(uint256)  # Total number of players
-last_timestamp: public(uint256)  # Last raffle reset time
-recent_winner: public(address)  # Most recent winner
-raffle_state: public(uint256)  # 0 = OPEN, 1 = CALCULATING
+# Round ledgers are keyed by round_id % ROUND_BUFFERS, so slots are reused every other round
+entries: HashMap[uint256, HashMap[uint256, uint256]]  # Buffer -> entry index -> packed (player, cumulative tickets)
+ledger: HashMap[uint256, uint256]  # Buffer -> packed (number of purchases, total number of tickets)
+# Packed (recent_winner, last_timestamp, raffle_state, round_id): entering
+# and settling read and write one slot instead of four
+round_state: uint256
+# Packed (pending pot, deposit total): ETH paid into the next round while a
+# draw is pending, and ETH deposited for relayed entries. Both are excluded
+# from the pot, so drawing reads one slot for them
+held_funds: uint256
+winnings: HashMap[address, uint256]  # Prizes credited but not yet withdrawn
+unclaimed_winnings: public(uint256)  # Sum of all credited winnings, excluded from the pot
+round_history: HashMap[uint256, RoundRecord]  # round_id % ROUND_HISTORY_SLOTS -> record
+# Player -> packed (deposit, next entry nonce). A relayed entry updates one
+# slot that is already non-zero instead of setting a fresh nonce slot
+accounts: HashMap[address, uint256]
 
 @deploy
 @payable
@@ -44,7 +117,8 @@ def __init__(
     _vrf_coordinator: address,
     _gas_lane: bytes32,
     _subscription_id: uint64,
-    _callback_gas_limit: uint32
+    _callback_gas_limit: uint32,
+    _prize_tiers: DynArray[uint256, MAX_PRIZE_TIERS]
 ):
     """
     @notice Initialize the raffle contract
@@ -54,31 +128,235 @@ def __init__(
     @param _gas_lane Gas lane key hash for VRF
     @param _subscription_id Chainlink subscription ID
     @param _callback_gas_limit Gas limit for VRF callback
+    @param _prize_tiers Pot share of each winner in basis points, e.g. [6000, 3000, 1000]
     """
+    assert _entrance_fee > 0, "Entrance fee must be positive"
+    assert len(_prize_tiers) > 0, "No prize tiers"
+    tier_total: uint256 = 0
+    for tier: uint256 in _prize_tiers:
+        assert tier > 0, "Empty prize tier"
+        tier_total += tier
+    assert tier_total == BPS, "Prize tiers must sum to 10000"
     entrance_fee = _entrance_fee
     interval = _interval
     vrf_coordinator = VRFCoordinatorV2_5(_vrf_coordinator)
     gas_lane = _gas_lane
     subscription_id = _subscription_id
     callback_gas_limit = _callback_gas_limit
-    self.raffle_state = RAFFLE_STATE_OPEN
-    self.last_timestamp = block.timestamp
+    prize_tiers = _prize_tiers
+    self.round_state = self._pack_round_state(empty(address), block.timestamp, RAFFLE_STATE_OPEN, 0)
 
 # At the bottom of raffle.vy
 event EnteredRaffle:
     player: indexed(address)
+    round_id: indexed(uint256)
+    ticket_index: uint256  # First ticket of the purchase
+    ticket_count: uint256
+    amount: uint256
 
 @external
 @payable
 def enter_raffle():
     """
     @notice Enter the raffle by paying the entrance fee
+    @dev Every whole multiple of the entrance fee buys one ticket
     """
     assert msg.value >= entrance_fee, "Not enough ETH sent"
-    assert self.raffle_state == RAFFLE_STATE_OPEN, "Raffle not open"
-    self.players[self.player_count] = msg.sender
-    self.player_count += 1
-    log EnteredRaffle(msg.sender)
+    self._enter(msg.sender, msg.value // entrance_fee, msg.value)
+
+@external
+@payable
+def enter_raffle_many(ticket_count: uint256):
+    """
+    @notice Buy several tickets in one transaction
+    @param ticket_count Number of tickets to buy
+    """
+    assert ticket_count > 0, "Must buy at least one ticket"
+    assert msg.value >= ticket_count * entrance_fee, "Not enough ETH sent"
+    self._enter(msg.sender, ticket_count, msg.value)
+
+@internal
+def _enter(player: address, ticket_count: uint256, amount: uint256):
+    """
+    @dev Record a purchase as one range of consecutive ticket numbers.
+         While a draw is pending the purchase goes into the next round.
+    """
+    round_state: uint256 = self.round_state
+    round: uint256 = round_state >> ROUND_ID_SHIFT
+    if (round_state >> STATE_SHIFT) & STATE_MASK == RAFFLE_STATE_CALCULATING:
+        round += 1
+        self.held_funds += amount  # Pending pot, in the low half
+    buffer: uint256 = round % ROUND_BUFFERS
+    ledger: uint256 = self.ledger[buffer]
+    entry_index: uint256 = ledger & HALF_MASK
+    ticket_end: uint256 = (ledger >> HALF_SHIFT) + ticket_count
+    assert ticket_end < 1 << (256 - ENTRY_END_SHIFT), "Too many tickets"
+    self.entries[buffer][entry_index] = convert(player, uint256) | (ticket_end << ENTRY_END_SHIFT)
+    self.ledger[buffer] = (entry_index + 1) | (ticket_end << HALF_SHIFT)
+    log EnteredRaffle(player, round, ticket_end - ticket_count, ticket_count, amount)
+
+@external
+@payable
+def deposit():
+    """
+    @notice Prepay ETH for entries a relayer records on your behalf
+    @dev Deposits stay out of the pot until a relayed entry spends them
+    """
+    assert msg.value > 0, "Nothing to deposit"
+    account: uint256 = self.accounts[msg.sender]
+    assert (account & HALF_MASK) + msg.value <= HALF_MASK, "Deposit too large"
+    self.accounts[msg.sender] = account + msg.value
+    self.held_funds += msg.value << HALF_SHIFT
+    log Deposited(msg.sender, msg.value)
+
+@external
+@nonreentrant
+def withdraw_deposit(amount: uint256):
+    """
+    @notice Take back deposited ETH that no entry has spent
+    @dev Signed entries that the remaining deposit cannot pay for are skipped
+    """
+    account: uint256 = self.accounts[msg.sender]
+    assert amount > 0 and amount <= account & HALF_MASK, "Not enough deposited"
+    self.accounts[msg.sender] = account - amount
+    self.held_funds -= amount << HALF_SHIFT
+    raw_call(msg.sender, b"", value=amount)
+    log WithdrewDeposit(msg.sender, amount)
+
+@external
+def enter_raffle_relayed(entries: DynArray[SignedEntry, MAX_RELAYED_ENTRIES]) -> uint256:
+    """
+    @notice Record a batch of EIP-712 signed entries, each paid from its player's deposit
+    @dev Anyone can relay. An entry with a bad signature, a nonce other
+         than the player's next one, a passed deadline or a deposit too
+         small to pay for it is skipped rather than reverting the batch,
+         so one player cannot void everyone else's entries. Round state,
+         the ledger and the held funds are read and written once per batch.
+    @param entries Signed entries, in nonce order for each player
+    @return Number of entries recorded
+    """
+    domain_separator: bytes32 = self._domain_separator()
+    round_state: uint256 = self.round_state
+    round: uint256 = round_state >> ROUND_ID_SHIFT
+    calculating: bool = (round_state >> STATE_SHIFT) & STATE_MASK == RAFFLE_STATE_CALCULATING
+    if calculating:
+        round += 1
+    buffer: uint256 = round % ROUND_BUFFERS
+    ledger: uint256 = self.ledger[buffer]
+    entry_index: uint256 = ledger & HALF_MASK
+    ticket_end: uint256 = ledger >> HALF_SHIFT
+    spent: uint256 = 0
+
+    for entry: SignedEntry in entries:
+        account: uint256 = self.accounts[entry.player]
+        if entry.nonce != account >> HALF_SHIFT or block.timestamp > entry.deadline:
+            continue
+        if entry.ticket_count == 0 or entry.ticket_count > (account & HALF_MASK) // entrance_fee:
+            continue
+        struct_hash: bytes32 = keccak256(abi_encode(ENTRY_TYPEHASH, entry.player, entry.ticket_count, entry.nonce, entry.deadline))
+        digest: bytes32 = keccak256(concat(b"\x19\x01", domain_separator, struct_hash))
+        # A zero player would match ecrecover's result for an invalid signature
+        if entry.player == empty(address) or ecrecover(digest, entry.v, entry.r, entry.s) != entry.player:
+            continue
+        cost: uint256 = entry.ticket_count * entrance_fee
+        self.accounts[entry.player] = account - cost + (1 << HALF_SHIFT)
+        ticket_end += entry.ticket_count
+        self.entries[buffer][entry_index] = convert(entry.player, uint256) | (ticket_end << ENTRY_END_SHIFT)
+        entry_index += 1
+        spent += cost
+        log RelayedEntry(entry.player, entry.nonce, cost)
+        log EnteredRaffle(entry.player, round, ticket_end - entry.ticket_count, entry.ticket_count, cost)
+
+    recorded: uint256 = entry_index - (ledger & HALF_MASK)
+    if recorded == 0:
+        return 0
+    assert ticket_end < 1 << (256 - ENTRY_END_SHIFT), "Too many tickets"
+    self.ledger[buffer] = entry_index | (ticket_end << HALF_SHIFT)
+    # Spent deposits join the live pot, or the pending pot during a draw
+    held_funds: uint256 = self.held_funds - (spent << HALF_SHIFT)
+    if calculating:
+        held_funds += spent
+    self.held_funds = held_funds
+    return recorded
+
+@internal
+@view
+def _domain_separator() -> bytes32:
+    # Built per call rather than cached, so signatures stay bound to the current chain after a fork
+    return keccak256(abi_encode(DOMAIN_TYPEHASH, DOMAIN_NAME_HASH, DOMAIN_VERSION_HASH, chain.id, self))
+
+@internal
+@pure
+def _entry_player(packed_entry: uint256) -> address:
+    return convert(packed_entry & convert(max_value(uint160), uint256), address)
+
+@internal
+@pure
+def _pack_round_state(winner: address, timestamp: uint256, state: uint256, round: uint256) -> uint256:
+    return convert(winner, uint256) | (timestamp << TIMESTAMP_SHIFT) | (state << STATE_SHIFT) | (round << ROUND_ID_SHIFT)
+
+@internal
+@view
+def _round_id() -> uint256:
+    return self.round_state >> ROUND_ID_SHIFT
+
+@internal
+@view
+def _raffle_state() -> uint256:
+    return (self.round_state >> STATE_SHIFT) & STATE_MASK
+
+@internal
+@view
+def _last_timestamp() -> uint256:
+    return (self.round_state >> TIMESTAMP_SHIFT) & TIMESTAMP_MASK
+
+@internal
+@view
+def _entry_count(buffer: uint256) -> uint256:
+    return self.ledger[buffer] & HALF_MASK
+
+@internal
+@view
+def _player_count(buffer: uint256) -> uint256:
+    return self.ledger[buffer] >> HALF_SHIFT
+
+@internal
+@view
+def _find_entry(buffer: uint256, ticket: uint256) -> uint256:
+    """
+    @dev Binary search for the first entry whose range ends after `ticket`
+    """
+    low: uint256 = 0
+    high: uint256 = self._entry_count(buffer) - 1
+    for i: uint256 in range(MAX_SEARCH_STEPS):
+        if low >= high:
+            break
+        mid: uint256 = (low + high) // 2
+        if self.entries[buffer][mid] >> ENTRY_END_SHIFT > ticket:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+@internal
+@view
+def _ticket_owner(buffer: uint256, ticket: uint256) -> address:
+    return self._entry_player(self.entries[buffer][self._find_entry(buffer, ticket)])
+
+@internal
+@view
+def _player(index: uint256) -> address:
+    buffer: uint256 = self._round_id() % ROUND_BUFFERS
+    if index >= self._player_count(buffer):
+        return empty(address)
+    return self._ticket_owner(buffer, index)
+
+@internal
+@view
+def _pending_player_count() -> uint256:
+    if self._raffle_state() != RAFFLE_STATE_CALCULATING:
+        return 0
+    return self._player_count((self._round_id() + 1) % ROUND_BUFFERS)
 
 
 
@@ -87,40 +365,206 @@ def request_winner():
     """
     @notice Request a random winner (anyone can call after interval)
     """
-    assert (block.timestamp - self.last_timestamp) >= interval, "Time interval not passed"
-    assert self.raffle_state == RAFFLE_STATE_OPEN, "Raffle not open"
-    assert self.player_count > 0, "No players in raffle"
-    assert self.balance > 0, "No ETH in contract"
+    blocked_by: String[32] = self._upkeep_blocker()
+    assert len(blocked_by) == 0, blocked_by
 
-    self.raffle_state = RAFFLE_STATE_CALCULATING
+    round_state: uint256 = self.round_state
+    round: uint256 = round_state >> ROUND_ID_SHIFT
+    self.round_state = round_state | (RAFFLE_STATE_CALCULATING << STATE_SHIFT)
     request_id: uint256 = extcall vrf_coordinator.requestRandomWords(
         gas_lane,
         subscription_id,
         REQUEST_CONFIRMATIONS,
         callback_gas_limit,
-        NUM_WORDS
+        convert(len(prize_tiers), uint32)
     )
-    log RequestedWinner(request_id)
+    # Everything but the winner is fixed once the round closes, so it is
+    # recorded here rather than in the gas-limited callback
+    record_index: uint256 = round % ROUND_HISTORY_SLOTS
+    self.round_history[record_index].request_id = request_id
+    prize: uint256 = self.balance - self.unclaimed_winnings - (self.held_funds >> HALF_SHIFT)
+    self.round_history[record_index].draw = prize | (self._player_count(round % ROUND_BUFFERS) << HALF_SHIFT)
+    log RequestedWinner(request_id, round)
+
+@internal
+@view
+def _upkeep_blocker() -> String[32]:
+    """
+    @dev The first condition stopping request_winner, checked in revert order
+    """
+    if block.timestamp < self._last_timestamp() + interval:
+        return "Time interval not passed"
+    if self._raffle_state() != RAFFLE_STATE_OPEN:
+        return "Raffle not open"
+    if self._player_count(self._round_id() % ROUND_BUFFERS) == 0:
+        return "No players in raffle"
+    if self.balance <= self.unclaimed_winnings + (self.held_funds >> HALF_SHIFT):
+        return "No ETH in contract"
+    return ""
+
+@external
+@nonreentrant
+def fulfill_random_words(request_id: uint256, random_words: DynArray[uint256, MAX_PRIZE_TIERS]):
+    """
+    @notice Chainlink VRF callback to pick the winners and credit their prizes
+    @dev Called by VRF Coordinator, must be public and match signature.
+         Only the closed round is drawn; entries buffered during the
+         draw become the next live round. Each word draws a distinct
+         ticket for one prize tier; with fewer tickets than tiers the
+         last winner also takes the unawarded tiers. Prizes are only
+         credited, winners collect them with withdraw(), so no winner
+         can make the callback revert or run out of gas.
+    """
+    round_state: uint256 = self.round_state
+    assert (round_state >> STATE_SHIFT) & STATE_MASK == RAFFLE_STATE_CALCULATING, "Not calculating winner"
+    round: uint256 = round_state >> ROUND_ID_SHIFT
+    buffer: uint256 = round % ROUND_BUFFERS
+    ticket_total: uint256 = self.ledger[buffer] >> HALF_SHIFT
+    winner_count: uint256 = min(len(prize_tiers), ticket_total)
+    assert len(random_words) >= winner_count, "Not enough random words"
+    tickets: DynArray[uint256, MAX_PRIZE_TIERS] = self._draw_tickets(ticket_total, random_words, winner_count)
+
+    held_funds: uint256 = self.held_funds
+    prize: uint256 = self.balance - (held_funds & HALF_MASK) - (held_funds >> HALF_SHIFT) - self.unclaimed_winnings
+    winners: DynArray[address, MAX_PRIZE_TIERS] = []
+    amounts: DynArray[uint256, MAX_PRIZE_TIERS] = []
+    paid: uint256 = 0
+    for tier: uint256 in range(winner_count, bound=MAX_PRIZE_TIERS):
+        amount: uint256 = prize - paid
+        if tier < winner_count - 1:
+            amount = prize * prize_tiers[tier] // BPS
+        paid += amount
+        winners.append(self._ticket_owner(buffer, tickets[tier]))
+        amounts.append(amount)
+    winner: address = winners[0]
+    self.round_state = self._pack_round_state(winner, block.timestamp, RAFFLE_STATE_OPEN, round + 1)
+    self.round_history[round % ROUND_HISTORY_SLOTS].settlement = convert(winner, uint256) | (block.timestamp << SETTLED_AT_SHIFT)
+    self.ledger[buffer] = 0  # Reset players
+    self.held_funds = held_funds >> HALF_SHIFT << HALF_SHIFT  # Empty the pending pot, keep deposits
+
+    # Credit prizes
+    for tier: uint256 in range(winner_count, bound=MAX_PRIZE_TIERS):
+        self.winnings[winners[tier]] += amounts[tier]
+        log PaidPrize(winners[tier], tier, amounts[tier])
+    self.unclaimed_winnings += prize
+    log PickedWinner(winner, round, request_id, prize, ticket_total)
 
 @external
 @nonreentrant
-def fulfill_random_words(request_id: uint256, random_words: DynArray[uint256, 1]):
-    """
-    @notice Chainlink VRF callback to pick and pay the winner
-    @dev Called by VRF Coordinator, must be public and match signature
-    """
-    assert self.raffle_state == RAFFLE_STATE_CALCULATING, "Not calculating winner"
-    winner_index: uint256 = random_words[0] % self.player_count
-    winner: address = self.players[winner_index]
-    self.recent_winner = winner
-    self.raffle_state = RAFFLE_STATE_OPEN
-    self.last_timestamp = block.timestamp
-    self.player_count = 0  # Reset players
-
-    # Send prize
-    send(winner, self.balance)
-    log PickedWinner(winner)
+def withdraw():
+    """
+    @notice Collect all prizes credited to the caller
+    @dev Forwards all gas, so contract winners can run their receive hooks
+    """
+    amount: uint256 = self.winnings[msg.sender]
+    assert amount > 0, "No winnings to withdraw"
+    self.winnings[msg.sender] = 0
+    self.unclaimed_winnings -= amount
+    raw_call(msg.sender, b"", value=amount)
+    log Withdrew(msg.sender, amount)
+
+@internal
+@pure
+def _draw_tickets(
+    ticket_total: uint256,
+    random_words: DynArray[uint256, MAX_PRIZE_TIERS],
+    winner_count: uint256
+) -> DynArray[uint256, MAX_PRIZE_TIERS]:
+    """
+    @dev Draw distinct tickets in tier order. Each word picks a rank among
+         the tickets not drawn yet, which is mapped to a ticket number by
+         stepping over the earlier picks in ascending order.
+    """
+    drawn: DynArray[uint256, MAX_PRIZE_TIERS] = []
+    ascending: DynArray[uint256, MAX_PRIZE_TIERS] = []
+    for i: uint256 in range(winner_count, bound=MAX_PRIZE_TIERS):
+        ticket: uint256 = random_words[i] % (ticket_total - i)
+        reordered: DynArray[uint256, MAX_PRIZE_TIERS] = []
+        placed: bool = False
+        for j: uint256 in range(len(ascending), bound=MAX_PRIZE_TIERS):
+            previous: uint256 = ascending[j]
+            if not placed and ticket < previous:
+                reordered.append(ticket)
+                placed = True
+            if not placed:
+                ticket += 1
+            reordered.append(previous)
+        if not placed:
+            reordered.append(ticket)
+        ascending = reordered
+        drawn.append(ticket)
+    return drawn
+
 # Getter functions
+# round_id, raffle_state, last_timestamp, recent_winner, player_count and
+# players keep the ABI of the public storage variables they replaced
+@external
+@view
+def round_id() -> uint256:
+    return self._round_id()
+
+@external
+@view
+def player_count() -> uint256:
+    return self._player_count(self._round_id() % ROUND_BUFFERS)
+
+@external
+@view
+def players(index: uint256) -> address:
+    """
+    @notice Owner of ticket `index` in the live round, empty past the last ticket
+    """
+    return self._player(index)
+
+@external
+@view
+def raffle_state() -> uint256:
+    return self._raffle_state()
+
+@external
+@view
+def last_timestamp() -> uint256:
+    return self._last_timestamp()
+
+@external
+@view
+def recent_winner() -> address:
+    return self._entry_player(self.round_state)
+
+@external
+@view
+def pending_pot() -> uint256:
+    """
+    @notice ETH paid into the next round while a draw is pending
+    """
+    return self.held_funds & HALF_MASK
+
+@external
+@view
+def total_deposits() -> uint256:
+    """
+    @notice ETH deposited for relayed entries and not yet spent, excluded from the pot
+    """
+    return self.held_funds >> HALF_SHIFT
+
+@external
+@view
+def deposits(player: address) -> uint256:
+    return self.accounts[player] & HALF_MASK
+
+@external
+@view
+def nonces(player: address) -> uint256:
+    """
+    @notice Nonce the player's next signed entry must carry
+    """
+    return self.accounts[player] >> HALF_SHIFT
+
+@external
+@view
+def domain_separator() -> bytes32:
+    return self._domain_separator()
+
 @external
 @view
 def get_entrance_fee() -> uint256:
@@ -129,31 +573,172 @@ def get_entrance_fee() -> uint256:
 @external
 @view
 def get_raffle_state() -> uint256:
-    return self.raffle_state
+    return self._raffle_state()
 
 @external
 @view
 def get_player(index: uint256) -> address:
-    return self.players[index]
+    return self._player(index)
+
+@external
+@view
+def get_players(start: uint256, count: uint256) -> DynArray[address, MAX_PAGE_SIZE]:
+    """
+    @notice Owners of tickets [start, start + count) in the live round
+    @dev The page is cut at MAX_PAGE_SIZE and at the last ticket of the round
+    """
+    players: DynArray[address, MAX_PAGE_SIZE] = []
+    buffer: uint256 = self._round_id() % ROUND_BUFFERS
+    ticket_total: uint256 = self._player_count(buffer)
+    if start >= ticket_total:
+        return players
+    end: uint256 = min(start + min(count, MAX_PAGE_SIZE), ticket_total)
+    # One search for the first ticket, then walk the ranges in order
+    entry_index: uint256 = self._find_entry(buffer, start)
+    packed_entry: uint256 = self.entries[buffer][entry_index]
+    for ticket: uint256 in range(start, end, bound=MAX_PAGE_SIZE):
+        if ticket >= packed_entry >> ENTRY_END_SHIFT:
+            entry_index += 1
+            packed_entry = self.entries[buffer][entry_index]
+        players.append(self._entry_player(packed_entry))
+    return players
+
+@external
+@view
+def get_recent_rounds(count: uint256) -> DynArray[RoundResult, ROUND_HISTORY_SIZE]:
+    """
+    @notice Results of up to `count` settled rounds, newest first
+    """
+    results: DynArray[RoundResult, ROUND_HISTORY_SIZE] = []
+    round_id: uint256 = self._round_id()
+    available: uint256 = min(min(count, ROUND_HISTORY_SIZE), round_id)
+    for i: uint256 in range(available, bound=ROUND_HISTORY_SIZE):
+        round: uint256 = round_id - 1 - i
+        record: RoundRecord = self.round_history[round % ROUND_HISTORY_SLOTS]
+        results.append(RoundResult(
+            round_id=round,
+            winner=self._entry_player(record.settlement),
+            prize=record.draw & HALF_MASK,
+            player_count=record.draw >> HALF_SHIFT,
+            request_id=record.request_id,
+            timestamp=record.settlement >> SETTLED_AT_SHIFT
+        ))
+    return results
+
+@external
+@view
+def get_raffle_summary() -> RaffleSummary:
+    """
+    @notice All round metadata in one call
+    """
+    round_id: uint256 = self._round_id()
+    buffer: uint256 = round_id % ROUND_BUFFERS
+    return RaffleSummary(
+        raffle_state=self._raffle_state(),
+        round_id=round_id,
+        player_count=self._player_count(buffer),
+        entry_count=self._entry_count(buffer),
+        pending_player_count=self._pending_player_count(),
+        last_timestamp=self._last_timestamp(),
+        recent_winner=self._entry_player(self.round_state),
+        entrance_fee=entrance_fee,
+        interval=interval,
+        balance=self.balance
+    )
+
+@external
+@view
+def check_upkeep() -> UpkeepStatus:
+    """
+    @notice Whether request_winner can be called, and if not, why
+    @dev callable_at is only the interval deadline; a draw in progress or
+         an empty round can still block the call after it
+    """
+    blocked_by: String[32] = self._upkeep_blocker()
+    return UpkeepStatus(
+        upkeep_needed=len(blocked_by) == 0,
+        blocked_by=blocked_by,
+        callable_at=self._last_timestamp() + interval
+    )
 
 @external
 @view
 def get_recent_winner() -> address:
-    return self.recent_winner
+    return self._entry_player(self.round_state)
 
 @external
 @view
 def get_player_count() -> uint256:
-    return self.player_count
+    return self._player_count(self._round_id() % ROUND_BUFFERS)
+
+@external
+@view
+def get_pending_player_count() -> uint256:
+    """
+    @notice Tickets bought for the next round while the current draw is pending
+    """
+    return self._pending_player_count()
+
+@external
+@view
+def get_prize_tiers() -> DynArray[uint256, MAX_PRIZE_TIERS]:
+    return prize_tiers
+
+@external
+@view
+def get_winnings(player: address) -> uint256:
+    """
+    @notice Prizes credited to `player` and not yet withdrawn
+    """
+    return self.winnings[player]
+
+@external
+@view
+def get_entry_count() -> uint256:
+    return self._entry_count(self._round_id() % ROUND_BUFFERS)
+
+@external
+@view
+def get_round_id() -> uint256:
+    return self._round_id()
 
 @external
 @view
 def get_last_timestamp() -> uint256:
-    return self.last_timestamp
+    return self._last_timestamp()
 
 # Events
+# Together with their blocks' timestamps they carry everything the getters
+# expose, so the raffle's state can be rebuilt from its logs alone
 event RequestedWinner:
     request_id: indexed(uint256)
+    round_id: indexed(uint256)
 
 event PickedWinner:
-    winner: indexed(address)
\ No newline at end of file
+    winner: indexed(address)
+    round_id: indexed(uint256)
+    request_id: uint256
+    prize: uint256
+    player_count: uint256  # Tickets in the round
+
+event PaidPrize:
+    winner: indexed(address)
+    tier: uint256
+    amount: uint256
+
+event Withdrew:
+    player: indexed(address)
+    amount: uint256
+
+event Deposited:
+    player: indexed(address)
+    amount: uint256
+
+event WithdrewDeposit:
+    player: indexed(address)
+    amount: uint256
+
+event RelayedEntry:  # Logged before the EnteredRaffle it paid for
+    player: indexed(address)
+    nonce: uint256
+    amount: uint256  # Taken from the player's deposit
\ No newline at end of file
@@ -0,0 +1,117 @@
+# pragma version 0.4.0
+"""
+@title Raffle Factory
+@license MIT
+@notice Deploys raffles from a single on-chain blueprint and keeps a registry of them
+@dev Creating a raffle here does not cost less gas than deploying it directly
+     (about 1.037M against 1.035M): every instance still pays the code-deposit
+     charge for its full runtime, and the registry writes offset the initcode
+     calldata the blueprint saves. What the factory saves is transactions, by
+     creating up to MAX_BATCH_SIZE raffles in one create_raffles call.
+"""
+
+# Constants
+BLUEPRINT_CODE_OFFSET: constant(uint256) = 3  # Length of the ERC-5202 preamble
+MAX_BATCH_SIZE: constant(uint256) = 50
+MAX_PRIZE_TIERS: constant(uint256) = 5  # Matches raffle.vy
+
+struct RaffleConfig:
+    entrance_fee: uint256
+    interval: uint256
+    vrf_coordinator: address
+    gas_lane: bytes32
+    subscription_id: uint64
+    callback_gas_limit: uint32
+    prize_tiers: DynArray[uint256, MAX_PRIZE_TIERS]
+
+# Immutable config (set at deployment)
+raffle_blueprint: immutable(address)  # ERC-5202 blueprint of raffle.vy
+
+# State variables
+raffles: public(HashMap[uint256, address])  # Raffle index -> address
+raffle_count: public(uint256)  # Number of raffles created
+is_raffle: public(HashMap[address, bool])  # Whether an address was created here
+
+event RaffleCreated:
+    raffle: indexed(address)
+    creator: indexed(address)
+    entrance_fee: uint256
+    interval: uint256
+
+@deploy
+def __init__(_raffle_blueprint: address):
+    """
+    @notice Initialize the factory
+    @param _raffle_blueprint Address of the raffle blueprint
+    """
+    raffle_blueprint = _raffle_blueprint
+
+@external
+def create_raffle(
+    _entrance_fee: uint256,
+    _interval: uint256,
+    _vrf_coordinator: address,
+    _gas_lane: bytes32,
+    _subscription_id: uint64,
+    _callback_gas_limit: uint32,
+    _prize_tiers: DynArray[uint256, MAX_PRIZE_TIERS]
+) -> address:
+    """
+    @notice Deploy a raffle from the blueprint
+    @return Address of the new raffle
+    """
+    return self._create(RaffleConfig(
+        entrance_fee=_entrance_fee,
+        interval=_interval,
+        vrf_coordinator=_vrf_coordinator,
+        gas_lane=_gas_lane,
+        subscription_id=_subscription_id,
+        callback_gas_limit=_callback_gas_limit,
+        prize_tiers=_prize_tiers
+    ))
+
+@external
+def create_raffles(configs: DynArray[RaffleConfig, MAX_BATCH_SIZE]) -> DynArray[address, MAX_BATCH_SIZE]:
+    """
+    @notice Deploy several raffles in one transaction
+    @return Addresses of the new raffles, in config order
+    """
+    created: DynArray[address, MAX_BATCH_SIZE] = []
+    for config: RaffleConfig in configs:
+        created.append(self._create(config))
+    return created
+
+@internal
+def _create(config: RaffleConfig) -> address:
+    raffle: address = create_from_blueprint(
+        raffle_blueprint,
+        config.entrance_fee,
+        config.interval,
+        config.vrf_coordinator,
+        config.gas_lane,
+        config.subscription_id,
+        config.callback_gas_limit,
+        config.prize_tiers,
+        code_offset=BLUEPRINT_CODE_OFFSET
+    )
+    self.raffles[self.raffle_count] = raffle
+    self.raffle_count += 1
+    self.is_raffle[raffle] = True
+    log RaffleCreated(raffle, msg.sender, config.entrance_fee, config.interval)
+    return raffle
+
+# Getter functions
+@external
+@view
+def get_raffle_blueprint() -> address:
+    return raffle_blueprint
+
+@external
+@view
+def get_raffle_count() -> uint256:
+    return self.raffle_count
+
+@external
+@view
+def get_raffle(index: uint256) -> address:
+    return self.raffles[index]
@@ -1,8 +1,35 @@
+import sys
 import pytest
 from moccasin.config import get_active_network
 from src.mocks import mock_vrf_coordinator
-from src import raffle
+from src import raffle, raffle_factory
+from script.deploy_factory import load_raffle_defaults
 import boa
+import gas_profile
+from local_rpc import LocalRPC
+
+# Contracts are deployed once per session. boa's pytest plugin wraps every
+# fixture and test in boa.env.anchor(), so each test starts from the state right
+# after these deployments and nothing leaks between tests.
+
+def pytest_configure(config):
+    if config.getoption("gas_profile"):
+        # Test modules import raffle after this runs, so they all get the
+        # in-process build that boa can line-profile
+        global raffle
+        raffle = gas_profile.load_profiled_raffle()
+        sys.modules["src.raffle"] = raffle
+        setattr(sys.modules["src"], "raffle", raffle)
+
+def pytest_sessionfinish(session, exitstatus):
+    if session.config.getoption("gas_profile"):
+        path = gas_profile.write_reports()
+        print(f"\nGas profile written to {path}/")
+
+@pytest.fixture
+def local_rpc():
+    """A JSON-RPC node on boa's local chain, for scripts that talk to one."""
+    return LocalRPC()
 
 @pytest.fixture(scope="session")
 def account():
@@ -29,7 +56,8 @@ def raffle_contract(mock_vrf):
     vrf_coordinator = mock_vrf.address
     gas_lane = b"\x00" * 32
     subscription_id = 1234
-    callback_gas_limit = 100000
+    callback_gas_limit = load_raffle_defaults()["callback_gas_limit"]  # As deployed
+    prize_tiers = [10000]  # Single winner takes the pot
     
     raffle_instance = raffle.deploy(
         entrance_fee,
@@ -37,9 +65,15 @@ def raffle_contract(mock_vrf):
         vrf_coordinator,
         gas_lane,
         subscription_id,
-        callback_gas_limit
+        callback_gas_limit,
+        prize_tiers
     )
     
     # Store raffle address in mock for callback
     mock_vrf.raffle_address = raffle_instance.address
-    return raffle_instance
\ No newline at end of file
+    return raffle_instance
+
+@pytest.fixture(scope="session")
+def factory_contract():
+    blueprint = raffle.deploy_as_blueprint()
+    return raffle_factory.deploy(blueprint.address)
@@ -0,0 +1,152 @@
+"""
+Pure-Python reference model of src/raffle.vy for differential fuzzing.
+
+Mirrors the contract's observable behaviour: the fee check, the
+open/calculating state machine and its upkeep blockers, tickets bought
+during a draw going into the next round, the distinct-ticket draw, tiered
+payouts and withdrawals. Rejected calls raise RaffleRevert with the
+contract's revert reason and leave the model unchanged.
+"""
+from dataclasses import dataclass, field
+
+OPEN = 0
+CALCULATING = 1
+BPS = 10_000
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class RaffleRevert(Exception):
+    pass
+
+
+def _require(condition: bool, reason: str):
+    if not condition:
+        raise RaffleRevert(reason)
+
+
+@dataclass
+class RaffleModel:
+    entrance_fee: int
+    interval: int
+    prize_tiers: list[int]
+    last_timestamp: int
+    next_request_id: int = 1  # The mock coordinator numbers requests from 1
+    raffle_state: int = OPEN
+    round_id: int = 0
+    recent_winner: str = ZERO_ADDRESS
+    balance: int = 0
+    pending_pot: int = 0
+    unclaimed_winnings: int = 0
+    entries: dict[int, list[tuple[str, int]]] = field(default_factory=dict)  # round -> (player, tickets)
+    winnings: dict[str, int] = field(default_factory=dict)
+    rounds: list[dict] = field(default_factory=list)  # Every drawn round, oldest first
+
+    # Actions
+    def enter_raffle(self, player: str, value: int):
+        _require(value >= self.entrance_fee, "Not enough ETH sent")
+        self._enter(player, value // self.entrance_fee, value)
+
+    def enter_raffle_many(self, player: str, ticket_count: int, value: int):
+        _require(ticket_count > 0, "Must buy at least one ticket")
+        _require(value >= ticket_count * self.entrance_fee, "Not enough ETH sent")
+        self._enter(player, ticket_count, value)
+
+    def _enter(self, player: str, ticket_count: int, value: int):
+        round_id = self.round_id
+        if self.raffle_state == CALCULATING:
+            round_id += 1
+            self.pending_pot += value
+        self.entries.setdefault(round_id, []).append((player, ticket_count))
+        self.balance += value
+
+    def upkeep_blocker(self, now: int) -> str:
+        if now < self.last_timestamp + self.interval:
+            return "Time interval not passed"
+        if self.raffle_state != OPEN:
+            return "Raffle not open"
+        if self.player_count(self.round_id) == 0:
+            return "No players in raffle"
+        if self.balance <= self.unclaimed_winnings:
+            return "No ETH in contract"
+        return ""
+
+    def request_winner(self, now: int) -> int:
+        blocker = self.upkeep_blocker(now)
+        _require(blocker == "", blocker)
+        self.raffle_state = CALCULATING
+        request_id = self.next_request_id
+        self.next_request_id += 1
+        self.rounds.append({
+            "round_id": self.round_id,
+            "winner": ZERO_ADDRESS,
+            "prize": self.balance - self.unclaimed_winnings,
+            "player_count": self.player_count(self.round_id),
+            "request_id": request_id,
+            "timestamp": 0,
+        })
+        return request_id
+
+    def fulfill_random_words(self, random_words: list[int], now: int) -> list[str]:
+        _require(self.raffle_state == CALCULATING, "Not calculating winner")
+        ticket_total = self.player_count(self.round_id)
+        winner_count = min(len(self.prize_tiers), ticket_total)
+        _require(len(random_words) >= winner_count, "Not enough random words")
+
+        prize = self.balance - self.pending_pot - self.unclaimed_winnings
+        winners, paid = [], 0
+        for tier, ticket in enumerate(self.draw_tickets(ticket_total, random_words, winner_count)):
+            # The last winner also takes any tiers there were no tickets for
+            amount = prize - paid if tier == winner_count - 1 else prize * self.prize_tiers[tier] // BPS
+            paid += amount
+            winner = self.ticket_owner(self.round_id, ticket)
+            self.winnings[winner] = self.winnings.get(winner, 0) + amount
+            winners.append(winner)
+        self.unclaimed_winnings += prize
+        self.rounds[-1].update(winner=winners[0], timestamp=now)
+        self.entries.pop(self.round_id, None)
+        self.recent_winner = winners[0]
+        self.last_timestamp = now
+        self.raffle_state = OPEN
+        self.round_id += 1
+        self.pending_pot = 0
+        return winners
+
+    def withdraw(self, player: str) -> int:
+        amount = self.winnings.get(player, 0)
+        _require(amount > 0, "No winnings to withdraw")
+        self.winnings[player] = 0
+        self.unclaimed_winnings -= amount
+        self.balance -= amount
+        return amount
+
+    # Views
+    @staticmethod
+    def draw_tickets(ticket_total: int, random_words: list[int], winner_count: int) -> list[int]:
+        """Each word ranks a ticket among those not drawn yet, like _draw_tickets."""
+        drawn = []
+        for i in range(winner_count):
+            ticket = random_words[i] % (ticket_total - i)
+            for previous in sorted(drawn):
+                if ticket < previous:
+                    break
+                ticket += 1
+            drawn.append(ticket)
+        return drawn
+
+    def ticket_owner(self, round_id: int, ticket: int) -> str:
+        for player, count in self.entries.get(round_id, []):
+            if ticket < count:
+                return player
+            ticket -= count
+        raise IndexError(ticket)
+
+    def tickets(self, round_id: int) -> list[str]:
+        return [player for player, count in self.entries.get(round_id, []) for _ in range(count)]
+
+    def player_count(self, round_id: int) -> int:
+        return sum(count for _, count in self.entries.get(round_id, []))
+
+    def pending_player_count(self) -> int:
+        if self.raffle_state != CALCULATING:
+            return 0
+        return self.player_count(self.round_id + 1)
@@ -1,44 +1,107 @@
-from hypothesis.stateful import RuleBasedStateMachine, rule, invariant, precondition
-from hypothesis import strategies as st, settings, Phase, Verbosity
+import os
+import re
+from collections import deque
+from hypothesis.stateful import RuleBasedStateMachine, rule, initialize, invariant, precondition, run_state_machine_as_test
+from hypothesis import strategies as st, settings, Phase
 from moccasin.boa_tools import VyperContract
 from src.mocks import mock_vrf_coordinator
 from src import raffle
+from script.deploy_factory import load_raffle_defaults
+from raffle_model import RaffleModel, RaffleRevert
 import boa
 import pytest
 
-class RaffleStateMachine(RuleBasedStateMachine):
+TRACE_LIMIT = 2000  # Steps kept per example, oldest dropped first
+DIFF_RATE = float(os.environ.get("FUZZ_DIFF_RATE", "0.1"))  # Share of model examples replayed on the contract
+
+# Deployed once at import, outside any snapshot. Every example runs inside
+# boa.env.anchor() (see TracedMachine), so each one starts from this
+# pristine state instead of redeploying both contracts.
+MOCK_VRF = mock_vrf_coordinator.deploy()
+RAFFLE = raffle.deploy(
+    10**16, 60, MOCK_VRF.address, b"\x00" * 32, 1234, load_raffle_defaults()["callback_gas_limit"], [10000]
+)
+TIERED_RAFFLE = raffle.deploy(10**16, 60, MOCK_VRF.address, b"\x00" * 32, 1234, 500000, [6000, 3000, 1000])
+TIERED_DEPLOYED_AT = TIERED_RAFFLE.get_last_timestamp()
+
+FUZZ_SETTINGS = settings(
+    max_examples=10,
+    phases=[Phase.explicit, Phase.reuse, Phase.generate],
+    deadline=None,
+)
+
+class TracedMachine(RuleBasedStateMachine):
+    """
+    Base for the raffle machines.
+
+    Each example runs in its own anchor, so the machines behave the same
+    under boa's pytest plugin and in script/fuzz_campaign.py. Steps are
+    recorded in a bounded buffer instead of printed; run_traced attaches
+    the failing example's trace to the exception.
+    """
+    trace = deque(maxlen=TRACE_LIMIT)
+
     def __init__(self):
         super().__init__()
-        self.mock = mock_vrf_coordinator.deploy()
-        self.raffle = raffle.deploy(
-            10**16, 60, self.mock.address, b"\x00" * 32, 1234, 100000
-        )
-        self.players = {}
-        print(f"\nStarting new {self.__class__.__name__} test")
+        self._anchor = boa.env.anchor()
+        self._anchor.__enter__()
+        self.trace.clear()
+        self.trace.append({"step": "start", "machine": type(self).__name__})
+
+    def trace_step(self, step_name, **kwargs):
+        self.trace.append({"step": step_name, **kwargs})
+
+    def log(self, message):
+        self.trace.append({"note": message})
 
-    def print_step(self, step_name, **kwargs):
-        print(f"Step: {step_name} - {' '.join(f'{k}={v}' for k, v in kwargs.items())}")
+    def teardown(self):
+        self._anchor.__exit__(None, None, None)
+
+def format_trace(trace) -> str:
+    lines = []
+    for record in trace:
+        if "note" in record:
+            lines.append(f"    {record['note']}")
+        else:
+            args = " ".join(f"{k}={v}" for k, v in record.items() if k != "step")
+            lines.append(f"  {record['step']} {args}".rstrip())
+    return "Trace of the failing example:\n" + "\n".join(lines)
+
+def run_traced(machine_cls, machine_settings=FUZZ_SETTINGS):
+    """Run a machine, attaching the trace of the last example if it fails."""
+    try:
+        run_state_machine_as_test(machine_cls, settings=machine_settings)
+    except Exception as e:
+        e.add_note(format_trace(TracedMachine.trace))
+        raise
+
+class RaffleStateMachine(TracedMachine):
+    def __init__(self):
+        super().__init__()
+        self.mock = MOCK_VRF
+        self.raffle = RAFFLE
+        self.players = {}
 
     @rule(sender=st.sampled_from([boa.env.generate_address() for _ in range(5)]))
     def enter_raffle(self, sender):
-        self.print_step("enter_raffle", sender=sender)
+        self.trace_step("enter_raffle", sender=sender)
         if self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not in open state")
+            self.log("Skipped: Raffle not in open state")
             return
         with boa.env.prank(sender):
             entrance_fee = self.raffle.get_entrance_fee()
             try:
                 self.raffle.enter_raffle(value=entrance_fee)
                 self.players[sender] = self.players.get(sender, 0) + entrance_fee
-                print(f"  Success: Player entered raffle with {entrance_fee}")
+                self.log(f"Success: Player entered raffle with {entrance_fee}")
             except Exception as e:
-                print(f"  Failed: {str(e)}")
+                self.log(f"Failed: {str(e)}")
 
     @rule()
     def request_winner(self):
-        self.print_step("request_winner")
+        self.trace_step("request_winner")
         if self.raffle.get_raffle_state() != 0 or self.raffle.get_player_count() == 0:
-            print("  Skipped: Raffle not ready for winner selection")
+            self.log("Skipped: Raffle not ready for winner selection")
             return
         boa.env.time_travel(seconds=61)
         sender = boa.env.generate_address()
@@ -48,40 +111,34 @@ class RaffleStateMachine(RuleBasedStateMachine):
                 request_id = self.mock.last_request_id()
                 self.mock.callBackWithRandomness(123)
                 self.players = {}
-                print("  Success: Winner requested")
+                self.log("Success: Winner requested")
             except Exception as e:
-                print(f"  Failed: {str(e)}")
+                self.log(f"Failed: {str(e)}")
 
     @invariant()
     def check_state(self):
         state = self.raffle.get_raffle_state()
         player_count = self.raffle.get_player_count()
-        print(f"  Invariant check: state={state}, player_count={player_count}, tracked_players={len(self.players)}")
+        self.log(f"Invariant check: state={state}, player_count={player_count}, tracked_players={len(self.players)}")
         assert state in [0, 1], f"Invalid raffle state: {state}"
         if state == 0:
             assert player_count <= len(self.players)
         elif state == 1:
             assert player_count > 0
 
-class MultiPlayerRaffleMachine(RuleBasedStateMachine):
+class MultiPlayerRaffleMachine(TracedMachine):
     def __init__(self):
         super().__init__()
-        self.mock = mock_vrf_coordinator.deploy()
-        self.raffle = raffle.deploy(
-            10**16, 60, self.mock.address, b"\x00" * 32, 1234, 100000
-        )
+        self.mock = MOCK_VRF
+        self.raffle = RAFFLE
         self.entries = []
         self.current_time = self.raffle.get_last_timestamp()
-        print(f"\nStarting new {self.__class__.__name__} test")
-
-    def print_step(self, step_name, **kwargs):
-        print(f"Step: {step_name} - {' '.join(f'{k}={v}' for k, v in kwargs.items())}")
 
     @rule(sender=st.sampled_from([boa.env.generate_address() for _ in range(5)]))
     def enter_raffle(self, sender):
-        self.print_step("enter_raffle", sender=sender)
+        self.trace_step("enter_raffle", sender=sender)
         if self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not in open state")
+            self.log("Skipped: Raffle not in open state")
             return
         entrance_fee = self.raffle.get_entrance_fee()
         boa.env.set_balance(sender, entrance_fee * 2)
@@ -89,65 +146,61 @@ class MultiPlayerRaffleMachine(RuleBasedStateMachine):
             try:
                 self.raffle.enter_raffle(value=entrance_fee)
                 self.entries.append(sender)
-                print(f"  Success: Player entered raffle with {entrance_fee}")
+                self.log(f"Success: Player entered raffle with {entrance_fee}")
             except Exception as e:
-                print(f"  Failed: {str(e)}")
+                self.log(f"Failed: {str(e)}")
 
     @rule(random_value=st.integers(min_value=0, max_value=100))
     def request_winner(self, random_value):
-        self.print_step("request_winner", random_value=random_value)
+        self.trace_step("request_winner", random_value=random_value)
         if self.raffle.get_raffle_state() != 0 or self.raffle.get_player_count() == 0:
-            print("  Skipped: Raffle not ready for winner selection")
+            self.log("Skipped: Raffle not ready for winner selection")
             return
         time_passed = self.current_time - self.raffle.get_last_timestamp()
         if time_passed < 60:
             seconds_to_travel = 60 - time_passed + 1
             boa.env.time_travel(seconds=seconds_to_travel)
             self.current_time += seconds_to_travel
-            print(f"  Time travel: {seconds_to_travel} seconds")
+            self.log(f"Time travel: {seconds_to_travel} seconds")
         sender = boa.env.generate_address()
         with boa.env.prank(sender):
             try:
                 self.raffle.request_winner()
                 request_id = self.mock.last_request_id()
-                print(f"  Request ID: {request_id}")
+                self.log(f"Request ID: {request_id}")
                 with boa.env.prank(self.mock.address):
                     self.raffle.fulfill_random_words(request_id, [random_value])
-                    print(f"  Random value provided: {random_value}")
+                    self.log(f"Random value provided: {random_value}")
                 self.entries = []
-                print("  Success: Winner selected")
+                self.log("Success: Winner selected")
             except Exception as e:
-                print(f"  Failed: {str(e)}")
+                self.log(f"Failed: {str(e)}")
 
     @invariant()
     def check_state_consistency(self):
         state = self.raffle.get_raffle_state()
         player_count = self.raffle.get_player_count()
-        print(f"  Invariant check: state={state}, player_count={player_count}, entries={len(self.entries)}")
+        self.log(f"Invariant check: state={state}, player_count={player_count}, entries={len(self.entries)}")
         assert state in [0, 1], "Invalid raffle state"
         if state == 0:
             assert player_count == len(self.entries), "Player count mismatch"
         elif state == 1:
             assert player_count > 0
 
-class TimeStateMachine(RuleBasedStateMachine):
+class TimeStateMachine(TracedMachine):
     def __init__(self):
         super().__init__()
-        self.mock = mock_vrf_coordinator.deploy()
-        self.raffle = raffle.deploy(10**16, 60, self.mock.address, b"\x00" * 32, 1234, 100000)
+        self.mock = MOCK_VRF
+        self.raffle = RAFFLE
         self.player = boa.env.generate_address()
         boa.env.set_balance(self.player, 10**18)
         self.current_time = self.raffle.get_last_timestamp()
-        print(f"\nStarting new {self.__class__.__name__} test")
-
-    def print_step(self, step_name, **kwargs):
-        print(f"Step: {step_name} - {' '.join(f'{k}={v}' for k, v in kwargs.items())}")
 
     @rule(amount=st.integers(min_value=0, max_value=10**17))
     def enter_with_varying_amounts(self, amount):
-        self.print_step("enter_with_varying_amounts", amount=amount)
+        self.trace_step("enter_with_varying_amounts", amount=amount)
         if self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not in open state")
+            self.log("Skipped: Raffle not in open state")
             return
         # Ensure player has enough ETH for amount + gas
         boa.env.set_balance(self.player, amount + 10**16)  # Extra 0.01 ETH for gas
@@ -155,146 +208,294 @@ class TimeStateMachine(RuleBasedStateMachine):
             try:
                 self.raffle.enter_raffle(value=amount)
                 assert amount >= 10**16, "Should have reverted for insufficient funds"
-                print(f"  Success: Player entered with {amount}")
+                self.log(f"Success: Player entered with {amount}")
             except Exception as e:
                 assert amount < 10**16, f"Should have succeeded with sufficient funds, got {str(e)}"
-                print(f"  Expected failure: {str(e)}")
+                self.log(f"Expected failure: {str(e)}")
 
     @rule(seconds=st.integers(min_value=0, max_value=120))
     def time_travel_and_request(self, seconds):
-        self.print_step("time_travel_and_request", seconds=seconds)
+        self.trace_step("time_travel_and_request", seconds=seconds)
         if self.raffle.get_player_count() == 0 or self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not ready for winner selection")
+            self.log("Skipped: Raffle not ready for winner selection")
             return
         boa.env.time_travel(seconds=seconds)
         self.current_time += seconds
-        print(f"  Time travel: {seconds} seconds")
+        self.log(f"Time travel: {seconds} seconds")
         with boa.env.prank(self.player):
             try:
                 self.raffle.request_winner()
                 if seconds < 60:
                     assert False, "Should have reverted - too soon"
                 request_id = self.mock.last_request_id()
-                print(f"  Request ID: {request_id}")
+                self.log(f"Request ID: {request_id}")
                 with boa.env.prank(self.mock.address):
                     self.raffle.fulfill_random_words(request_id, [42])
-                print("  Success: Winner selected")
+                self.log("Success: Winner selected")
             except Exception as e:
                 if seconds >= 60:
                     assert False, "Should have succeeded after interval"
-                print(f"  Expected failure: {str(e)}")
+                self.log(f"Expected failure: {str(e)}")
 
     @invariant()
     def check_time_state(self):
         state = self.raffle.get_raffle_state()
         player_count = self.raffle.get_player_count()
         time_since = self.current_time - self.raffle.get_last_timestamp()
-        print(f"  Invariant check: state={state}, player_count={player_count}, time_since={time_since}")
+        self.log(f"Invariant check: state={state}, player_count={player_count}, time_since={time_since}")
         if state == 0 and player_count > 0:
             assert time_since >= 0, "Timestamp should never go backwards"
 
-class VRFStressMachine(RuleBasedStateMachine):
+class VRFStressMachine(TracedMachine):
     def __init__(self):
         super().__init__()
-        self.mock = mock_vrf_coordinator.deploy()
-        self.raffle = raffle.deploy(10**16, 60, self.mock.address, b"\x00" * 32, 1234, 100000)
+        self.mock = MOCK_VRF
+        self.raffle = RAFFLE
         self.players = [boa.env.generate_address() for _ in range(3)]
         for p in self.players:
             boa.env.set_balance(p, 10**18)
-        print(f"\nStarting new {self.__class__.__name__} test")
-
-    def print_step(self, step_name, **kwargs):
-        print(f"Step: {step_name} - {' '.join(f'{k}={v}' for k, v in kwargs.items())}")
 
     @rule(player=st.sampled_from([0, 1, 2]))
     def enter_raffle(self, player):
-        self.print_step("enter_raffle", player=player)
-        if self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not in open state")
-            return
+        self.trace_step("enter_raffle", player=player)
+        # Entries made while a draw is pending are buffered for the next round
         with boa.env.prank(self.players[player]):
             try:
                 self.raffle.enter_raffle(value=10**16)
-                print(f"  Success: Player {player} entered raffle")
+                self.log(f"Success: Player {player} entered raffle")
             except Exception as e:
-                print(f"  Failed: {str(e)}")
+                self.log(f"Failed: {str(e)}")
 
     @precondition(lambda self: self.raffle.get_player_count() > 0)
     @rule(random_value=st.integers(min_value=0, max_value=100))
     def trigger_vrf(self, random_value):
-        self.print_step("trigger_vrf", random_value=random_value)
+        self.trace_step("trigger_vrf", random_value=random_value)
         if self.raffle.get_raffle_state() != 0:
-            print("  Skipped: Raffle not in open state")
+            self.log("Skipped: Raffle not in open state")
             return
         boa.env.time_travel(seconds=61)
-        print("  Time travel: 61 seconds")
+        self.log("Time travel: 61 seconds")
         with boa.env.prank(self.players[0]):
             try:
                 self.raffle.request_winner()
-                print("  Winner requested")
+                self.log("Winner requested")
             except Exception as e:
-                print(f"  Failed to request winner: {str(e)}")
+                self.log(f"Failed to request winner: {str(e)}")
                 return
         
         request_id = self.mock.last_request_id()
-        print(f"  Request ID: {request_id}")
+        self.log(f"Request ID: {request_id}")
         with boa.env.prank(self.mock.address):
             try:
                 self.raffle.fulfill_random_words(request_id, [random_value])
                 winner = self.raffle.get_recent_winner()
-                print(f"  Winner selected: {winner}")
+                self.log(f"Winner selected: {winner}")
                 assert winner in self.players, "Winner should be one of the players"
             except Exception as e:
-                print(f"  Failed to fulfill: {str(e)}")
+                self.log(f"Failed to fulfill: {str(e)}")
 
     @rule(bogus_id=st.integers(min_value=0, max_value=100))
     def bogus_vrf_call(self, bogus_id):
-        self.print_step("bogus_vrf_call", bogus_id=bogus_id)
+        self.trace_step("bogus_vrf_call", bogus_id=bogus_id)
         if self.raffle.get_raffle_state() == 0:
-            print("  Skipped: Raffle in open state")
+            self.log("Skipped: Raffle in open state")
             return
         with boa.env.prank(self.mock.address):
             try:
                 self.raffle.fulfill_random_words(bogus_id, [42])
                 actual_id = self.mock.last_request_id()
-                print(f"  Fulfilled with bogus ID: {bogus_id}, actual ID: {actual_id}")
+                self.log(f"Fulfilled with bogus ID: {bogus_id}, actual ID: {actual_id}")
                 assert bogus_id == actual_id, "Should fail unless ID matches"
             except Exception as e:
-                print(f"  Expected failure: {str(e)}")
+                self.log(f"Expected failure: {str(e)}")
 
     @invariant()
     def check_vrf_state(self):
         state = self.raffle.get_raffle_state()
         player_count = self.raffle.get_player_count()
-        print(f"  Invariant check: state={state}, player_count={player_count}")
+        self.log(f"Invariant check: state={state}, player_count={player_count}")
         if state == 1:
             assert player_count > 0, "Calculating state requires players"
 
-# Apply settings to each test case
-TestRaffleState = settings(
-    max_examples=10,
-    phases=[Phase.explicit, Phase.reuse, Phase.generate],
-    deadline=None,
-    verbosity=Verbosity.verbose
-)(RaffleStateMachine).TestCase
+class DifferentialRaffleMachine(TracedMachine):
+    """
+    Runs every step against RaffleModel and checks invariants on the model
+    only, so most examples never touch the EVM.
 
-TestMultiPlayerRaffle = settings(
-    max_examples=10,
-    phases=[Phase.explicit, Phase.reuse, Phase.generate],
-    deadline=None,
-    verbosity=Verbosity.verbose
-)(MultiPlayerRaffleMachine).TestCase
+    Steps are queued as actions. In a sampled share of examples (DIFF_RATE)
+    the checkpoint rule and teardown replay the queue on TIERED_RAFFLE,
+    checking that each call reverts exactly when the model's does, then
+    compare every getter with the model. A model invariant failure always
+    replays first, so failing and shrunk examples are checked against the
+    contract too.
+    """
+    players = [boa.env.generate_address() for _ in range(4)]
+    fee = 10**16
 
-TestTimeState = settings(
-    max_examples=10,
-    phases=[Phase.explicit, Phase.reuse, Phase.generate],
-    deadline=None,
-    verbosity=Verbosity.verbose
-)(TimeStateMachine).TestCase
+    def __init__(self):
+        super().__init__()
+        self.raffle = TIERED_RAFFLE
+        self.model = RaffleModel(self.fee, 60, [6000, 3000, 1000], last_timestamp=TIERED_DEPLOYED_AT)
+        self.now = TIERED_DEPLOYED_AT
+        self.queued = []
+        self.diff = False
 
-TestVRFStress = settings(
-    max_examples=10,
-    phases=[Phase.explicit, Phase.reuse, Phase.generate],
-    deadline=None,
-    verbosity=Verbosity.verbose
-)(VRFStressMachine).TestCase
\ No newline at end of file
+    @initialize(roll=st.integers(min_value=0, max_value=99))
+    def sample(self, roll):
+        # Shrinks towards 0, so an example that only fails against the contract stays sampled
+        self.diff = roll < DIFF_RATE * 100
+        self.trace_step("sample", diff=self.diff)
+        if self.diff:
+            for player in self.players:
+                boa.env.set_balance(player, 10**24)
+
+    def _step(self, action, apply, **kwargs):
+        self.trace_step(action, **kwargs)
+        try:
+            apply()
+            reason = None
+        except RaffleRevert as e:
+            reason = str(e)
+            self.log(f"Reverts: {reason}")
+        self.queued.append((action, kwargs, reason))
+
+    @rule(player=st.integers(min_value=0, max_value=3), tickets=st.integers(min_value=0, max_value=3),
+          dust=st.integers(min_value=0, max_value=10**16 - 1))
+    def enter_raffle(self, player, tickets, dust):
+        value = tickets * self.fee + dust
+        self._step("enter_raffle", lambda: self.model.enter_raffle(self.players[player], value), player=player, value=value)
+
+    @rule(player=st.integers(min_value=0, max_value=3), tickets=st.integers(min_value=0, max_value=3),
+          short=st.booleans())
+    def enter_raffle_many(self, player, tickets, short):
+        value = max(tickets * self.fee - short, 0)
+        self._step(
+            "enter_raffle_many",
+            lambda: self.model.enter_raffle_many(self.players[player], tickets, value),
+            player=player, tickets=tickets, value=value,
+        )
+
+    @rule(seconds=st.integers(min_value=0, max_value=90))
+    def time_travel(self, seconds):
+        self.now += seconds
+        self.queued.append(("time_travel", {"seconds": seconds}, None))
+
+    @rule()
+    def request_winner(self):
+        self._step("request_winner", lambda: self.model.request_winner(self.now))
+
+    @rule(words=st.lists(st.integers(min_value=0, max_value=2**256 - 1), max_size=3))
+    def fulfill_random_words(self, words):
+        self._step("fulfill_random_words", lambda: self.model.fulfill_random_words(words, self.now), words=words)
+
+    @rule(player=st.integers(min_value=0, max_value=3))
+    def withdraw(self, player):
+        self._step("withdraw", lambda: self.model.withdraw(self.players[player]), player=player)
+
+    @rule()
+    def checkpoint(self):
+        if self.diff:
+            self.trace_step("checkpoint")
+            self._sync()
+
+    def _call(self, action, args):
+        if action == "enter_raffle":
+            with boa.env.prank(self.players[args["player"]]):
+                self.raffle.enter_raffle(value=args["value"])
+        elif action == "enter_raffle_many":
+            with boa.env.prank(self.players[args["player"]]):
+                self.raffle.enter_raffle_many(args["tickets"], value=args["value"])
+        elif action == "request_winner":
+            self.raffle.request_winner()
+        elif action == "fulfill_random_words":
+            with boa.env.prank(MOCK_VRF.address):
+                self.raffle.fulfill_random_words(self.model.next_request_id - 1, args["words"])
+        elif action == "withdraw":
+            with boa.env.prank(self.players[args["player"]]):
+                self.raffle.withdraw()
+
+    def _sync(self):
+        """Replay the queued actions on the contract, then diff it against the model."""
+        for action, args, reason in self.queued:
+            if action == "time_travel":
+                boa.env.time_travel(seconds=args["seconds"])
+            elif reason is None:
+                self._call(action, args)
+            else:
+                with pytest.raises(boa.BoaError, match=re.escape(reason)):
+                    self._call(action, args)
+        self.queued = []
+
+        model = self.model
+        summary = self.raffle.get_raffle_summary()
+        settled = [r for r in model.rounds if r["round_id"] < model.round_id]
+        expected = {
+            "raffle_state": model.raffle_state,
+            "round_id": model.round_id,
+            "player_count": model.player_count(model.round_id),
+            "entry_count": len(model.entries.get(model.round_id, [])),
+            "pending_player_count": model.pending_player_count(),
+            "last_timestamp": model.last_timestamp,
+            "recent_winner": model.recent_winner,
+            "balance": model.balance,
+            "pending_pot": model.pending_pot,
+            "unclaimed_winnings": model.unclaimed_winnings,
+            "players": model.tickets(model.round_id),
+            "winnings": [model.winnings.get(p, 0) for p in self.players],
+            "rounds": [tuple(r.values()) for r in reversed(settled[-32:])],
+        }
+        actual = {
+            "raffle_state": summary.raffle_state,
+            "round_id": summary.round_id,
+            "player_count": summary.player_count,
+            "entry_count": summary.entry_count,
+            "pending_player_count": summary.pending_player_count,
+            "last_timestamp": summary.last_timestamp,
+            "recent_winner": summary.recent_winner,
+            "balance": summary.balance,
+            "pending_pot": self.raffle.pending_pot(),
+            "unclaimed_winnings": self.raffle.unclaimed_winnings(),
+            "players": list(self.raffle.get_players(0, 1000)),
+            "winnings": [self.raffle.get_winnings(p) for p in self.players],
+            "rounds": [tuple(r) for r in self.raffle.get_recent_rounds(32)],
+        }
+        mismatched = {k: (expected[k], actual[k]) for k in expected if expected[k] != actual[k]}
+        assert not mismatched, f"Contract diverged from the model (model, contract): {mismatched}"
+
+    @invariant()
+    def check_model(self):
+        model = self.model
+        try:
+            assert model.unclaimed_winnings == sum(model.winnings.values())
+            assert model.balance >= model.unclaimed_winnings + model.pending_pot
+            if model.raffle_state == 0:
+                assert model.pending_pot == 0
+            else:
+                assert model.player_count(model.round_id) > 0, "Calculating state requires players"
+        except AssertionError:
+            # Say whether the contract agrees with the model before reporting
+            self._sync()
+            raise
+
+    def teardown(self):
+        try:
+            if self.diff:
+                self._sync()
+        finally:
+            super().teardown()
+
+def test_raffle_state():
+    run_traced(RaffleStateMachine)
+
+def test_multi_player_raffle():
+    run_traced(MultiPlayerRaffleMachine)
+
+def test_time_state():
+    run_traced(TimeStateMachine)
+
+def test_vrf_stress():
+    run_traced(VRFStressMachine)
+
+def test_differential_model():
+    # Model steps are cheap, so this runs more examples than the EVM machines
+    run_traced(DifferentialRaffleMachine, settings(FUZZ_SETTINGS, max_examples=200))
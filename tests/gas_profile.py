@@ -0,0 +1,103 @@
+"""
+Gas profile reports for `mox test --gas-profile`.
+
+boa's plugin already meters every test under --gas-profile, but it can only
+attribute gas to lines of contracts compiled in-process. raffle.vy pins
+vyper 0.4.0 and is otherwise loaded through VVM, so under --gas-profile the
+test session swaps in an in-process build of the same source. At the end of
+the session the per-line and per-function gas is aggregated by contract
+source (not by address, so runs are comparable) and written to
+GAS_PROFILE_DIR [gas_profile] as gas_profile.txt and gas_profile.json.
+"""
+import json
+import os
+import re
+import statistics
+from pathlib import Path
+
+import boa
+from boa.profiling import global_profile
+from vyper.compiler.output import build_abi_output
+
+RAFFLE_PATH = Path(__file__).parent.parent / "src" / "raffle.vy"
+REPORT_DIR = os.environ.get("GAS_PROFILE_DIR", "gas_profile")
+PRAGMA = re.compile(r"^#\s*pragma version .*$", re.MULTILINE)
+
+
+def load_profiled_raffle():
+    """raffle.vy compiled by the installed vyper, so boa can map gas to its lines."""
+    source = PRAGMA.sub("# pragma version >=0.4.0", RAFFLE_PATH.read_text(), count=1)
+    deployer = boa.loads_partial(source, name="raffle", filename="src/raffle.vy")
+    # The VVM deployer it stands in for exposes the ABI, which script/indexer.py reads
+    deployer.abi = build_abi_output(deployer.compiler_data)
+    return deployer
+
+
+def _stats(samples: list[int]) -> dict:
+    return {
+        "count": len(samples),
+        "total_gas": sum(samples),
+        "mean_gas": int(statistics.mean(samples)),
+        "median_gas": int(statistics.median(samples)),
+        "min_gas": min(samples),
+        "max_gas": max(samples),
+    }
+
+
+def collect_profile() -> dict:
+    """Per-function and per-line gas from boa's global profile, merged across deployments."""
+    profile = global_profile()
+    functions = {}
+    for method, gas in profile.call_profiles.items():
+        functions.setdefault((os.path.relpath(method.contract_path), method.fn_name), []).extend(gas.net_gas)
+    lines = {}
+    for line, samples in profile.line_profiles.items():
+        lines.setdefault((os.path.relpath(line.contract_path), str(line.module_path), line.lineno, line.fn_name), []).extend(samples)
+
+    return {
+        "functions": [
+            {"contract": contract, "function": fn_name, **_stats(samples)}
+            for (contract, fn_name), samples in sorted(functions.items())
+        ],
+        "lines": [
+            {
+                "contract": contract,
+                "module": os.path.relpath(module),
+                "line": lineno,
+                "function": fn_name,
+                "source": profile.get_module_line(module, lineno).strip(),
+                **_stats(samples),
+            }
+            for (contract, module, lineno, fn_name), samples in sorted(lines.items())
+        ],
+    }
+
+
+def format_report(report: dict, top_lines: int = 50) -> str:
+    """Functions by total gas, then the hottest lines across the suite."""
+    out = ["Functions (net gas per call, including callees)"]
+    out.append(f"{'contract':<40} {'function':<28} {'calls':>7} {'mean':>9} {'max':>9} {'total':>13}")
+    for f in sorted(report["functions"], key=lambda f: -f["total_gas"]):
+        out.append(
+            f"{f['contract']:<40} {f['function']:<28} {f['count']:>7} "
+            f"{f['mean_gas']:>9} {f['max_gas']:>9} {f['total_gas']:>13}"
+        )
+    out.append("")
+    out.append(f"Hottest lines (top {top_lines} by total gas)")
+    out.append(f"{'location':<32} {'function':<28} {'hits':>7} {'mean':>9} {'total':>13}  source")
+    for line in sorted(report["lines"], key=lambda l: -l["total_gas"])[:top_lines]:
+        location = f"{line['module']}:{line['line']}"
+        out.append(
+            f"{location:<32} {line['function']:<28} {line['count']:>7} "
+            f"{line['mean_gas']:>9} {line['total_gas']:>13}  {line['source']}"
+        )
+    return "\n".join(out) + "\n"
+
+
+def write_reports(out_dir: str = REPORT_DIR) -> Path:
+    report = collect_profile()
+    path = Path(out_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "gas_profile.json").write_text(json.dumps(report, indent=2) + "\n")
+    (path / "gas_profile.txt").write_text(format_report(report))
+    return path
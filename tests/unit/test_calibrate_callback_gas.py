@@ -0,0 +1,66 @@
+import shutil
+import boa
+import pytest
+from script.calibrate_callback_gas import calibrate, recommend_limit, update_config
+from script.deploy_factory import CONFIG_PATH, load_raffle_configs
+from src.mocks import mock_vrf_coordinator
+from src import raffle
+
+TIERS = [6000, 3000, 1000]
+PLAYERS = 300
+
+
+def _settles(callback_gas_limit, players, seed):
+    """Whether the mock settles the first round of a fresh raffle, read from cold storage."""
+    with boa.swap_env(boa.Env()):
+        mock = mock_vrf_coordinator.deploy()
+        raffle_contract = raffle.deploy(10**16, 60, mock.address, b"\x00" * 32, 1234, callback_gas_limit, TIERS)
+        for _ in range(players):
+            player = boa.env.generate_address()
+            boa.env.set_balance(player, 10**16)
+            with boa.env.prank(player):
+                raffle_contract.enter_raffle(value=10**16)
+        boa.env.time_travel(seconds=61)
+        raffle_contract.request_winner()
+        mock.set_seed(seed)
+        boa.env.reset_gas_used()
+        mock.fulfill_pending(1)
+        (fulfilled,) = [e for e in mock.get_logs() if type(e).__name__ == "RandomWordsFulfilled"]
+        assert fulfilled.success == (raffle_contract.get_raffle_state() == 0)
+        return fulfilled.success
+
+
+def test_recommended_limit_covers_the_callback():
+    """Test that the measured gas alone settles cold rounds with random winners"""
+    rows, limits = calibrate([TIERS], [1, PLAYERS], 0.25, draws=2)
+    worst = max(r["gas"] for r in rows)
+    assert worst * 1.25 <= limits[tuple(TIERS)] < worst * 1.25 + 1000
+    by_type = {(r["winner_type"], r["players"]): r["gas"] for r in rows}
+    # Prizes are credited rather than sent, so a winner's receive hook never runs in the callback
+    assert by_type[("eoa", PLAYERS)] == by_type[("contract", PLAYERS)]
+
+    # No margin: winners the mock draws at random must not cost more than the measured worst case
+    for seed in range(4):
+        assert _settles(worst, PLAYERS, seed)
+    assert not _settles(worst * 9 // 10, PLAYERS, 0)
+
+
+def test_recommend_limit_rejects_limits_over_the_coordinator_cap():
+    with pytest.raises(ValueError):
+        recommend_limit(2_400_000, 0.25)
+
+
+def test_update_config_writes_defaults_and_overrides(tmp_path):
+    """Test that limits land in [defaults], with overrides only where an entry's tiers need one"""
+    path = tmp_path / "raffles.toml"
+    shutil.copy(CONFIG_PATH, path)
+    update_config(path, {(10000,): 90000, tuple(TIERS): 150000})
+    configs = load_raffle_configs(path)
+    assert {tuple(c["prize_tiers"]): c["callback_gas_limit"] for c in configs} == {
+        (10000,): 90000, tuple(TIERS): 150000
+    }
+    assert path.read_text().count("callback_gas_limit =") == 2  # The default and the tiered override
+
+    update_config(path, {(10000,): 90000, tuple(TIERS): 90000})
+    assert path.read_text().count("callback_gas_limit =") == 1
+    assert "# " in path.read_text()  # Comments are kept
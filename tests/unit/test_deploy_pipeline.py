@@ -0,0 +1,131 @@
+import json
+import boa
+import pytest
+from eth_account import Account
+from eth_utils import keccak
+from hexbytes import HexBytes
+from script.deploy_factory import load_raffle_configs
+from script.deploy_pipeline import deploy_network
+from src import raffle
+
+DEPLOYER = Account.from_key("0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d")
+
+
+def test_deploy_pipeline_is_idempotent(tmp_path, local_rpc):
+    """Test that a rollout deploys every variant once and a re-run deploys nothing"""
+    manifest_path = str(tmp_path / "deployments.json")
+    configs = load_raffle_configs()
+
+    first = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert local_rpc.sent == len(configs) + 1  # Plus the shared mock coordinator
+    for address, c in zip(first, configs):
+        deployed = raffle.at(address)
+        assert deployed.get_entrance_fee() == c["entrance_fee"]
+        assert deployed.get_raffle_summary().interval == c["interval"]
+        assert list(deployed.get_prize_tiers()) == c["prize_tiers"]
+    manifest = json.loads(open(manifest_path).read())
+    (entries,) = manifest.values()
+    assert sorted(e["name"] for e in entries.values()) == ["mock_vrf_coordinator"] + ["raffle"] * len(configs)
+
+    second = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert second == first
+    assert local_rpc.sent == len(configs) + 1
+
+
+def test_deploy_pipeline_deploys_only_changes(tmp_path, local_rpc):
+    """Test that changed parameters and contracts missing on chain are redeployed"""
+    manifest_path = str(tmp_path / "deployments.json")
+    configs = load_raffle_configs()
+    first = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+
+    configs[1] = {**configs[1], "interval": configs[1]["interval"] * 2}
+    boa.env.set_code(first[2], b"")  # As if the chain was reset under the manifest
+    second = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert local_rpc.sent == len(configs) + 3
+    assert second[0] == first[0]
+    assert second[1] != first[1] and second[2] != first[2]
+    assert raffle.at(second[1]).get_raffle_summary().interval == configs[1]["interval"]
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def test_interrupted_rollout_is_reconciled(tmp_path, local_rpc):
+    """Test that deployments sent before a crash are recorded from their receipts, not sent again"""
+    manifest_path = str(tmp_path / "deployments.json")
+    configs = load_raffle_configs()
+    fetch = local_rpc.fetch
+
+    def crash_before_receipts(method, params):
+        if method == "eth_getTransactionReceipt":
+            raise Interrupted()
+        return fetch(method, params)
+
+    local_rpc.fetch = crash_before_receipts
+    with pytest.raises(Interrupted):
+        deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    (entries,) = json.loads(open(manifest_path).read()).values()
+    assert {e["status"] for e in entries.values()} == {"pending"}
+    assert local_rpc.sent == len(configs) + 1
+
+    local_rpc.fetch = fetch
+    addresses = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert local_rpc.sent == len(configs) + 1
+    (entries,) = json.loads(open(manifest_path).read()).values()
+    assert all("status" not in e for e in entries.values())
+    assert [raffle.at(a).get_entrance_fee() for a in addresses] == [c["entrance_fee"] for c in configs]
+    assert deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path) == addresses
+    assert local_rpc.sent == len(configs) + 1
+
+
+def test_refused_transaction_keeps_accepted_ones(tmp_path, local_rpc):
+    """Test that a refused transaction neither loses the ones before it nor duplicates any on re-run"""
+    manifest_path = str(tmp_path / "deployments.json")
+    configs = load_raffle_configs()
+    first_nonce = boa.env.evm.vm.state.get_nonce(HexBytes(DEPLOYER.address))
+    local_rpc.refuse_nonces = {first_nonce + 2}
+
+    with pytest.raises(RuntimeError, match="refused"):
+        deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert local_rpc.sent == 2  # The mock coordinator and the first raffle
+    (entries,) = json.loads(open(manifest_path).read()).values()
+    assert len(entries) == 2 and all("status" not in e for e in entries.values())
+
+    local_rpc.refuse_nonces = set()
+    addresses = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert local_rpc.sent == len(configs) + 1
+    assert [raffle.at(a).get_entrance_fee() for a in addresses] == [c["entrance_fee"] for c in configs]
+    assert deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path) == addresses
+    assert local_rpc.sent == len(configs) + 1
+
+
+def test_unmined_transactions_are_sent_again_as_signed(tmp_path, local_rpc):
+    """Test that transactions a node dropped before mining are re-sent unchanged on re-run"""
+    manifest_path = str(tmp_path / "deployments.json")
+    configs = load_raffle_configs()
+    fetch = local_rpc.fetch
+    dropped = []
+
+    def drop_and_crash(method, params):
+        if method == "eth_sendRawTransaction":
+            dropped.append(params[0])
+            return "0x" + keccak(HexBytes(params[0])).hex()
+        if method == "eth_getTransactionReceipt":
+            raise Interrupted()
+        return fetch(method, params)
+
+    local_rpc.fetch = drop_and_crash
+    with pytest.raises(Interrupted):
+        deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    resent = []
+
+    def record_sends(method, params):
+        if method == "eth_sendRawTransaction":
+            resent.append(params[0])
+        return fetch(method, params)
+
+    local_rpc.fetch = record_sends
+    addresses = deploy_network(local_rpc, DEPLOYER, "pyevm", configs, manifest_path)
+    assert resent == dropped
+    assert [raffle.at(a).get_entrance_fee() for a in addresses] == [c["entrance_fee"] for c in configs]
@@ -0,0 +1,13 @@
+from script.fuzz_campaign import plan_jobs, shard_seed
+
+
+def test_plan_jobs_splits_examples_with_stable_seeds():
+    """Test that shards cover every example once and get reproducible, distinct seeds"""
+    jobs = plan_jobs(["A", "B"], examples=10, shards=3, base_seed=7, database_path="db")
+    assert [(machine, count) for machine, _, count, _, _ in jobs] == [
+        ("A", 4), ("A", 3), ("A", 3), ("B", 4), ("B", 3), ("B", 3)
+    ]
+    seeds = [seed for _, _, _, seed, _ in jobs]
+    assert len(set(seeds)) == len(seeds)
+    assert seeds[0] == shard_seed(7, "A", 0)
+    assert plan_jobs(["A"], examples=2, shards=4, base_seed=0, database_path="db")[-1][1] == 1
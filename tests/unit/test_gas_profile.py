@@ -0,0 +1,33 @@
+import json
+import boa
+from boa.profiling import GlobalProfile
+from boa.vm.gas_meters import ProfilingGasMeter
+import gas_profile
+
+
+def test_gas_profile_report(mock_vrf, tmp_path):
+    """Test that profiled raffle calls are reported per function and per source line"""
+    session_profile = GlobalProfile._singleton
+    GlobalProfile.clear_singleton()
+    try:
+        raffle_contract = gas_profile.load_profiled_raffle().deploy(
+            10**16, 60, mock_vrf.address, b"\x00" * 32, 1234, 100000, [10000]
+        )
+        player = boa.env.generate_address()
+        boa.env.set_balance(player, 10**18)
+        with boa.env.gas_meter_class(ProfilingGasMeter), boa.env.prank(player):
+            raffle_contract.enter_raffle(value=10**16)
+            raffle_contract.enter_raffle(value=10**16)
+        path = gas_profile.write_reports(tmp_path)
+    finally:
+        GlobalProfile._singleton = session_profile
+
+    report = json.loads((path / "gas_profile.json").read_text())
+    (enter,) = [f for f in report["functions"] if f["function"] == "enter_raffle"]
+    assert enter["contract"] == "src/raffle.vy"
+    assert enter["count"] == 2
+    assert enter["total_gas"] == enter["mean_gas"] * 2
+    enter_lines = [l for l in report["lines"] if l["function"] == "_enter"]
+    assert enter_lines and all(l["module"] == "src/raffle.vy" for l in enter_lines)
+    assert any("log EnteredRaffle" in l["source"] for l in enter_lines)
+    assert "enter_raffle" in (path / "gas_profile.txt").read_text()
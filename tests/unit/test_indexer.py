@@ -0,0 +1,291 @@
+import boa
+from boa.rpc import to_hex, to_int
+from dataclasses import astuple
+from eth_account import Account
+from eth_utils import keccak
+from local_rpc import LocalRPC
+from script.indexer import RaffleIndexer, RaffleLogState, decode_event, event_topics
+from script.relayer import sign_entry
+from src import raffle
+
+
+class LocalChain(LocalRPC):
+    """A node whose chain is a block per recorded call, so it can be reorged."""
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = [[]]
+        self.hashes = [self._hash(0, 0)]
+        self.timestamps = [boa.env.evm.patch.timestamp]
+        self.forks = 0
+
+    def _hash(self, number, fork):
+        return "0x" + keccak(text=f"{number}:{fork}").hex()
+
+    def mine(self, contract):
+        """Record the logs emitted by the contract's last call as a new block."""
+        number = len(self.blocks)
+        block_hash = self._hash(number, self.forks)
+        tx_hash = "0x" + keccak(text=f"tx:{number}:{self.forks}").hex()
+        logs = []
+        for index, (_, address, topics, data) in enumerate(
+            sorted(contract._computation.get_raw_log_entries())
+        ):
+            logs.append({
+                "address": "0x" + address.hex(),
+                "topics": [f"0x{topic:064x}" for topic in topics],
+                "data": "0x" + data.hex(),
+                "blockNumber": to_hex(number),
+                "blockHash": block_hash,
+                "logIndex": to_hex(index),
+                "transactionHash": tx_hash,
+            })
+        self.blocks.append(logs)
+        self.hashes.append(block_hash)
+        self.timestamps.append(boa.env.evm.patch.timestamp)
+
+    def reorg(self, depth):
+        """Drop the newest blocks; blocks mined afterwards get new hashes."""
+        del self.blocks[-depth:]
+        del self.hashes[-depth:]
+        del self.timestamps[-depth:]
+        self.forks += 1
+
+    def eth_blockNumber(self):
+        return to_hex(len(self.blocks) - 1)
+
+    def eth_getBlockByNumber(self, block, full_transactions):
+        number = to_int(block)
+        if number >= len(self.blocks):
+            return None
+        return {"hash": self.hashes[number], "timestamp": to_hex(self.timestamps[number])}
+
+    def eth_getLogs(self, query):
+        logs = []
+        for block in self.blocks[to_int(query["fromBlock"]):to_int(query["toBlock"]) + 1]:
+            logs.extend(
+                log for log in block
+                if log["address"].lower() == query["address"].lower() and log["topics"][0] in query["topics"][0]
+            )
+        return logs
+
+
+def _enter(chain, raffle_contract, player):
+    boa.env.set_balance(player, 10**18)
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+    chain.mine(raffle_contract)
+
+
+def _draw(chain, raffle_contract, mock_vrf, random_word):
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    chain.mine(raffle_contract)
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(mock_vrf.last_request_id(), [random_word])
+    chain.mine(raffle_contract)
+
+
+def test_indexer_assigns_rounds(raffle_contract, mock_vrf):
+    """Test that entries, draws and winners land in the right rounds"""
+    chain = LocalChain()
+    players = [boa.env.generate_address() for _ in range(3)]
+    _enter(chain, raffle_contract, players[0])
+    _enter(chain, raffle_contract, players[1])
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    chain.mine(raffle_contract)
+    # Entered while the draw is pending, so it belongs to round 1
+    _enter(chain, raffle_contract, players[2])
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(mock_vrf.last_request_id(), [1])
+    chain.mine(raffle_contract)
+
+    indexer = RaffleIndexer(chain, raffle_contract.address, batch_size=2)
+    assert indexer.sync() == len(chain.blocks) - 1
+    assert indexer.entries_per_round() == {0: 2, 1: 1}
+    assert indexer.winner_history() == [(0, players[1])]
+    assert [round_id for round_id, _ in indexer.player_history(players[2])] == [1]
+
+
+def test_indexer_resumes_from_checkpoint(raffle_contract, mock_vrf, tmp_path):
+    """Test that a restarted indexer continues from its checkpoint without duplicates"""
+    chain = LocalChain()
+    db_path = str(tmp_path / "raffle.db")
+    player = boa.env.generate_address()
+    _enter(chain, raffle_contract, player)
+    RaffleIndexer(chain, raffle_contract.address, db_path=db_path).sync()
+
+    _draw(chain, raffle_contract, mock_vrf, 0)
+    _enter(chain, raffle_contract, player)
+    indexer = RaffleIndexer(chain, raffle_contract.address, db_path=db_path)
+    assert indexer.checkpoint == 1
+    indexer.sync()
+    assert indexer.entries_per_round() == {0: 1, 1: 1}
+    assert indexer.winner_history() == [(0, player)]
+
+
+def test_indexer_rewinds_reorged_blocks(raffle_contract):
+    """Test that entries from orphaned blocks are replaced by the new chain"""
+    chain = LocalChain()
+    players = [boa.env.generate_address() for _ in range(3)]
+    indexer = RaffleIndexer(chain, raffle_contract.address, reorg_depth=4)
+    with boa.env.anchor():
+        _enter(chain, raffle_contract, players[0])
+        _enter(chain, raffle_contract, players[1])
+        indexer.sync()
+        assert indexer.player_history(players[1]) != []
+
+    chain.reorg(2)
+    _enter(chain, raffle_contract, players[2])
+    _enter(chain, raffle_contract, players[2])
+    indexer.sync()
+    assert indexer.player_history(players[0]) == []
+    assert indexer.player_history(players[1]) == []
+    assert len(indexer.player_history(players[2])) == 2
+
+    # A reorg onto a shorter chain, with no new blocks mined on top yet
+    with boa.env.anchor():
+        _enter(chain, raffle_contract, players[1])
+        indexer.sync()
+    chain.reorg(1)
+    assert indexer.sync() == len(chain.blocks) - 1
+    assert indexer.player_history(players[1]) == []
+    assert len(indexer.player_history(players[2])) == 2
+
+
+def _replay(chain, state, events, from_block):
+    """Apply the logs of every block mined since from_block; returns the next block to replay."""
+    for number in range(from_block, len(chain.blocks)):
+        for log in chain.blocks[number]:
+            event_abi = events[log["topics"][0]]
+            state.apply(event_abi["name"], decode_event(event_abi, log), chain.timestamps[number])
+    return len(chain.blocks)
+
+
+def _assert_replayed(state, raffle_contract):
+    summary = raffle_contract.get_raffle_summary()
+    assert state.round_id == summary.round_id
+    assert state.calculating == (summary.raffle_state == 1)
+    assert state.player_count == summary.player_count
+    assert state.entry_count == summary.entry_count
+    assert state.pending_player_count == summary.pending_player_count
+    assert state.recent_winner == summary.recent_winner
+    assert state.balance == summary.balance
+    if state.last_timestamp is not None:
+        assert state.last_timestamp == summary.last_timestamp
+    assert raffle_contract.get_players(0, 1000) == state.tickets(state.round_id)
+    for player, amount in state.winnings.items():
+        assert raffle_contract.get_winnings(player) == amount
+    for player, amount in state.deposits.items():
+        assert raffle_contract.deposits(player) == amount
+        assert raffle_contract.nonces(player) == state.nonces.get(player, 0)
+    assert [tuple(r) for r in raffle_contract.get_recent_rounds(32)] == [
+        tuple(r.values()) for r in reversed(state.rounds[-32:])
+    ]
+
+
+def test_log_replay_matches_getters(mock_vrf):
+    """Test that replaying the logs alone rebuilds what the getters return"""
+    fee = 10**16
+    raffle_contract = raffle.deploy(fee, 60, mock_vrf.address, b"\x00" * 32, 1234, 500000, [6000, 3000, 1000])
+    chain = LocalChain()
+    state = RaffleLogState()
+    events = event_topics(raffle.abi)
+    players = [boa.env.generate_address() for _ in range(5)]
+    for player in players:
+        boa.env.set_balance(player, 10**18)
+    replayed = 1
+
+    for round_number, word in enumerate([7, 2**200 + 3]):
+        for i, player in enumerate(players[:4]):
+            with boa.env.prank(player):
+                raffle_contract.enter_raffle_many(i + 1, value=fee * (i + 1))
+            chain.mine(raffle_contract)
+        replayed = _replay(chain, state, events, replayed)
+        _assert_replayed(state, raffle_contract)
+
+        boa.env.time_travel(seconds=61)
+        raffle_contract.request_winner()
+        chain.mine(raffle_contract)
+        # Entered while the draw is pending, so it belongs to the next round
+        with boa.env.prank(players[4]):
+            raffle_contract.enter_raffle(value=fee * 2 + 1)
+        chain.mine(raffle_contract)
+        replayed = _replay(chain, state, events, replayed)
+        _assert_replayed(state, raffle_contract)
+
+        with boa.env.prank(mock_vrf.address):
+            raffle_contract.fulfill_random_words(mock_vrf.last_request_id(), [word, word + 1, word + 2])
+        chain.mine(raffle_contract)
+        replayed = _replay(chain, state, events, replayed)
+        _assert_replayed(state, raffle_contract)
+        assert len(state.rounds) == round_number + 1
+
+    winner = state.rounds[0]["winner"]
+    with boa.env.prank(winner):
+        raffle_contract.withdraw()
+    chain.mine(raffle_contract)
+    _replay(chain, state, events, replayed)
+    _assert_replayed(state, raffle_contract)
+    assert state.winnings[winner] == 0
+
+    # Every tier of both rounds is indexed under its round
+    indexer = RaffleIndexer(chain, raffle_contract.address)
+    indexer.sync()
+    prizes = indexer.prize_history()
+    assert [(round_id, tier) for round_id, tier, _, _ in prizes] == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+    for settled in state.rounds:
+        paid = [(winner, amount) for round_id, _, winner, amount in prizes if round_id == settled["round_id"]]
+        assert paid[0][0] == settled["winner"]
+        assert [amount for _, amount in paid[:2]] == [settled["prize"] * 6000 // 10000, settled["prize"] * 3000 // 10000]
+        assert sum(amount for _, amount in paid) == settled["prize"]
+
+
+def test_log_replay_tracks_deposits(raffle_contract, mock_vrf):
+    """Test that deposits and relayed entries replay to the same balance and deposits"""
+    fee = raffle_contract.get_entrance_fee()
+    chain = LocalChain()
+    state = RaffleLogState()
+    events = event_topics(raffle.abi)
+    players = [Account.from_key(keccak(text=f"replayed player {i}")) for i in range(2)]
+    for player in players:
+        boa.env.set_balance(player.address, 10**18)
+        with boa.env.prank(player.address):
+            raffle_contract.deposit(value=fee * 3)
+        chain.mine(raffle_contract)
+    replayed = _replay(chain, state, events, 1)
+    _assert_replayed(state, raffle_contract)
+
+    domain = raffle_contract.domain_separator()
+    deadline = boa.env.evm.patch.timestamp + 60
+    raffle_contract.enter_raffle_relayed([
+        astuple(sign_entry(players[0].key, domain, 2, 0, deadline)),
+        astuple(sign_entry(players[1].key, domain, 1, 0, deadline)),
+    ])
+    chain.mine(raffle_contract)
+    with boa.env.prank(players[1].address):
+        raffle_contract.withdraw_deposit(fee)
+    chain.mine(raffle_contract)
+    _replay(chain, state, events, replayed)
+    _assert_replayed(state, raffle_contract)
+    assert state.deposits == {players[0].address: fee, players[1].address: fee}
+
+
+def test_indexer_stores_event_details(raffle_contract, mock_vrf):
+    """Test that entries and winners carry the amounts and counts from their events"""
+    chain = LocalChain()
+    player = boa.env.generate_address()
+    boa.env.set_balance(player, 10**18)
+    fee = raffle_contract.get_entrance_fee()
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle_many(3, value=fee * 3)
+    chain.mine(raffle_contract)
+    _draw(chain, raffle_contract, mock_vrf, 5)
+
+    indexer = RaffleIndexer(chain, raffle_contract.address)
+    indexer.sync()
+    entry = indexer.db.execute("SELECT ticket_index, ticket_count, amount FROM entries").fetchone()
+    assert entry == (0, 3, str(fee * 3))
+    winner = indexer.db.execute("SELECT winner, request_id, prize, player_count FROM winners").fetchone()
+    assert winner == (player, str(mock_vrf.last_request_id()), str(fee * 3), 3)
@@ -0,0 +1,113 @@
+import asyncio
+import boa
+from script.keeper import RaffleKeeper
+from src import raffle
+
+
+def _keeper(rpc, addresses, submit, **kwargs):
+    return RaffleKeeper(rpc, addresses, submit, clock=lambda: boa.env.evm.patch.timestamp, **kwargs)
+
+
+def _step(keeper):
+    async def step():
+        delay = await keeper.step()
+        await asyncio.gather(*keeper.triggers)
+        return delay
+
+    return asyncio.run(step())
+
+
+def _enter(raffle_contract):
+    player = boa.env.generate_address()
+    boa.env.set_balance(player, 10**18)
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+
+
+def test_keeper_sleeps_until_deadline(raffle_contract, local_rpc):
+    """Test that the keeper waits for the interval, then requests a winner once"""
+    _enter(raffle_contract)
+    submitted = []
+
+    def submit(address):
+        submitted.append(address)
+        raffle.at(address).request_winner()
+
+    keeper = _keeper(local_rpc, [raffle_contract.address], submit)
+    assert _step(keeper) == 60
+    assert submitted == []
+    boa.env.time_travel(seconds=60)
+    _step(keeper)
+    assert submitted == [raffle_contract.address]
+    assert raffle_contract.get_raffle_state() == 1
+
+
+def test_keeper_idles_blocked_raffles(raffle_contract, factory_contract, mock_vrf, local_rpc):
+    """Test that raffles blocked by something other than time are rechecked later"""
+    empty = factory_contract.create_raffle(
+        10**16, 0, mock_vrf.address, b"\x00" * 32, 1234, 100000, [10000]
+    )
+    _enter(raffle_contract)
+    keeper = _keeper(local_rpc, [raffle_contract.address, empty], lambda a: None, idle_delay=300)
+    assert _step(keeper) == 60  # The empty raffle is past its deadline but has no players
+    assert sorted(wake for wake, _ in keeper.schedule)[-1] == boa.env.evm.patch.timestamp + 300
+
+
+def test_keeper_retries_failed_submissions(raffle_contract, local_rpc):
+    """Test that a failed request is retried until it lands"""
+    _enter(raffle_contract)
+    boa.env.time_travel(seconds=60)
+    attempts = []
+
+    def submit(address):
+        attempts.append(address)
+        if len(attempts) == 1:
+            raise RuntimeError("nonce too low")
+        raffle.at(address).request_winner()
+
+    _step(_keeper(local_rpc, [raffle_contract.address], submit, retry_delay=0))
+    assert len(attempts) == 2
+    assert raffle_contract.get_raffle_state() == 1
+
+
+def test_keeper_survives_failed_checks(raffle_contract, mock_vrf, local_rpc):
+    """Test that a reverting or non-raffle address neither drops its batch nor stops the keeper"""
+    _enter(raffle_contract)
+    boa.env.time_travel(seconds=60)
+    not_a_raffle = boa.env.generate_address()
+    submitted = []
+
+    def submit(address):
+        submitted.append(address)
+        raffle.at(address).request_winner()
+
+    keeper = _keeper(local_rpc, [raffle_contract.address, mock_vrf.address, not_a_raffle], submit, retry_delay=10)
+    _step(keeper)
+    assert submitted == [raffle_contract.address]
+    assert sorted(a for _, a in keeper.schedule) == sorted([raffle_contract.address, mock_vrf.address, not_a_raffle])
+    assert keeper.check_failures == {mock_vrf.address: 1, not_a_raffle: 1}
+    retry_at = {a: wake for wake, a in keeper.schedule}
+    assert retry_at[mock_vrf.address] - boa.env.evm.patch.timestamp <= 15
+
+
+def test_keeper_reschedules_after_rpc_outage(raffle_contract, local_rpc):
+    """Test that raffles checked during an RPC outage are checked again once it ends"""
+    _enter(raffle_contract)
+    boa.env.time_travel(seconds=60)
+    submitted = []
+    keeper = _keeper(local_rpc, [raffle_contract.address], submitted.append, retry_delay=1)
+    healthy_fetch = keeper.rpc.fetch
+
+    def unreachable(method, params):
+        raise ConnectionError("RPC unreachable")
+
+    keeper.rpc.fetch = keeper.rpc.fetch_multi = unreachable
+    _step(keeper)
+    assert submitted == []
+    assert [a for _, a in keeper.schedule] == [raffle_contract.address]
+
+    keeper.rpc.fetch = healthy_fetch
+    del keeper.rpc.fetch_multi
+    boa.env.time_travel(seconds=2)
+    _step(keeper)
+    assert submitted == [raffle_contract.address]
@@ -0,0 +1,17 @@
+import csv
+from script.load_test import CSV_FIELDS, run_load, write_csv
+
+
+def test_load_test_settles_every_round(tmp_path):
+    """Test that a small load run settles each round and writes one CSV row per round"""
+    rows = run_load(raffle_count=2, rounds=3, entries_per_round=5, player_count=7, tickets_per_entry=2)
+    assert [row["round"] for row in rows] == [0, 1, 2]
+    assert all(row["entries"] == 10 and row["ledger_slots"] == 10 for row in rows)
+    assert all(row["gas_per_entry"] > 0 and row["p99_ms"] >= row["p50_ms"] for row in rows)
+
+    path = tmp_path / "load.csv"
+    write_csv(rows, str(path))
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == CSV_FIELDS
+        assert len(list(reader)) == 3
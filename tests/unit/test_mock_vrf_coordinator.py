@@ -0,0 +1,96 @@
+import boa
+from eth_abi import encode
+from eth_utils import keccak
+from src import raffle
+
+
+def _raffles(factory_contract, mock_vrf, count, callback_gas_limit=500000):
+    """Raffles with one entry each, all ready to draw."""
+    raffles = []
+    for _ in range(count):
+        address = factory_contract.create_raffle(
+            10**16, 60, mock_vrf.address, b"\x00" * 32, 1234, callback_gas_limit, [10000]
+        )
+        raffles.append(raffle.at(address))
+    for raffle_contract in raffles:
+        player = boa.env.generate_address()
+        boa.env.set_balance(player, 10**18)
+        with boa.env.prank(player):
+            raffle_contract.enter_raffle(value=10**16)
+    boa.env.time_travel(seconds=61)
+    return raffles
+
+
+def test_request_ids_unique_across_consumers(factory_contract, mock_vrf):
+    """Test that requests from several raffles in one block get distinct ids"""
+    raffles = _raffles(factory_contract, mock_vrf, 3)
+    request_ids = []
+    for raffle_contract in raffles:
+        raffle_contract.request_winner()
+        request_ids.append(mock_vrf.last_request_id())
+    assert request_ids == [1, 2, 3]
+    assert [mock_vrf.requests(i).consumer for i in request_ids] == [r.address for r in raffles]
+    assert mock_vrf.pending_count() == 3
+
+
+def test_fulfill_pending_in_batches(factory_contract, mock_vrf):
+    """Test that fulfill_pending answers the oldest requests, at most max at a time"""
+    raffles = _raffles(factory_contract, mock_vrf, 3)
+    for raffle_contract in raffles:
+        raffle_contract.request_winner()
+    assert mock_vrf.fulfill_pending(2) == 2
+    assert [r.get_raffle_state() for r in raffles] == [0, 0, 1]
+    assert mock_vrf.fulfill_pending(10) == 1
+    assert mock_vrf.pending_count() == 0
+    assert all(r.get_round_id() == 1 for r in raffles)
+    assert mock_vrf.fulfill_pending(10) == 0
+
+
+def test_fulfill_delay(factory_contract, mock_vrf):
+    """Test that requests are held back for the configured number of blocks"""
+    (raffle_contract,) = _raffles(factory_contract, mock_vrf, 1)
+    mock_vrf.set_fulfill_delay(5)
+    raffle_contract.request_winner()
+    assert mock_vrf.fulfill_pending(10) == 0
+    boa.env.time_travel(blocks=5)
+    assert mock_vrf.fulfill_pending(10) == 1
+    assert raffle_contract.get_raffle_state() == 0
+
+
+def test_seeded_words_are_reproducible(factory_contract, mock_vrf):
+    """Test that the same seed draws the same winners"""
+    raffle_contract = _raffles(factory_contract, mock_vrf, 1)[0]
+    for _ in range(8):
+        player = boa.env.generate_address()
+        boa.env.set_balance(player, 10**18)
+        with boa.env.prank(player):
+            raffle_contract.enter_raffle(value=10**16)
+    raffle_contract.request_winner()
+    tickets = raffle_contract.get_players(0, 100)
+    request_id = mock_vrf.last_request_id()
+    winners = []
+    for seed in (7, 7, 8):
+        with boa.env.anchor():
+            mock_vrf.set_seed(seed)
+            mock_vrf.fulfill_pending(1)
+            winners.append(raffle_contract.get_recent_winner())
+    assert winners[0] == winners[1]
+    # Each seed draws the ticket its keccak word picks, so seed 8 is checked too
+    expected = [
+        tickets[int.from_bytes(keccak(encode(["uint256"] * 3, [seed, request_id, 0])), "big") % len(tickets)]
+        for seed in (7, 7, 8)
+    ]
+    assert winners == expected
+
+
+def test_failed_callback_does_not_block_queue(factory_contract, mock_vrf):
+    """Test that a callback running out of gas is logged and the queue moves on"""
+    starved = _raffles(factory_contract, mock_vrf, 1, callback_gas_limit=1000)[0]
+    healthy = _raffles(factory_contract, mock_vrf, 1)[0]
+    starved.request_winner()
+    healthy.request_winner()
+    assert mock_vrf.fulfill_pending(10) == 2
+    results = [e.success for e in mock_vrf.get_logs() if type(e).__name__ == "RandomWordsFulfilled"]
+    assert results == [False, True]
+    assert starved.get_raffle_state() == 1
+    assert healthy.get_raffle_state() == 0
@@ -1,5 +1,10 @@
 import pytest
 import boa
+from dataclasses import astuple
+from eth_account import Account
+from eth_utils import keccak
+from script.relayer import domain_separator, sign_entry
+from src import raffle
 
 def test_enter_raffle(raffle_contract, account):
     """Test that a user can enter the raffle with the correct entrance fee."""
@@ -14,6 +19,12 @@ def test_enter_raffle(raffle_contract, account):
     assert raffle_contract.get_player_count() == 1
     assert raffle_contract.get_player(0) == account.address
 
+def test_state_rolled_back_between_tests(raffle_contract):
+    """Test that entries from earlier tests do not leak into this one"""
+    assert raffle_contract.get_player_count() == 0
+    assert raffle_contract.get_round_id() == 0
+    assert boa.env.get_balance(raffle_contract.address) == 0
+
 def test_enter_raffle_insufficient_funds(raffle_contract):
     """Test that entering with insufficient funds reverts."""
     unfunded = boa.env.generate_address()
@@ -110,16 +121,35 @@ def test_reentrancy(raffle_contract, account):
     pass
 
 def test_enter_raffle_while_calculating(raffle_contract, mock_vrf, account):
-    """Test entering raffle while in CALCULATING state fails"""
+    """Test entering raffle while in CALCULATING state buffers into the next round"""
     entrance_fee = raffle_contract.get_entrance_fee()
     with boa.env.prank(account.address):
         raffle_contract.enter_raffle(value=entrance_fee)
     boa.env.time_travel(seconds=61)
     with boa.env.prank(account.address):
         raffle_contract.request_winner()  # Sets state to CALCULATING
-    with boa.env.prank(account.address):
-        with pytest.raises(Exception, match="Raffle not open"):
-            raffle_contract.enter_raffle(value=entrance_fee)
+    closed_round = raffle_contract.get_round_id()
+    closed_count = raffle_contract.get_player_count()
+    late_player = boa.env.generate_address()
+    boa.env.set_balance(late_player, 10**18)
+    with boa.env.prank(late_player):
+        raffle_contract.enter_raffle(value=entrance_fee)
+    assert raffle_contract.get_player_count() == closed_count
+    assert raffle_contract.get_pending_player_count() == 1
+    assert raffle_contract.pending_pot() == entrance_fee
+
+    pot = boa.env.get_balance(raffle_contract.address) - entrance_fee
+    request_id = mock_vrf.last_request_id()
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(request_id, [0])
+    # The late entry is not drawn from and its fee stays for the next round
+    assert raffle_contract.get_recent_winner() == account.address
+    assert raffle_contract.get_winnings(account.address) == pot
+    assert raffle_contract.unclaimed_winnings() == pot
+    assert raffle_contract.get_round_id() == closed_round + 1
+    assert raffle_contract.get_player_count() == 1
+    assert raffle_contract.get_player(0) == late_player
+    assert raffle_contract.get_pending_player_count() == 0
 
 
 def test_request_winner_no_players(raffle_contract, account):
@@ -143,7 +173,7 @@ def test_fulfill_random_words_wrong_state(raffle_contract, mock_vrf, account):
             
             
 def test_winner_payout(raffle_contract, mock_vrf, account):
-    """Test winner receives the contract balance"""
+    """Test winner is credited the pot and collects it with withdraw"""
     entrance_fee = raffle_contract.get_entrance_fee()
     with boa.env.prank(account.address):
         raffle_contract.enter_raffle(value=entrance_fee)
@@ -155,8 +185,16 @@ def test_winner_payout(raffle_contract, mock_vrf, account):
     random_words = [0]  # Picks account.address
     with boa.env.prank(mock_vrf.address):
         raffle_contract.fulfill_random_words(request_id, random_words)
-    final_balance = boa.env.get_balance(account.address)
-    assert final_balance > initial_balance  # Should increase by entrance_fee (minus gas)
+    assert boa.env.get_balance(account.address) == initial_balance  # Credited, not sent
+    assert raffle_contract.get_winnings(account.address) == entrance_fee
+    with boa.env.prank(account.address):
+        raffle_contract.withdraw()
+    assert boa.env.get_balance(account.address) == initial_balance + entrance_fee
+    assert raffle_contract.get_winnings(account.address) == 0
+    assert boa.env.get_balance(raffle_contract.address) == 0
+    with boa.env.prank(account.address):
+        with pytest.raises(boa.BoaError, match="No winnings to withdraw"):
+            raffle_contract.withdraw()
     
 def test_multiple_players_random_winner(raffle_contract, mock_vrf):
     """Test winner selection with multiple players"""
@@ -193,3 +231,361 @@ def test_reset_after_winner(raffle_contract, mock_vrf, account):
     assert raffle_contract.get_player_count() == 0
     assert raffle_contract.get_last_timestamp() > 0
     
+
+def test_enter_raffle_many(raffle_contract, account):
+    """Test buying several tickets in one transaction"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    tickets_before = raffle_contract.get_player_count()
+    entries_before = raffle_contract.get_entry_count()
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle_many(5, value=entrance_fee * 5)
+    assert raffle_contract.get_player_count() == tickets_before + 5
+    assert raffle_contract.get_entry_count() == entries_before + 1
+    for ticket in range(tickets_before, tickets_before + 5):
+        assert raffle_contract.get_player(ticket) == account.address
+    assert raffle_contract.get_player(tickets_before + 5) == "0x" + "00" * 20
+
+def test_baseline_getters_kept(raffle_contract, account):
+    """Test that player_count() and players(i) still answer as the original public variables did"""
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle_many(2, value=raffle_contract.get_entrance_fee() * 2)
+    assert raffle_contract.player_count() == raffle_contract.get_player_count() == 2
+    assert raffle_contract.players(1) == account.address
+    assert raffle_contract.players(2) == "0x" + "00" * 20
+
+def test_enter_raffle_many_insufficient_funds(raffle_contract, account):
+    """Test that underpaying for several tickets reverts"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    with boa.env.prank(account.address):
+        with pytest.raises(Exception, match="Not enough ETH sent"):
+            raffle_contract.enter_raffle_many(3, value=entrance_fee * 2)
+        with pytest.raises(Exception, match="Must buy at least one ticket"):
+            raffle_contract.enter_raffle_many(0, value=entrance_fee)
+
+def test_weighted_entry(raffle_contract, account):
+    """Test that paying a multiple of the fee buys that many tickets"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    tickets_before = raffle_contract.get_player_count()
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle(value=entrance_fee * 3 + entrance_fee // 2)
+    assert raffle_contract.get_player_count() == tickets_before + 3
+
+def test_winner_picked_from_ticket_ranges(raffle_contract, mock_vrf):
+    """Test the winner lookup across purchases of different sizes"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    players = [boa.env.generate_address() for _ in range(3)]
+    offset = raffle_contract.get_player_count()
+    for addr, tickets in zip(players, [1, 4, 2]):
+        boa.env.set_balance(addr, 10**18)
+        with boa.env.prank(addr):
+            raffle_contract.enter_raffle_many(tickets, value=entrance_fee * tickets)
+    # Tickets: [offset] -> players[0], [offset + 1, offset + 5) -> players[1], then players[2]
+    expected = {
+        offset: players[0],
+        offset + 1: players[1],
+        offset + 4: players[1],
+        offset + 5: players[2],
+        offset + 6: players[2],
+    }
+    for ticket, owner in expected.items():
+        assert raffle_contract.get_player(ticket) == owner
+    boa.env.time_travel(seconds=61)
+    with boa.env.prank(players[0]):
+        raffle_contract.request_winner()
+    request_id = mock_vrf.last_request_id()
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(request_id, [offset + 4])
+    assert raffle_contract.get_recent_winner() == players[1]
+    assert raffle_contract.get_entry_count() == 0
+
+def test_get_players_pages(raffle_contract, account):
+    """Test that paged reads return ticket owners in order across ranges"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    players = [boa.env.generate_address() for _ in range(3)]
+    expected = []
+    for addr, tickets in zip(players, [2, 1, 3]):
+        boa.env.set_balance(addr, 10**18)
+        with boa.env.prank(addr):
+            raffle_contract.enter_raffle_many(tickets, value=entrance_fee * tickets)
+        expected += [addr] * tickets
+    assert raffle_contract.get_players(0, 100) == expected
+    assert raffle_contract.get_players(1, 3) == expected[1:4]
+    assert raffle_contract.get_players(5, 10) == expected[5:]
+    assert raffle_contract.get_players(6, 1) == []
+
+def test_get_raffle_summary(raffle_contract, account):
+    """Test the one-call summary against the individual getters"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle_many(2, value=entrance_fee * 2)
+    summary = raffle_contract.get_raffle_summary()
+    assert summary.raffle_state == raffle_contract.get_raffle_state()
+    assert summary.round_id == raffle_contract.get_round_id()
+    assert summary.player_count == 2
+    assert summary.entry_count == 1
+    assert summary.pending_player_count == 0
+    assert summary.last_timestamp == raffle_contract.get_last_timestamp()
+    assert summary.recent_winner == raffle_contract.get_recent_winner()
+    assert summary.entrance_fee == entrance_fee
+    assert summary.interval == 60
+    assert summary.balance == entrance_fee * 2
+
+def test_stream_players(raffle_contract):
+    """Test that the paging helper reads the whole round"""
+    from script.players import stream_players
+
+    entrance_fee = raffle_contract.get_entrance_fee()
+    players = [boa.env.generate_address() for _ in range(7)]
+    for addr in players:
+        boa.env.set_balance(addr, 10**18)
+        with boa.env.prank(addr):
+            raffle_contract.enter_raffle(value=entrance_fee)
+    assert list(stream_players(raffle_contract, page_size=3)) == players
+
+def _play_round(raffle_contract, mock_vrf, players, random_word=0):
+    entrance_fee = raffle_contract.get_entrance_fee()
+    for addr in players:
+        boa.env.set_balance(addr, 10**18)
+        with boa.env.prank(addr):
+            raffle_contract.enter_raffle(value=entrance_fee)
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    mock_vrf.callBackWithRandomness(random_word)
+
+def test_recent_rounds(raffle_contract, mock_vrf):
+    """Test that settled rounds are returned newest first with their results"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    players = [boa.env.generate_address() for _ in range(3)]
+    assert raffle_contract.get_recent_rounds(10) == []
+    _play_round(raffle_contract, mock_vrf, players[:1])
+    first_request = mock_vrf.last_request_id()
+    _play_round(raffle_contract, mock_vrf, players, random_word=2)
+    rounds = raffle_contract.get_recent_rounds(10)
+    assert [r.round_id for r in rounds] == [1, 0]
+    assert rounds[0].winner == players[2]
+    assert rounds[0].prize == entrance_fee * 3
+    assert rounds[0].player_count == 3
+    assert rounds[0].request_id == mock_vrf.last_request_id()
+    assert rounds[0].timestamp == raffle_contract.get_last_timestamp()
+    assert rounds[1].winner == players[0]
+    assert rounds[1].prize == entrance_fee
+    assert rounds[1].request_id == first_request
+    assert len(raffle_contract.get_recent_rounds(1)) == 1
+
+def test_recent_rounds_wrap_around(raffle_contract, mock_vrf):
+    """Test that the history keeps only the newest rounds once the ring is full"""
+    player = boa.env.generate_address()
+    for _ in range(34):
+        _play_round(raffle_contract, mock_vrf, [player])
+    # A pending draw must not clobber the oldest record still being returned
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    rounds = raffle_contract.get_recent_rounds(100)
+    assert len(rounds) == 32
+    assert rounds[0].round_id == 33
+    assert rounds[-1].round_id == 2
+    assert all(r.winner == player and r.player_count == 1 for r in rounds)
+
+def _tiered_raffle(mock_vrf, prize_tiers):
+    return raffle.deploy(10**16, 60, mock_vrf.address, b"\x00" * 32, 1234, 100000, prize_tiers)
+
+def test_prize_tiers_validated(mock_vrf):
+    """Test that prize tiers must be non-empty and sum to the whole pot"""
+    with pytest.raises(boa.BoaError, match="No prize tiers"):
+        _tiered_raffle(mock_vrf, [])
+    with pytest.raises(boa.BoaError, match="Empty prize tier"):
+        _tiered_raffle(mock_vrf, [10000, 0])
+    with pytest.raises(boa.BoaError, match="Prize tiers must sum to 10000"):
+        _tiered_raffle(mock_vrf, [6000, 3000])
+
+def test_multiple_winners_paid_by_tier(mock_vrf):
+    """Test that each tier pays a distinct ticket its share of the pot"""
+    raffle_contract = _tiered_raffle(mock_vrf, [6000, 3000, 1000])
+    assert raffle_contract.get_prize_tiers() == [6000, 3000, 1000]
+    players = [boa.env.generate_address() for _ in range(4)]
+    _play_round(raffle_contract, mock_vrf, players)
+    paid = [e for e in mock_vrf.get_logs() if type(e).__name__ == "PaidPrize"]
+    assert mock_vrf.last_num_words() == 3
+
+    pot = raffle_contract.get_entrance_fee() * 4
+    assert [e.tier for e in paid] == [0, 1, 2]
+    assert [e.amount for e in paid] == [pot * 60 // 100, pot * 30 // 100, pot - pot * 90 // 100]
+    # Word 0 picks ticket 0; the remaining draws skip tickets already taken
+    assert len({e.winner for e in paid}) == 3
+    assert paid[0].winner == players[0]
+    assert raffle_contract.get_recent_winner() == players[0]
+    for event in paid:
+        assert raffle_contract.get_winnings(event.winner) == event.amount
+    assert raffle_contract.unclaimed_winnings() == pot
+
+def test_fewer_tickets_than_tiers(mock_vrf):
+    """Test that the last ticket drawn also takes the unawarded tiers"""
+    raffle_contract = _tiered_raffle(mock_vrf, [6000, 3000, 1000])
+    players = [boa.env.generate_address() for _ in range(2)]
+    _play_round(raffle_contract, mock_vrf, players)
+    paid = [e for e in mock_vrf.get_logs() if type(e).__name__ == "PaidPrize"]
+    pot = raffle_contract.get_entrance_fee() * 2
+    assert [e.amount for e in paid] == [pot * 60 // 100, pot - pot * 60 // 100]
+    assert {e.winner for e in paid} == set(players)
+
+def test_mock_vrf_delivers_requested_words(mock_vrf):
+    """Test that the mock sends as many words as were requested"""
+    raffle_contract = _tiered_raffle(mock_vrf, [5000, 5000])
+    players = [boa.env.generate_address() for _ in range(2)]
+    for player in players:
+        boa.env.set_balance(player, 10**18)
+        with boa.env.prank(player):
+            raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    mock_vrf.callBackWithRandomness(7)
+    paid = [e for e in mock_vrf.get_logs() if type(e).__name__ == "PaidPrize"]
+    assert len(paid) == 2
+    assert {e.winner for e in paid} == set(players)
+
+def test_unclaimed_winnings_excluded_from_next_pot(raffle_contract, mock_vrf):
+    """Test that a later round's prize does not include earlier unclaimed winnings"""
+    entrance_fee = raffle_contract.get_entrance_fee()
+    first, second = boa.env.generate_address(), boa.env.generate_address()
+    _play_round(raffle_contract, mock_vrf, [first])
+    _play_round(raffle_contract, mock_vrf, [second, second])
+    assert raffle_contract.get_winnings(first) == entrance_fee
+    assert raffle_contract.get_winnings(second) == entrance_fee * 2
+    assert raffle_contract.get_recent_rounds(1)[0].prize == entrance_fee * 2
+    with boa.env.prank(first):
+        raffle_contract.withdraw()
+    assert boa.env.get_balance(raffle_contract.address) == entrance_fee * 2
+
+def test_reverting_winner_does_not_block_settlement(raffle_contract, mock_vrf):
+    """Test that a winner contract rejecting ETH cannot stall the round"""
+    rejecter = boa.loads("""
+# pragma version 0.4.0
+@external
+@payable
+def enter(raffle: address):
+    raw_call(raffle, method_id("enter_raffle()"), value=msg.value)
+""")
+    entrance_fee = raffle_contract.get_entrance_fee()
+    boa.env.set_balance(rejecter.address, entrance_fee)
+    rejecter.enter(raffle_contract.address, value=entrance_fee, sender=rejecter.address)
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    mock_vrf.callBackWithRandomness(0)
+    assert raffle_contract.get_raffle_state() == 0
+    assert raffle_contract.get_winnings(rejecter.address) == entrance_fee
+
+def test_check_upkeep(raffle_contract, account):
+    """Test that check_upkeep reports what request_winner would revert with"""
+    status = raffle_contract.check_upkeep()
+    assert not status.upkeep_needed
+    assert status.blocked_by == "Time interval not passed"
+    assert status.callable_at == raffle_contract.get_last_timestamp() + 60
+    boa.env.time_travel(seconds=60)
+    assert raffle_contract.check_upkeep().blocked_by == "No players in raffle"
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+    status = raffle_contract.check_upkeep()
+    assert status.upkeep_needed
+    assert status.blocked_by == ""
+    raffle_contract.request_winner()
+    assert raffle_contract.check_upkeep().blocked_by == "Raffle not open"
+
+def _depositors(raffle_contract, count, tickets_each):
+    players = [Account.from_key(keccak(text=f"relayed player {i}")) for i in range(count)]
+    for player in players:
+        boa.env.set_balance(player.address, 10**18)
+        with boa.env.prank(player.address):
+            raffle_contract.deposit(value=raffle_contract.get_entrance_fee() * tickets_each)
+    return players
+
+def _signed(raffle_contract, player, ticket_count, nonce, deadline=None):
+    deadline = boa.env.evm.patch.timestamp + 60 if deadline is None else deadline
+    return astuple(sign_entry(player.key, raffle_contract.domain_separator(), ticket_count, nonce, deadline))
+
+def test_relayed_entries_paid_from_deposits(raffle_contract):
+    """Test that one relayed batch records every signed entry and debits each deposit"""
+    fee = raffle_contract.get_entrance_fee()
+    players = _depositors(raffle_contract, 3, 3)
+    assert raffle_contract.domain_separator() == domain_separator(raffle_contract.address, boa.env.evm.patch.chain_id)
+    assert raffle_contract.total_deposits() == fee * 9
+    batch = [
+        _signed(raffle_contract, players[0], 1, 0),
+        _signed(raffle_contract, players[1], 2, 0),
+        _signed(raffle_contract, players[0], 2, 1),
+    ]
+    relayer = boa.env.generate_address()
+    with boa.env.prank(relayer):
+        assert raffle_contract.enter_raffle_relayed(batch) == 3
+    owners = [players[0].address] + [players[1].address] * 2 + [players[0].address] * 2
+    assert raffle_contract.get_players(0, 10) == owners
+    assert raffle_contract.get_entry_count() == 3
+    assert raffle_contract.deposits(players[0].address) == 0
+    assert raffle_contract.deposits(players[1].address) == fee
+    assert raffle_contract.deposits(players[2].address) == fee * 3
+    assert raffle_contract.nonces(players[0].address) == 2
+    assert raffle_contract.total_deposits() == fee * 4
+
+    # Spent nonces cannot be replayed
+    with boa.env.prank(relayer):
+        assert raffle_contract.enter_raffle_relayed(batch) == 0
+    assert raffle_contract.get_player_count() == 5
+
+def test_invalid_relayed_entries_skipped(raffle_contract):
+    """Test that bad entries are skipped without voiding the rest of the batch"""
+    players = _depositors(raffle_contract, 2, 2)
+    forged = list(_signed(raffle_contract, players[1], 1, 0))
+    forged[0] = players[0].address  # Signed by players[1]
+    batch = [
+        tuple(forged),
+        _signed(raffle_contract, players[0], 1, 1),  # Nonce 0 not used yet
+        _signed(raffle_contract, players[0], 1, 0, deadline=boa.env.evm.patch.timestamp - 1),
+        _signed(raffle_contract, players[0], 3, 0),  # More than the deposit pays for
+        _signed(raffle_contract, players[0], 0, 0),
+        _signed(raffle_contract, players[1], 2, 0),
+    ]
+    assert raffle_contract.enter_raffle_relayed(batch) == 1
+    assert raffle_contract.get_players(0, 10) == [players[1].address] * 2
+    assert raffle_contract.nonces(players[0].address) == 0
+    assert raffle_contract.deposits(players[0].address) == raffle_contract.get_entrance_fee() * 2
+
+def test_deposits_excluded_from_pot(raffle_contract, mock_vrf):
+    """Test that unspent deposits are never drawn and can be withdrawn"""
+    fee = raffle_contract.get_entrance_fee()
+    (depositor,) = _depositors(raffle_contract, 1, 5)
+    boa.env.time_travel(seconds=61)
+    with pytest.raises(boa.BoaError, match="No players in raffle"):
+        raffle_contract.request_winner()
+
+    player = boa.env.generate_address()
+    _play_round(raffle_contract, mock_vrf, [player])
+    assert raffle_contract.get_winnings(player) == fee
+    assert raffle_contract.get_recent_rounds(1)[0].prize == fee
+
+    with boa.env.prank(depositor.address):
+        with pytest.raises(boa.BoaError, match="Not enough deposited"):
+            raffle_contract.withdraw_deposit(fee * 6)
+        raffle_contract.withdraw_deposit(fee * 5)
+    assert raffle_contract.total_deposits() == 0
+    assert boa.env.get_balance(depositor.address) == 10**18
+    assert boa.env.get_balance(raffle_contract.address) == fee
+
+def test_relayed_entries_while_calculating(raffle_contract, mock_vrf, account):
+    """Test that entries relayed during a draw join the pending pot of the next round"""
+    fee = raffle_contract.get_entrance_fee()
+    (player,) = _depositors(raffle_contract, 1, 2)
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle(value=fee)
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    assert raffle_contract.enter_raffle_relayed([_signed(raffle_contract, player, 2, 0)]) == 1
+    assert raffle_contract.pending_pot() == fee * 2
+    assert raffle_contract.get_pending_player_count() == 2
+    assert raffle_contract.total_deposits() == 0
+
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(mock_vrf.last_request_id(), [0])
+    assert raffle_contract.get_winnings(account.address) == fee
+    assert raffle_contract.get_players(0, 10) == [player.address] * 2
+    assert raffle_contract.pending_pot() == 0
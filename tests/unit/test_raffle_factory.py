@@ -0,0 +1,60 @@
+import pytest
+import boa
+from src import raffle
+
+
+def _args(mock_vrf, entrance_fee=10**16, interval=60, prize_tiers=(10000,)):
+    return (entrance_fee, interval, mock_vrf.address, b"\x00" * 32, 1234, 100000, list(prize_tiers))
+
+
+def test_create_raffle_registers_instance(factory_contract, mock_vrf):
+    """Test that created raffles are recorded in the registry"""
+    address = factory_contract.create_raffle(*_args(mock_vrf, interval=120))
+    assert factory_contract.get_raffle_count() == 1
+    assert factory_contract.get_raffle(0) == address
+    assert factory_contract.is_raffle(address)
+    raffle_contract = raffle.at(address)
+    assert raffle_contract.get_entrance_fee() == 10**16
+    assert raffle_contract.get_raffle_summary().interval == 120
+
+
+def test_factory_raffle_runs_a_round(factory_contract, mock_vrf):
+    """Test that a blueprint instance behaves like a directly deployed raffle"""
+    raffle_contract = raffle.at(factory_contract.create_raffle(*_args(mock_vrf)))
+    player = boa.env.generate_address()
+    boa.env.set_balance(player, 10**18)
+    with boa.env.prank(player):
+        raffle_contract.enter_raffle(value=10**16)
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    with boa.env.prank(mock_vrf.address):
+        raffle_contract.fulfill_random_words(mock_vrf.last_request_id(), [0])
+    assert raffle_contract.get_recent_winner() == player
+
+
+def test_create_raffles_batch(factory_contract, mock_vrf):
+    """Test creating several raffles with different settings in one transaction"""
+    fees = [10**15, 10**16, 10**17]
+    addresses = factory_contract.create_raffles([_args(mock_vrf, entrance_fee=fee) for fee in fees])
+    assert len(addresses) == 3
+    assert factory_contract.get_raffle_count() == 3
+    for index, (address, fee) in enumerate(zip(addresses, fees)):
+        assert factory_contract.get_raffle(index) == address
+        assert raffle.at(address).get_entrance_fee() == fee
+
+
+def test_create_raffle_rejects_zero_fee(factory_contract, mock_vrf):
+    """Test that constructor checks still apply to blueprint instances"""
+    with pytest.raises(Exception):
+        factory_contract.create_raffle(*_args(mock_vrf, entrance_fee=0))
+    assert factory_contract.get_raffle_count() == 0
+
+
+def test_load_raffle_configs():
+    """Test that the rollout config applies defaults to every raffle"""
+    from script.deploy_factory import load_raffle_configs
+
+    configs = load_raffle_configs()
+    assert len(configs) >= 1
+    for config in configs:
+        assert {"entrance_fee", "interval", "gas_lane", "subscription_id", "callback_gas_limit", "prize_tiers"} <= set(config)
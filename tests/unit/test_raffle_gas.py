@@ -0,0 +1,124 @@
+"""
+Gas benchmarks for the raffle entry points.
+
+Sweeps the number of players in a round and records the execution gas of
+enter_raffle, request_winner and fulfill_random_words at each size. Results
+are checked against gas_baseline.json. Set UPDATE_GAS_BASELINE=1 to rewrite
+it, and GAS_TOLERANCE to change the allowed regression (default 0.02).
+"""
+import json
+import os
+from pathlib import Path
+
+import boa
+import pytest
+from dataclasses import astuple
+from eth_account import Account
+from eth_utils import keccak
+from script.relayer import RELAY_BATCH_SIZE, sign_entry
+from src.mocks import mock_vrf_coordinator
+from src import raffle
+
+BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+PLAYER_COUNTS = [1, 10, 100, 1_000, 10_000]
+ENTRY_POINTS = ["enter_raffle", "request_winner", "fulfill_random_words"]
+ENTRANCE_FEE = 10**16
+INTERVAL = 60
+PLAYER_POOL_SIZE = 100
+GAS_TOLERANCE = float(os.environ.get("GAS_TOLERANCE", "0.02"))
+UPDATE_BASELINE = os.environ.get("UPDATE_GAS_BASELINE") == "1"
+TX_BASE_GAS = 21_000
+
+
+def _measure(contract, fn, *args, **kwargs) -> int:
+    """Call fn with cold storage and return the gas its execution used."""
+    boa.env.reset_gas_used()
+    fn(*args, **kwargs)
+    return contract._computation.get_gas_used()
+
+
+def _sweep() -> dict:
+    mock = mock_vrf_coordinator.deploy()
+    raffle_contract = raffle.deploy(ENTRANCE_FEE, INTERVAL, mock.address, b"\x00" * 32, 1234, 100000, [10000])
+    players = [boa.env.generate_address() for _ in range(PLAYER_POOL_SIZE)]
+    for addr in players:
+        boa.env.set_balance(addr, 10**24)
+
+    results = {name: {} for name in ENTRY_POINTS}
+    for count in PLAYER_COUNTS:
+        # Each size is measured on a fresh round, so the winner draw settles it
+        for i in range(count - 1):
+            with boa.env.prank(players[i % PLAYER_POOL_SIZE]):
+                raffle_contract.enter_raffle(value=ENTRANCE_FEE)
+        with boa.env.prank(players[(count - 1) % PLAYER_POOL_SIZE]):
+            results["enter_raffle"][str(count)] = _measure(
+                raffle_contract, raffle_contract.enter_raffle, value=ENTRANCE_FEE
+            )
+
+        boa.env.time_travel(seconds=INTERVAL + 1)
+        with boa.env.prank(players[0]):
+            results["request_winner"][str(count)] = _measure(raffle_contract, raffle_contract.request_winner)
+
+        request_id = mock.last_request_id()
+        with boa.env.prank(mock.address):
+            # The last ticket takes the longest path through the ticket ranges
+            results["fulfill_random_words"][str(count)] = _measure(
+                raffle_contract, raffle_contract.fulfill_random_words, request_id, [count - 1]
+            )
+    return results
+
+
+@pytest.fixture(scope="module")
+def gas_results():
+    # A separate env has no open snapshots, so warm/cold counters can be reset per call
+    with boa.swap_env(boa.Env()):
+        results = _sweep()
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return results
+
+
+@pytest.fixture(scope="module")
+def gas_baseline():
+    if not BASELINE_PATH.exists():
+        pytest.skip("No gas baseline recorded, run with UPDATE_GAS_BASELINE=1")
+    return json.loads(BASELINE_PATH.read_text())
+
+
+@pytest.mark.parametrize("player_count", PLAYER_COUNTS)
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS)
+def test_gas_regression(gas_results, gas_baseline, entry_point, player_count):
+    """Test that no entry point costs more gas than the recorded baseline allows"""
+    measured = gas_results[entry_point][str(player_count)]
+    expected = gas_baseline.get(entry_point, {}).get(str(player_count))
+    if expected is None:
+        pytest.skip(f"No baseline for {entry_point} at {player_count} players")
+    assert measured <= expected * (1 + GAS_TOLERANCE), (
+        f"{entry_point} with {player_count} players used {measured} gas, baseline is {expected}"
+    )
+
+
+def _calldata_gas(data: bytes) -> int:
+    return sum(16 if byte else 4 for byte in data)
+
+
+def test_relayed_entries_amortise_base_cost():
+    """Test that a full relayed batch costs each entry well under its own transaction"""
+    with boa.swap_env(boa.Env()):
+        mock = mock_vrf_coordinator.deploy()
+        raffle_contract = raffle.deploy(ENTRANCE_FEE, INTERVAL, mock.address, b"\x00" * 32, 1234, 100000, [10000])
+        players = [Account.from_key(keccak(text=f"relayed player {i}")) for i in range(RELAY_BATCH_SIZE + 1)]
+        for player in players:
+            boa.env.set_balance(player.address, 10**18)
+            with boa.env.prank(player.address):
+                raffle_contract.deposit(value=ENTRANCE_FEE)
+        domain = raffle_contract.domain_separator()
+        batch = [astuple(sign_entry(p.key, domain, 1, 0, 2**40)) for p in players[:RELAY_BATCH_SIZE]]
+
+        direct = _measure(raffle_contract, raffle_contract.enter_raffle, value=ENTRANCE_FEE, sender=players[-1].address)
+        direct += TX_BASE_GAS + _calldata_gas(raffle_contract.enter_raffle.prepare_calldata())
+        relayed = _measure(raffle_contract, raffle_contract.enter_raffle_relayed, batch)
+        relayed += TX_BASE_GAS + _calldata_gas(raffle_contract.enter_raffle_relayed.prepare_calldata(batch))
+        assert raffle_contract.get_player_count() == RELAY_BATCH_SIZE + 1
+    # Both write a fresh entry slot; relaying saves the base cost but adds a signature check
+    assert relayed / RELAY_BATCH_SIZE < direct * 0.75, (relayed / RELAY_BATCH_SIZE, direct)
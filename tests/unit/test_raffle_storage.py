@@ -0,0 +1,78 @@
+"""
+Pins the raffle's storage layout. enter_raffle and fulfill_random_words
+touch one round-state slot and one ledger slot per buffer; splitting those
+fields back out would cost extra SLOAD/SSTOREs on every call. Likewise a
+relayed entry updates one packed deposit-and-nonce slot per player.
+"""
+import json
+from dataclasses import astuple
+from pathlib import Path
+
+import boa
+import vvm
+from eth_account import Account
+from eth_utils import keccak
+from script.relayer import sign_entry
+
+RAFFLE_SOURCE = Path(__file__).parent.parent.parent / "src" / "raffle.vy"
+ROUND_STATE_SLOT = 2
+ACCOUNTS_SLOT = 7
+
+
+def _layout() -> dict:
+    return json.loads(vvm.compile_source(RAFFLE_SOURCE.read_text(), vyper_version="0.4.0", output_format="layout"))
+
+
+def test_storage_slots_pinned():
+    """Test that round state and each buffer's counters share a slot"""
+    storage = {name: item["slot"] for name, item in _layout()["storage_layout"].items()}
+    assert storage == {
+        "entries": 0,
+        "ledger": 1,
+        "round_state": ROUND_STATE_SLOT,
+        "held_funds": 3,
+        "winnings": 4,
+        "unclaimed_winnings": 5,
+        "round_history": 6,
+        "accounts": ACCOUNTS_SLOT,
+    }
+
+
+def test_reentrancy_lock_is_transient():
+    """Test that the nonreentrant lock lives in EIP-1153 transient storage"""
+    layout = _layout()
+    assert "$.nonreentrant_key" in layout["transient_storage_layout"]
+    assert not any("nonreentrant" in name for name in layout["storage_layout"])
+
+
+def test_round_state_packing(raffle_contract, mock_vrf, account):
+    """Test the bit positions of the packed round state"""
+    with boa.env.prank(account.address):
+        raffle_contract.enter_raffle(value=raffle_contract.get_entrance_fee())
+    boa.env.time_travel(seconds=61)
+    raffle_contract.request_winner()
+    mock_vrf.callBackWithRandomness(0)
+
+    packed = boa.env.evm.get_storage(raffle_contract.address, ROUND_STATE_SLOT)
+    assert packed & (2**160 - 1) == int(account.address, 16)
+    assert (packed >> 160) & (2**40 - 1) == raffle_contract.last_timestamp()
+    assert (packed >> 200) & 0xFF == raffle_contract.raffle_state() == 0
+    assert packed >> 208 == raffle_contract.round_id() == 1
+    assert raffle_contract.recent_winner() == account.address
+
+
+def test_account_packing(raffle_contract):
+    """Test that a player's deposit and next entry nonce share one slot"""
+    fee = raffle_contract.get_entrance_fee()
+    player = Account.from_key(keccak(text="packed player"))
+    boa.env.set_balance(player.address, 10**18)
+    with boa.env.prank(player.address):
+        raffle_contract.deposit(value=fee * 3)
+    entry = sign_entry(player.key, raffle_contract.domain_separator(), 1, 0, 2**40)
+    raffle_contract.enter_raffle_relayed([astuple(entry)])
+
+    # Vyper hashes the map's slot ahead of the key
+    slot = int.from_bytes(keccak(ACCOUNTS_SLOT.to_bytes(32, "big") + bytes(12) + bytes.fromhex(player.address[2:])), "big")
+    packed = boa.env.evm.get_storage(raffle_contract.address, slot)
+    assert packed & (2**128 - 1) == raffle_contract.deposits(player.address) == fee * 2
+    assert packed >> 128 == raffle_contract.nonces(player.address) == 1
@@ -0,0 +1,165 @@
+import asyncio
+from dataclasses import astuple, replace
+import boa
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_utils import keccak
+from script.relayer import EntryRelayer, entry_message, sign_entry
+
+
+def _players(raffle_contract, count):
+    players = [Account.from_key(keccak(text=f"relayer player {i}")) for i in range(count)]
+    for player in players:
+        boa.env.set_balance(player.address, 10**18)
+        with boa.env.prank(player.address):
+            raffle_contract.deposit(value=raffle_contract.get_entrance_fee() * 2)
+    return players
+
+
+def _relayer(raffle_contract, batches, **kwargs):
+    def submit(batch):
+        batches.append(len(batch))
+        return raffle_contract.enter_raffle_relayed([astuple(entry) for entry in batch])
+
+    return EntryRelayer(
+        raffle_contract.domain_separator(), submit, clock=lambda: boa.env.evm.patch.timestamp, **kwargs
+    )
+
+
+def test_entry_message_matches_typed_data(raffle_contract):
+    """Test that entries are signed over the same message a wallet builds from the typed data"""
+    player = Account.from_key(keccak(text="wallet"))
+    typed = encode_typed_data(full_message={
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"},
+            ],
+            "Entry": [
+                {"name": "player", "type": "address"},
+                {"name": "ticket_count", "type": "uint256"},
+                {"name": "nonce", "type": "uint256"},
+                {"name": "deadline", "type": "uint256"},
+            ],
+        },
+        "primaryType": "Entry",
+        "domain": {
+            "name": "Raffle",
+            "version": "1",
+            "chainId": boa.env.evm.patch.chain_id,
+            "verifyingContract": raffle_contract.address,
+        },
+        "message": {"player": player.address, "ticket_count": 3, "nonce": 7, "deadline": 10**10},
+    })
+    assert typed == entry_message(raffle_contract.domain_separator(), player.address, 3, 7, 10**10)
+
+
+def test_relayer_flushes_by_size_and_time(raffle_contract):
+    """Test that a full batch is sent at once and a partial one after max_wait"""
+    players = _players(raffle_contract, 4)
+    domain = raffle_contract.domain_separator()
+    deadline = boa.env.evm.patch.timestamp + 600
+    batches = []
+    relayer = _relayer(raffle_contract, batches, max_batch=3, max_wait=5)
+
+    forged = replace(sign_entry(players[0].key, domain, 1, 0, deadline), player=players[1].address)
+    assert not relayer.add(forged)
+    for player in players:
+        assert relayer.add(sign_entry(player.key, domain, 1, 0, deadline))
+    assert asyncio.run(relayer.step()) == 5
+    assert batches == [3]
+    assert raffle_contract.get_player_count() == 3
+
+    boa.env.time_travel(seconds=4)
+    assert asyncio.run(relayer.step()) == 1
+    assert batches == [3]
+    boa.env.time_travel(seconds=1)
+    asyncio.run(relayer.step())
+    assert batches == [3, 1]
+    assert raffle_contract.get_players(0, 10) == [p.address for p in players]
+    assert (relayer.recorded, relayer.skipped) == (4, 0)
+
+
+def test_relayer_run_drains_queue(raffle_contract):
+    """Test that run() relays what is left on shutdown, in nonce order per player"""
+    (player,) = _players(raffle_contract, 1)
+    domain = raffle_contract.domain_separator()
+    deadline = boa.env.evm.patch.timestamp + 600
+    batches = []
+    relayer = _relayer(raffle_contract, batches)
+
+    async def relay():
+        entries = asyncio.Queue()
+        for nonce in (1, 0, 0):  # The repeated nonce is skipped on chain
+            await entries.put(sign_entry(player.key, domain, 1, nonce, deadline))
+        await entries.put(None)
+        await relayer.run(entries)
+
+    asyncio.run(relay())
+    assert batches == [3]
+    assert (relayer.recorded, relayer.skipped) == (2, 1)
+    assert raffle_contract.nonces(player.address) == 2
+    assert raffle_contract.deposits(player.address) == 0
+
+
+def test_relayer_keeps_entries_when_submit_fails(raffle_contract):
+    """Test that a failed submission keeps its entries queued and they are sent after the backoff"""
+    players = _players(raffle_contract, 2)
+    domain = raffle_contract.domain_separator()
+    deadline = boa.env.evm.patch.timestamp + 600
+    batches = []
+    relayer = _relayer(raffle_contract, batches, max_batch=2, retry_delay=3)
+    relay = relayer.submit
+    outage = [True]
+
+    def submit(batch):
+        if outage[0]:
+            raise ConnectionError("RPC unreachable")
+        return relay(batch)
+
+    relayer.submit = submit
+    for player in players:
+        relayer.add(sign_entry(player.key, domain, 1, 0, deadline))
+    assert asyncio.run(relayer.step()) == 3
+    assert len(relayer.queued) == 2 and relayer.failures == 1
+    boa.env.time_travel(seconds=3)
+    assert asyncio.run(relayer.step()) == 6  # Backs off twice as long after a second failure
+
+    outage[0] = False
+    boa.env.time_travel(seconds=6)
+    asyncio.run(relayer.step())
+    assert batches == [2]
+    assert relayer.queued == [] and relayer.failures == 0
+    assert raffle_contract.get_players(0, 10) == [p.address for p in players]
+
+
+def test_relayer_run_survives_failed_submissions(raffle_contract):
+    """Test that run() keeps relaying after a failed batch and drains the rest on shutdown"""
+    (player,) = _players(raffle_contract, 1)
+    domain = raffle_contract.domain_separator()
+    deadline = boa.env.evm.patch.timestamp + 600
+    batches = []
+    relayer = _relayer(raffle_contract, batches, max_batch=1, retry_delay=0)
+    relay = relayer.submit
+    attempts = []
+
+    def submit(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise RuntimeError("nonce too low")
+        return relay(batch)
+
+    relayer.submit = submit
+
+    async def run():
+        entries = asyncio.Queue()
+        for nonce in (0, 1):
+            await entries.put(sign_entry(player.key, domain, 1, nonce, deadline))
+        await entries.put(None)
+        return await relayer.run(entries)
+
+    assert asyncio.run(run()) == 0
+    assert len(attempts) == 3
+    assert raffle_contract.nonces(player.address) == 2
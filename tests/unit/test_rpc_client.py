@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import boa
+import pytest
+from boa.rpc import EthereumRPC, RPCError, to_int
+from script.rpc_client import AsyncRaffleClient, ContractReader, ThreadLocalRPC
+from src import raffle
+
+
+class StubNode(ThreadingHTTPServer):
+    """JSON-RPC over keep-alive HTTP, answered by a LocalRPC node."""
+
+    def __init__(self, rpc):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.rpc = rpc
+        self.lock = threading.Lock()  # boa's chain is not thread-safe
+        self.requests = 0
+        self.connections = 0
+
+    def handle_call(self, method, params):
+        if method == "eth_call":
+            assert to_int(params[1]) == boa.env.evm.patch.block_number, "Read not pinned to the head block"
+        return self.rpc.fetch(method, params)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        responses = []
+        with self.server.lock:
+            self.server.requests += 1
+            for request in body if isinstance(body, list) else [body]:
+                try:
+                    result = self.server.handle_call(request["method"], request["params"])
+                    responses.append({"jsonrpc": "2.0", "id": request["id"], "result": result})
+                except RPCError as e:
+                    error = {"code": e.code, "message": str(e)}
+                    responses.append({"jsonrpc": "2.0", "id": request["id"], "error": error})
+        payload = json.dumps(responses if isinstance(body, list) else responses[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def node(local_rpc):
+    server = StubNode(local_rpc)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(node):
+    url = f"http://127.0.0.1:{node.server_port}"
+    return AsyncRaffleClient(ThreadLocalRPC(lambda: EthereumRPC(url)))
+
+
+def test_fan_out_reads_are_batched_and_cached(node, mock_vrf):
+    """Test that reads over many raffles take a few batched requests and are cached per block"""
+    raffles = [
+        raffle.deploy(10**16, 60, mock_vrf.address, b"\x00" * 32, 1234, 100000, [10000]) for _ in range(150)
+    ]
+    player = boa.env.generate_address()
+    boa.env.set_balance(player, 10**18)
+    with boa.env.prank(player):
+        raffles[7].enter_raffle_many(3, value=3 * 10**16)
+    client = _client(node)
+
+    async def read_all():
+        counts = asyncio.gather(*(client.at(r.address).get_player_count() for r in raffles))
+        summaries = asyncio.gather(*(client.at(r.address).get_raffle_summary() for r in raffles))
+        return await counts, await summaries
+
+    counts, summaries = asyncio.run(read_all())
+    assert counts == [r.get_player_count() for r in raffles]
+    assert summaries[7].player_count == 3 and summaries[7].balance == 3 * 10**16
+    assert node.requests == 1 + 3  # The block number, then 300 calls in batches of 100
+    assert node.connections <= 4
+
+    assert asyncio.run(read_all()) == (counts, summaries)
+    assert node.requests == 4 + 1  # Same block, so only the block number is fetched
+
+    with boa.env.prank(player):
+        raffles[7].enter_raffle(value=10**16)
+    boa.env.time_travel(blocks=1)
+    counts, _ = asyncio.run(read_all())
+    assert counts[7] == 4
+
+
+def test_reverting_call_fails_alone(node, raffle_contract):
+    """Test that a reverting call in a batch does not fail the calls batched with it"""
+    client = _client(node)
+    missing = {"type": "function", "name": "pending_count", "stateMutability": "view", "inputs": [],
+               "outputs": [{"name": "", "type": "uint256"}]}
+    reader = ContractReader(client, raffle_contract.address, [missing])
+
+    async def read():
+        return await asyncio.gather(
+            client.at(raffle_contract.address).get_entrance_fee(),
+            reader.pending_count(),
+            return_exceptions=True,
+        )
+
+    fee, error = asyncio.run(read())
+    assert fee == 10**16
+    assert isinstance(error, RPCError)
+
+
+def test_cancelled_read_does_not_stall_batch(node, raffle_contract):
+    """Test that cancelling one of two batched reads still answers the other"""
+    client = _client(node)
+    reader = client.at(raffle_contract.address)
+
+    async def read():
+        cancelled = asyncio.create_task(reader.get_player_count())
+        fee = asyncio.create_task(reader.get_entrance_fee())
+        await asyncio.sleep(0)  # Both are queued for the same flush
+        cancelled.cancel()
+        return await asyncio.wait_for(fee, timeout=10)
+
+    assert asyncio.run(read()) == 10**16
+    assert node.requests == 2  # The block number, then the batch
+
+
+def test_thread_local_rpc_gives_each_thread_its_own_rpc(node):
+    """Test that threads fetching through one ThreadLocalRPC never share an EthereumRPC"""
+    url = f"http://127.0.0.1:{node.server_port}"
+    rpc = ThreadLocalRPC(lambda: EthereumRPC(url))
+
+    def fetch():
+        rpc.fetch("eth_blockNumber", [])
+        return threading.get_ident(), rpc.rpc
+
+    async def fetch_from_threads():
+        return await asyncio.gather(*(asyncio.to_thread(fetch) for _ in range(8)))
+
+    used = dict(asyncio.run(fetch_from_threads()))
+    assert len({id(r) for r in used.values()}) == len(used)  # One per thread, none shared
+    assert rpc.rpc not in used.values()  # This thread gets its own as well
+    assert fetch()[1] is rpc.rpc
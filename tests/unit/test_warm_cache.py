@@ -0,0 +1,16 @@
+from boa import interpret
+from script.warm_cache import warm_cache
+
+
+def test_warm_cache_compiles_once(tmp_path):
+    """Test that a cold cache compiles every contract and a warm one compiles none"""
+    interpret.set_cache_dir(tmp_path)
+    try:
+        cold = warm_cache()
+        warm = warm_cache()
+    finally:
+        interpret.set_cache_dir()
+    assert {r["contract"] for r in cold} >= {"raffle.vy", "raffle_factory.vy", "mocks/mock_vrf_coordinator.vy"}
+    assert all(r["compiled"] for r in cold)
+    assert not any(r["compiled"] for r in warm)
+    assert [r["source_hash"] for r in warm] == [r["source_hash"] for r in cold]